@@ -0,0 +1,51 @@
+"""
+Compares PDF size and build time of raster (matplotlib PNG) and vector
+(ReportLab drawing) chart backends on a transaction file
+
+usage: python benchmarks/bench_charts.py [TRANSACTION_FILE] [RUNS]
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import time
+from expense_manager.pipeline import run_pipeline
+
+TRANSACTION_FILE = os.path.join(
+    os.path.dirname(__file__), "..", "data", "transaction_data_102024.csv"
+)
+
+
+def main(transaction_file: str, runs: int) -> None:
+    """Driving code of chart backend benchmark"""
+    log = logging.getLogger("benchmark")
+    date_mmyyyy = os.path.basename(transaction_file)[-10:-4]
+    print(f"transaction_file={transaction_file} runs={runs}")
+    for backend in ["raster", "vector"]:
+        build_times = []
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for _ in range(runs):
+                start = time.perf_counter()
+                pdf_file = run_pipeline(
+                    transaction_file=transaction_file,
+                    output_path=tmp_dir,
+                    date_mmyyyy=date_mmyyyy,
+                    sort_column="date",
+                    log=log,
+                    chart_backend=backend,
+                )
+                build_times.append(time.perf_counter() - start)
+            pdf_size = os.path.getsize(pdf_file)
+
+        print(
+            f"{backend:<7} pdf={pdf_size / 1024:,.1f}KiB "
+            f"build={min(build_times):.3f}s (best of {runs})"
+        )
+
+
+if __name__ == "__main__":
+    main(
+        sys.argv[1] if len(sys.argv) > 1 else TRANSACTION_FILE,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 3,
+    )
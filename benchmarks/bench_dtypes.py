@@ -0,0 +1,64 @@
+"""
+Compares memory per million rows and groupby time of transactions as parsed
+(object categories, int64 amount) and compact (categorical, downcast amount)
+
+usage: python benchmarks/bench_dtypes.py [ROWS] [RUNS]
+"""
+
+import sys
+import time
+import numpy
+from synthetic import generate_ledger
+from expense_manager.dtypes import normalize_categories, to_compact
+
+
+def get_memory(df_exp) -> float:
+    """This function returns memory of transactions in MiB per million rows"""
+    return df_exp.memory_usage(deep=True).sum() / 2**20 / len(df_exp) * 1_000_000
+
+
+def time_groupby(df_exp, runs: int) -> float:
+    """This function returns best time of summing amount by month and category"""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        month = df_exp["date"].to_numpy().astype("datetime64[M]")
+        df_exp.groupby([month, "expense_category"], observed=True)["amount"].sum()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(rows: int, runs: int) -> None:
+    """Driving code of dtypes benchmark"""
+    df_exp = generate_ledger(rows)
+    # category casing varies between banks exports
+    rng = numpy.random.default_rng(0)
+    casing = rng.integers(0, 3, rows)
+    categories = df_exp["expense_category"]
+    df_exp["expense_category"] = categories.where(
+        casing == 0, categories.str.title().where(casing == 1, categories.str.upper())
+    )
+
+    start = time.perf_counter()
+    compact = to_compact(df_exp.copy())
+    compact_time = time.perf_counter() - start
+    # parsed transactions are normalized on every groupby
+    parsed = df_exp.assign(
+        expense_category=normalize_categories(df_exp["expense_category"])
+    )
+
+    print(f"rows={rows:,} runs={runs}")
+    print(f"dtypes: {dict(compact.dtypes.astype(str))}")
+    print(f"to_compact: {compact_time:.3f}s")
+    for name, frame in [("parsed", parsed), ("compact", compact)]:
+        print(
+            f"{name:<8} memory={get_memory(frame):,.1f}MiB/1M rows "
+            f"groupby={time_groupby(frame, runs) * 1000:.1f}ms (best of {runs})"
+        )
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 5,
+    )
@@ -0,0 +1,255 @@
+"""
+Times every stage of the pipeline on synthetic transaction files and records
+the results as JSON, optionally compared against the results of another commit
+
+usage: python benchmarks/bench_pipeline.py [--rows 1000 1000000] [--months 1]
+           [--skew 0] [--runs 3] [--backend raster] [--output FILE]
+           [--compare BASELINE_FILE] [--threshold 1.1]
+"""
+
+import argparse
+import copy
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+from synthetic import write_ledger
+from expense_manager import ExpenseManager
+from expense_manager.charts import BACKENDS, ExpenseCharts
+from expense_manager.config import (
+    EXPENSES,
+    charts_config,
+    get_expenses_definition,
+    init_charts_config,
+    init_reports_config,
+    reports_config,
+)
+from expense_manager.reports import ExpenseReport
+
+ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+STAGES = [
+    "load_data",
+    "sort_data",
+    "calculate_monthly_summary",
+    "insights",
+    "ExpenseCharts.build",
+    "ExpenseReport.build",
+]
+
+
+def get_commit() -> str:
+    """This function returns the short commit hash of the repository"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_PATH,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_stages(transaction_file: str, output_path: str, backend: str) -> Dict:
+    """
+    This function runs the pipeline once and times every stage
+    Args:
+        transaction_file: Transaction file
+        output_path: Directory of PDF report
+        backend: Chart backend
+
+    Returns:
+        seconds of every stage
+    """
+    log = logging.getLogger("benchmark")
+    times = {}
+
+    @contextmanager
+    def stage(name: str):
+        start = time.perf_counter()
+        yield
+        times[name] = time.perf_counter() - start
+
+    # ExpenseManager loads the transaction file on construction
+    with stage("load_data"):
+        expense = ExpenseManager(
+            expense_file=transaction_file,
+            sort_column="date",
+            log=log,
+            expenses_goal=get_expenses_definition(EXPENSES),
+        )
+    with stage("sort_data"):
+        expense.sort_data()
+    with stage("calculate_monthly_summary"):
+        month, monthly_summary, income, expenses, _ = (
+            expense.calculate_monthly_summary()
+        )
+    with stage("insights"):
+        expense_summary, insights = expense.insights()
+
+    chart_report = ExpenseCharts(month=month, log=log, backend=backend)
+    expense_records = expense_summary.to_dict(orient="records")
+    _charts_config = init_charts_config(
+        monthly_income=income,
+        monthly_expenses=expenses,
+        monthly_summary=monthly_summary.to_dict(orient="records"),
+        expense_summary=expense_records,
+        charts_=copy.deepcopy(charts_config),
+    )
+    with stage("ExpenseCharts.build"):
+        chart_report.build(_charts_config)
+
+    pdf_report = ExpenseReport(
+        customer_name="Benchmark",
+        report_month=month,
+        rpt_file=os.path.join(output_path, "benchmark.pdf"),
+        log=log,
+        images=chart_report.images,
+        data=init_reports_config(
+            copy.deepcopy(reports_config),
+            [
+                income,
+                expenses,
+                expense.get_total_expense_percent(),
+                reports_config["currency"],
+                {item["expense_category"]: item["amount"] for item in expense_records},
+                insights,
+            ],
+        ),
+    )
+    with stage("ExpenseReport.build"):
+        pdf_report.build()
+    return times
+
+
+def bench(rows: int, months: int, skew: float, runs: int, backend: str) -> Dict:
+    """
+    This function benchmarks the pipeline on a synthetic transaction file
+    Args:
+        rows: Number of transactions
+        months: Number of transaction months
+        skew: Skew of expense categories
+        runs: Number of pipeline runs
+        backend: Chart backend
+
+    Returns:
+        best and median seconds of every stage
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        transaction_file = os.path.join(tmp_dir, "transaction_data_102024.csv")
+        start = time.perf_counter()
+        write_ledger(transaction_file, rows, months=months, skew=skew)
+        generate_time = time.perf_counter() - start
+        file_size = os.path.getsize(transaction_file)
+        runs_times = [
+            run_stages(transaction_file, tmp_dir, backend) for _ in range(runs)
+        ]
+
+    stages = {
+        name: {
+            "min": min(times[name] for times in runs_times),
+            "median": statistics.median(times[name] for times in runs_times),
+        }
+        for name in STAGES
+    }
+    return {
+        "rows": rows,
+        "file_bytes": file_size,
+        "generate_seconds": generate_time,
+        "stages": stages,
+        "total": sum(times["min"] for times in stages.values()),
+    }
+
+
+def compare(results: List[Dict], baseline: Dict, threshold: float) -> bool:
+    """
+    This function prints best times relative to baseline results
+    Args:
+        results: Benchmark results
+        baseline: Benchmark results of another commit
+        threshold: Ratio of best times reported as regression
+
+    Returns:
+        True when any stage regressed
+    """
+    baseline_results = {result["rows"]: result for result in baseline["results"]}
+    is_regression = False
+    print(f"\ncompared to {baseline['commit']}")
+    for result in results:
+        if result["rows"] not in baseline_results:
+            continue
+        for name, times in result["stages"].items():
+            before = baseline_results[result["rows"]]["stages"][name]["min"]
+            ratio = times["min"] / before if before else 1.0
+            regressed = ratio > threshold
+            is_regression |= regressed
+            print(
+                f"rows={result['rows']:<11,} {name:<26} "
+                f"{before:.4f}s -> {times['min']:.4f}s x{ratio:.2f}"
+                f"{'  REGRESSION' if regressed else ''}"
+            )
+    return is_regression
+
+
+def main() -> None:
+    """Driving code of pipeline benchmark"""
+    parser = argparse.ArgumentParser(description="Pipeline benchmark")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--months", type=int, default=1)
+    parser.add_argument("--skew", type=float, default=0.0)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--backend", choices=BACKENDS, default="raster")
+    parser.add_argument("--output", help="JSON results, pipeline-<commit>.json")
+    parser.add_argument("--compare", help="JSON results of another commit")
+    parser.add_argument("--threshold", type=float, default=1.1)
+    args = parser.parse_args()
+
+    commit = get_commit()
+    results = []
+    for rows in args.rows:
+        result = bench(rows, args.months, args.skew, args.runs, args.backend)
+        results.append(result)
+        print(
+            f"rows={rows:,} file={result['file_bytes'] / 2**20:,.1f}MiB "
+            f"total={result['total']:.3f}s (best of {args.runs})"
+        )
+        for name, times in result["stages"].items():
+            print(f"  {name:<26} {times['min']:.4f}s median={times['median']:.4f}s")
+
+    output_file = args.output or f"pipeline-{commit}.json"
+    with open(output_file, "w", encoding="utf-8") as file:
+        json.dump(
+            {
+                "commit": commit,
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "params": {
+                    "months": args.months,
+                    "skew": args.skew,
+                    "runs": args.runs,
+                    "backend": args.backend,
+                },
+                "results": results,
+            },
+            file,
+            indent=2,
+        )
+    print(f"results: {output_file}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            if compare(results, json.load(file), args.threshold):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
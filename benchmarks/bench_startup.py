@@ -0,0 +1,49 @@
+"""
+Times startup of the package and scripts in fresh interpreters
+
+usage: python benchmarks/bench_startup.py [RUNS]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+COMMANDS = {
+    "python": ["-c", "pass"],
+    "import expense_manager": ["-c", "import expense_manager"],
+    "import pipeline": ["-c", "import expense_manager.pipeline"],
+    "run_expense_manager.py --help": [
+        os.path.join(ROOT_PATH, "scripts", "run_expense_manager.py"),
+        "--help",
+    ],
+    "import ExpenseManager (pandas)": [
+        "-c",
+        "from expense_manager import ExpenseManager",
+    ],
+    "import charts + reports (all)": [
+        "-c",
+        "import matplotlib.figure, reportlab.platypus, requests, pandas",
+    ],
+}
+
+
+def main(runs: int) -> None:
+    """Driving code of startup benchmark"""
+    env = {**os.environ, "PYTHONPATH": ROOT_PATH}
+    print(f"runs={runs}")
+    for name, args in COMMANDS.items():
+        startup_times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run(
+                [sys.executable, *args], env=env, check=True, capture_output=True
+            )
+            startup_times.append(time.perf_counter() - start)
+        print(f"{name:<32} {statistics.median(startup_times) * 1000:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
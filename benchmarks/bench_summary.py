@@ -0,0 +1,44 @@
+"""
+Times ExpenseManager.calculate_monthly_summary and insights on a synthetic ledger
+
+usage: python benchmarks/bench_summary.py [ROWS]
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import time
+from synthetic import generate_ledger
+from expense_manager import ExpenseManager
+from expense_manager.config import EXPENSES, get_expenses_definition
+
+
+def main(rows: int) -> None:
+    """Driving code of summary benchmark"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        expense_file = os.path.join(tmp_dir, "transaction_data_102024.csv")
+        generate_ledger(rows).to_csv(expense_file, index=False)
+        expense = ExpenseManager(
+            expense_file=expense_file,
+            sort_column="date",
+            log=logging.getLogger("benchmark"),
+            savings_goal=0,
+            expenses_goal=get_expenses_definition(EXPENSES),
+        )
+
+    start = time.perf_counter()
+    expense.calculate_monthly_summary()
+    summary_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expense.insights()
+    insights_time = time.perf_counter() - start
+
+    print(f"rows={rows:,}")
+    print(f"calculate_monthly_summary: {summary_time:.3f}s")
+    print(f"insights: {insights_time * 1000:.3f}ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000)
@@ -0,0 +1,67 @@
+"""
+Compares trend analysis of years of monthly transaction files from the
+precomputed monthly aggregates against reloading every monthly file
+
+usage: python benchmarks/bench_trends.py [YEARS] [ROWS_PER_MONTH]
+"""
+
+import glob
+import os
+import sys
+import tempfile
+import time
+from pandas import concat, read_csv
+from synthetic import generate_ledger
+from expense_manager.config import TRENDS
+from expense_manager.summary import MonthlySummary
+from expense_manager.trends import ExpenseTrends
+
+
+def analyze(trends: ExpenseTrends) -> None:
+    """This function computes every trend of every month"""
+    for window in TRENDS["windows"]:
+        trends.rolling_average(window)
+    trends.month_over_month()
+    trends.month_over_month_percent()
+    trends.year_to_date()
+    trends.get_trends(trends.months[-1])
+
+
+def main(years: int, rows_per_month: int) -> None:
+    """Driving code of trends benchmark"""
+    months = years * 12
+    ledger = generate_ledger(rows_per_month * months, month="2015-01", months=months)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for month, df_month in ledger.groupby(ledger["date"].dt.to_period("M")):
+            df_month.to_csv(
+                os.path.join(tmp_dir, f"transaction_data_{month.strftime('%m%Y')}.csv"),
+                index=False,
+            )
+
+        start = time.perf_counter()
+        df_expense = concat(
+            [
+                read_csv(transaction_file, parse_dates=["date"])
+                for transaction_file in sorted(glob.glob(f"{tmp_dir}/*.csv"))
+            ]
+        )
+        summary = MonthlySummary.from_transactions(df_expense)
+        analyze(ExpenseTrends.from_summary(summary))
+        reload_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    trends = ExpenseTrends.from_summary(summary)
+    analyze(trends)
+    precomputed_time = time.perf_counter() - start
+
+    print(f"years={years} months={months} rows={len(ledger):,}")
+    print(f"matrix: {trends.matrix.shape} {trends.matrix.memory_usage().sum():,} bytes")
+    print(f"reload monthly files + trends: {reload_time:.3f}s")
+    print(f"trends of monthly aggregates: {precomputed_time * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 10,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 10_000,
+    )
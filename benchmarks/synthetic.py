@@ -0,0 +1,88 @@
+import numpy
+from pandas import DataFrame, DateOffset, Timestamp, date_range
+from expense_manager.config import Expenses
+
+INCOME_CATEGORY = "salary"
+
+
+def get_category_weights(categories: int, skew: float = 0.0) -> numpy.ndarray:
+    """
+    This function gets Zipf-like probabilities of expense categories
+    Args:
+        categories: Number of expense categories
+        skew: 0 for uniform categories, larger values concentrate the
+            transactions on the first categories
+
+    Returns:
+        probabilities of expense categories
+    """
+    weights = 1 / numpy.arange(1, categories + 1) ** skew
+    return weights / weights.sum()
+
+
+def generate_ledger(
+    rows: int,
+    month: str = "2024-10",
+    seed: int = 0,
+    months: int = 1,
+    skew: float = 0.0,
+) -> DataFrame:
+    """
+    This function generates synthetic transactions for given months
+    Args:
+        rows: Number of transactions
+        month: First transaction month in format YYYY-MM
+        seed: Random seed
+        months: Number of consecutive transaction months
+        skew: Skew of expense categories, 0 for uniform
+
+    Returns:
+        transactions with columns date, expense_category and amount
+    """
+    rng = numpy.random.default_rng(seed)
+    expenses = [expense.value for expense in Expenses]
+    categories = numpy.array([INCOME_CATEGORY] + expenses)
+    # income keeps its uniform share, expenses share the rest by skew
+    probabilities = numpy.concatenate(
+        [
+            [1 / len(categories)],
+            get_category_weights(len(expenses), skew) * (1 - 1 / len(categories)),
+        ]
+    )
+    start = Timestamp(month)
+    dates = date_range(start, start + DateOffset(months=months, days=-1))
+
+    category = categories[rng.choice(len(categories), rows, p=probabilities)]
+    amount = rng.integers(10, 2000, rows)
+    amount = numpy.where(category == INCOME_CATEGORY, amount * 10, -amount)
+    return DataFrame(
+        {
+            "date": dates[rng.integers(0, len(dates), rows)],
+            "expense_category": category,
+            "amount": amount,
+        }
+    )
+
+
+def write_ledger(
+    ledger_file: str, rows: int, chunk_rows: int = 5_000_000, seed: int = 0, **kwargs
+) -> None:
+    """
+    This function writes synthetic transactions to a CSV file in chunks,
+    so that ledgers larger than memory can be generated
+    Args:
+        ledger_file: CSV transaction file
+        rows: Number of transactions
+        chunk_rows: Transactions generated per chunk
+        seed: Random seed of the first chunk
+        **kwargs: Keyword arguments of generate_ledger
+    """
+    for chunk_no, start in enumerate(range(0, rows, chunk_rows)):
+        generate_ledger(
+            min(chunk_rows, rows - start), seed=seed + chunk_no, **kwargs
+        ).to_csv(
+            ledger_file,
+            mode="w" if chunk_no == 0 else "a",
+            header=chunk_no == 0,
+            index=False,
+        )
@@ -1 +1,15 @@
-from expense_manager.expense_manager import ExpenseManager
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from expense_manager.expense_manager import ExpenseManager
+
+__all__ = ["ExpenseManager"]
+
+
+def __getattr__(name: str):
+    """This function imports ExpenseManager and pandas on first use"""
+    if name == "ExpenseManager":
+        from expense_manager.expense_manager import ExpenseManager
+
+        return ExpenseManager
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,281 @@
+import glob
+import logging
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Dict, List, TypedDict
+from expense_manager.cache import RatesCache
+from expense_manager.config import FILES, reports_config
+from expense_manager.exchange import CurrencyRatesAPI
+from expense_manager.pipeline import CUSTOMER_NAME, prepare_report, run_pipeline
+from expense_manager.utils import get_log_queue, setup_worker_logging
+
+if TYPE_CHECKING:
+    from expense_manager.reports import ExpenseReport
+
+
+class BatchJob(TypedDict):
+    transaction_file: str
+    date_mmyyyy: str
+    output_path: str
+    customer_name: str
+
+
+# rates cache of the worker process by cache file, opened on first job
+_rates_caches: Dict[str, RatesCache] = {}
+
+
+class BatchResult(TypedDict):
+    job: BatchJob
+    status: str
+    seconds: float
+    pdf_file: str
+    error: str
+    report: "ExpenseReport"
+
+
+def _get_output_path(transaction_file: str, date_mmyyyy: str, output_path: str):
+    """This function returns a job specific directory so that jobs never share charts"""
+    data_path = os.path.dirname(os.path.abspath(transaction_file))
+    if output_path is None:
+        return os.path.join(data_path, "reports", date_mmyyyy)
+    # files of the same month in different directories share the output root
+    return os.path.join(output_path, os.path.basename(data_path), date_mmyyyy)
+
+
+def find_jobs(
+    pattern: str, output_path: str = None, customer_name: str = CUSTOMER_NAME
+) -> List[BatchJob]:
+    """
+    This function finds transaction files in a directory or glob pattern
+    Args:
+        pattern: Directory or glob pattern of transaction files
+        output_path: Root directory of reports, defaults to <file dir>/reports,
+            reports are written to <output_path>/<file dir name>/<MMYYYY>
+        customer_name: Customer name printed on the reports
+
+    Returns:
+        batch jobs sorted by transaction file
+    """
+    if os.path.isdir(pattern):
+        pattern = os.path.join(
+            pattern, FILES["transaction_file"].format(date_mmyyyy="*")
+        )
+
+    file_regex = re.compile(
+        re.escape(FILES["transaction_file"]).replace(
+            re.escape("{date_mmyyyy}"), r"(?P<date_mmyyyy>\d{6})"
+        )
+    )
+    jobs = []
+    for transaction_file in sorted(glob.glob(pattern)):
+        match = file_regex.fullmatch(os.path.basename(transaction_file))
+        if match:
+            date_mmyyyy = match.group("date_mmyyyy")
+            jobs.append(
+                BatchJob(
+                    transaction_file=transaction_file,
+                    date_mmyyyy=date_mmyyyy,
+                    output_path=_get_output_path(
+                        transaction_file, date_mmyyyy, output_path
+                    ),
+                    customer_name=customer_name,
+                )
+            )
+    return jobs
+
+
+def get_month_jobs(
+    data_path: str,
+    from_mmyyyy: str,
+    to_mmyyyy: str,
+    output_path: str = None,
+    customer_name: str = CUSTOMER_NAME,
+) -> List[BatchJob]:
+    """
+    This function creates jobs for a range of months in data path
+    Args:
+        data_path: Directory of transaction files
+        from_mmyyyy: First month of range (MMYYYY)
+        to_mmyyyy: Last month of range (MMYYYY)
+        output_path: Root directory of reports, defaults to <data_path>/reports,
+            reports are written to <output_path>/<data_path name>/<MMYYYY>
+        customer_name: Customer name printed on the reports
+
+    Returns:
+        batch jobs in month order
+    """
+    from pandas import period_range
+
+    jobs = []
+    months = period_range(
+        f"{from_mmyyyy[2:]}-{from_mmyyyy[:2]}",
+        f"{to_mmyyyy[2:]}-{to_mmyyyy[:2]}",
+        freq="M",
+    )
+    for month in months:
+        date_mmyyyy = month.strftime("%m%Y")
+        transaction_file = os.path.join(data_path, FILES["transaction_file"]).format(
+            date_mmyyyy=date_mmyyyy
+        )
+        jobs.append(
+            BatchJob(
+                transaction_file=transaction_file,
+                date_mmyyyy=date_mmyyyy,
+                output_path=_get_output_path(
+                    transaction_file, date_mmyyyy, output_path
+                ),
+                customer_name=customer_name,
+            )
+        )
+    return jobs
+
+
+def _get_rates_api(
+    rates_cache_file: str, currency: str, log: logging.Logger
+) -> CurrencyRatesAPI:
+    """This function returns rates API of reporting currency on the rates cache of the process"""
+    if rates_cache_file not in _rates_caches:
+        _rates_caches[rates_cache_file] = RatesCache(rates_cache_file)
+    return CurrencyRatesAPI(
+        base_currency=currency, cache=_rates_caches[rates_cache_file], logger=log
+    )
+
+
+def run_job(
+    job: BatchJob,
+    sort_column: str,
+    log_name: str,
+    is_combined: bool = False,
+    rates_cache_file: str = None,
+    **kwargs,
+) -> BatchResult:
+    """
+    This function runs the pipeline of one job and never raises,
+    failures are reported in the result
+    Args:
+        job: Batch job
+        sort_column: Column to sort
+        log_name: Logger name used in worker process
+        is_combined: Return the prepared report instead of building its PDF file
+        rates_cache_file: Exchange rates cache, files with other currencies
+            are converted with rates of reporting currency
+        **kwargs: Keyword arguments of run_pipeline
+
+    Returns:
+        result of the job
+    """
+    log = logging.getLogger(log_name)
+    start = time.perf_counter()
+    pdf_file, report = None, None
+    try:
+        if rates_cache_file is not None:
+            kwargs["rates_api"] = _get_rates_api(
+                rates_cache_file,
+                kwargs.get("currency", reports_config["currency"]),
+                log,
+            )
+        pipeline = prepare_report if is_combined else run_pipeline
+        output = pipeline(
+            transaction_file=job["transaction_file"],
+            output_path=job["output_path"],
+            date_mmyyyy=job["date_mmyyyy"],
+            sort_column=sort_column,
+            log=log,
+            customer_name=job["customer_name"],
+            **kwargs,
+        )
+        if is_combined:
+            report = output
+        else:
+            pdf_file = output
+        status, error = "success", None
+    except Exception as exc:
+        log.exception("Job failed: %s", job["transaction_file"])
+        status, error = "failed", f"{type(exc).__name__}: {exc}"
+
+    return BatchResult(
+        job=job,
+        status=status,
+        seconds=round(time.perf_counter() - start, 3),
+        pdf_file=pdf_file,
+        error=error,
+        report=report,
+    )
+
+
+def run_batch(
+    jobs: List[BatchJob],
+    sort_column: str,
+    log: logging.Logger,
+    workers: int = None,
+    combined_file: str = None,
+    rates_cache_file: str = None,
+    **kwargs,
+) -> List[BatchResult]:
+    """
+    This function fans the pipeline of every job out across a process pool
+    Args:
+        jobs: Batch jobs
+        sort_column: Column to sort
+        log: logger object
+        workers: Number of worker processes, defaults to number of CPUs
+        combined_file: Build reports of every successful job into this one PDF
+            file instead of a PDF file per job
+        rates_cache_file: Exchange rates cache shared by worker processes,
+            files with other currencies are converted with its rates API
+        **kwargs: Keyword arguments of run_pipeline
+
+    Returns:
+        results in the order of jobs
+    """
+    start = time.perf_counter()
+    results: Dict[int, BatchResult] = {}
+    is_combined = combined_file is not None
+    # workers log through the queue of a queue logger instead of its files
+    log_queue = get_log_queue(log)
+    worker_logging = {}
+    if log_queue is not None:
+        worker_logging = dict(
+            initializer=setup_worker_logging,
+            initargs=(log.name, log_queue, log.getEffectiveLevel()),
+        )
+    with ProcessPoolExecutor(max_workers=workers, **worker_logging) as executor:
+        futures = {
+            executor.submit(
+                run_job,
+                job,
+                sort_column,
+                log.name,
+                is_combined,
+                rates_cache_file,
+                **kwargs,
+            ): job_no
+            for job_no, job in enumerate(jobs)
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            results[futures[future]] = result
+            log.info(
+                "Job %s in %ss: %s",
+                result["status"],
+                result["seconds"],
+                result["job"]["transaction_file"],
+            )
+
+    results = [results[job_no] for job_no in range(len(jobs))]
+    if is_combined:
+        from expense_manager.reports import build_reports
+
+        succeeded = [result for result in results if result["status"] == "success"]
+        build_reports([result["report"] for result in succeeded], combined_file)
+        for result in succeeded:
+            result.update(pdf_file=combined_file, report=None)
+        log.info("Combined PDF report: %s", combined_file)
+
+    elapsed = time.perf_counter() - start
+    # failed jobs produce no report
+    reports = sum(result["status"] == "success" for result in results)
+    log.info("Throughput: %.2f reports/sec", reports / elapsed)
+    return results
@@ -0,0 +1,341 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Optional, Set
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
+
+
+class TransactionCache:
+    """Typed columnar (Parquet) cache of parsed transaction files"""
+
+    HASH_BLOCK_SIZE = 1 << 20
+
+    def __init__(self, cache_dir: str, log: logging.Logger):
+        """
+        This class keeps a Parquet sidecar for every transaction file
+        Args:
+            cache_dir: Directory of the sidecar files
+            log: logger object
+        """
+        self.cache_dir = cache_dir
+        self.logger = log
+
+    def _get_paths(self, source_file: str):
+        """This method returns sidecar data and metadata paths of source file"""
+        name = os.path.splitext(os.path.basename(source_file))[0]
+        data_file = os.path.join(self.cache_dir, f"{name}.parquet")
+        return data_file, f"{data_file}.json"
+
+    @classmethod
+    def fingerprint(cls, source_file: str) -> Dict:
+        """
+        This method gets size, modification time and content hash of source file
+        Args:
+            source_file: Transaction file
+
+        Returns:
+            fingerprint of source file
+        """
+        stat = os.stat(source_file)
+        sha256 = hashlib.sha256()
+        with open(source_file, "rb") as file:
+            for block in iter(lambda: file.read(cls.HASH_BLOCK_SIZE), b""):
+                sha256.update(block)
+        return {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": sha256.hexdigest(),
+        }
+
+    @staticmethod
+    def to_typed(df_exp: "DataFrame") -> "DataFrame":
+        """
+        This method casts transactions to the cached column types,
+        categorical expense_category and smallest exact amount
+        Args:
+            df_exp: Transactions
+
+        Returns:
+            Typed transactions
+        """
+        from expense_manager.dtypes import to_compact
+
+        return to_compact(df_exp)
+
+    def load(self, source_file: str) -> Optional["DataFrame"]:
+        """
+        This method reads the sidecar of source file if it is still valid
+        Args:
+            source_file: Transaction file
+
+        Returns:
+            Cached transactions or None on cache miss
+        """
+        data_file, meta_file = self._get_paths(source_file)
+        if not (os.path.exists(data_file) and os.path.exists(meta_file)):
+            self.logger.info("Transaction cache miss: %s", source_file)
+            return None
+
+        with open(meta_file, encoding="utf-8") as file:
+            cached_fingerprint = json.load(file)
+
+        # compare cheap size and mtime before hashing the content
+        stat = os.stat(source_file)
+        is_stale = any(
+            [
+                cached_fingerprint["size"] != stat.st_size,
+                cached_fingerprint["mtime_ns"] != stat.st_mtime_ns,
+            ]
+        )
+        if is_stale or cached_fingerprint != self.fingerprint(source_file):
+            self.logger.info("Transaction cache is stale: %s", source_file)
+            return None
+
+        self.logger.info("Transaction cache hit: %s", source_file)
+        from pandas import read_parquet
+
+        return read_parquet(data_file)
+
+    def save(self, source_file: str, df_exp: "DataFrame") -> None:
+        """
+        This method writes the sidecar of source file
+        Args:
+            source_file: Transaction file
+            df_exp: Parsed transactions
+        """
+        data_file, meta_file = self._get_paths(source_file)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        try:
+            df_exp.to_parquet(data_file, index=False)
+        except ImportError as exc:
+            self.logger.warning("Transaction cache disabled: %s", exc)
+            return
+
+        with open(meta_file, "w", encoding="utf-8") as file:
+            json.dump(self.fingerprint(source_file), file)
+        self.logger.info("Transaction cache saved: %s", data_file)
+
+
+class RatesCache:
+    """Persistent SQLite cache of exchange rates keyed by base, target and date"""
+
+    TTL = 3600
+    LATEST = "latest"
+    CURRENCIES = "currencies"
+
+    def __init__(self, cache_file: str, ttl: int = TTL, offline: bool = False):
+        """
+        This class caches exchange rates API responses on disk. Historical
+        rates never expire, latest rates and currency list expire after ttl.
+        Args:
+            cache_file: SQLite database file
+            ttl: Time to live of latest rates and currency list in seconds
+            offline: Serve expired entries instead of calling the API
+        """
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(cache_file)), exist_ok=True)
+        self._connection = sqlite3.connect(cache_file, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS rates ("
+                "base TEXT, target TEXT, date TEXT, payload TEXT, fetched_at REAL, "
+                "PRIMARY KEY (base, target, date))"
+            )
+
+    def _is_expired(self, date: str, fetched_at: float) -> bool:
+        """This method checks if a latest entry is older than ttl"""
+        if self.offline or date not in (self.LATEST, self.CURRENCIES):
+            return False
+        return time.time() - fetched_at > self.ttl
+
+    def get(self, base: str, target: str = None, date: str = None) -> Optional[Dict]:
+        """
+        This method gets a cached API response
+        Args:
+            base: Base currency
+            target: Target currency, None for all currencies
+            date: Date of historical rates, None for latest rates
+
+        Returns:
+            API response or None on cache miss
+        """
+        key = (base or "", target or "", date or self.LATEST)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT payload, fetched_at FROM rates "
+                "WHERE base = ? AND target = ? AND date = ?",
+                key,
+            ).fetchone()
+            if row is None or self._is_expired(key[2], row[1]):
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, payload: Dict, base: str, target: str = None, date: str = None):
+        """
+        This method stores an API response
+        Args:
+            payload: API response
+            base: Base currency
+            target: Target currency, None for all currencies
+            date: Date of historical rates, None for latest rates
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO rates VALUES (?, ?, ?, ?, ?)",
+                (
+                    base or "",
+                    target or "",
+                    date or self.LATEST,
+                    json.dumps(payload),
+                    time.time(),
+                ),
+            )
+
+    def get_currencies(self) -> Optional[Set]:
+        """This method gets cached currency list or None on cache miss"""
+        currencies = self.get(base=None, date=self.CURRENCIES)
+        return None if currencies is None else set(currencies)
+
+    def set_currencies(self, currencies: Dict) -> None:
+        """This method stores currency list"""
+        self.set(currencies, base=None, date=self.CURRENCIES)
+
+    def stats(self) -> Dict:
+        """This method returns hit and miss counters"""
+        return {"hits": self.hits, "misses": self.misses}
+
+    def close(self) -> None:
+        """This method closes the database connection"""
+        self._connection.close()
+
+
+class ChartCache:
+    """Size-bounded content-addressed cache of rendered chart PNGs"""
+
+    MAX_BYTES = 100 * 1024 * 1024
+
+    def __init__(self, cache_dir: str, max_bytes: int = MAX_BYTES):
+        """
+        This class keeps rendered charts by the hash of their spec and evicts
+        least recently used charts when the cache grows above max_bytes
+        Args:
+            cache_dir: Directory of cached charts
+            max_bytes: Maximum size of cached charts in bytes
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def get_key(chart: Dict, month: str, dpi: int, fig_size) -> str:
+        """
+        This method hashes everything that changes the rendered chart
+        Args:
+            chart: Chart config (type, title, labels, sizes, colors, ...)
+            month: Report month
+            dpi: Resolution of chart
+            fig_size: Figure size in inches
+
+        Returns:
+            cache key
+        """
+        spec = {"chart": chart, "month": month, "dpi": dpi, "fig_size": fig_size}
+        payload = json.dumps(
+            spec,
+            sort_keys=True,
+            default=lambda value: (
+                value.item() if hasattr(value, "item") else str(value)
+            ),
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _get_path(self, key: str) -> str:
+        """This method returns cached chart path of key"""
+        return os.path.join(self.cache_dir, f"{key}.png")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        This method gets cached chart of key
+        Args:
+            key: Cache key
+
+        Returns:
+            PNG or None on cache miss
+        """
+        cached_file = self._get_path(key)
+        try:
+            with open(cached_file, "rb") as file:
+                png = file.read()
+            # mark as recently used for eviction
+            os.utime(cached_file)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return png
+
+    def put(self, key: str, png: bytes) -> None:
+        """
+        This method adds rendered chart to the cache
+        Args:
+            key: Cache key
+            png: Rendered PNG
+        """
+        # write to a temporary file first so that concurrent readers never
+        # see a partial chart
+        file_no, tmp_file = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(file_no, "wb") as file:
+            file.write(png)
+        os.replace(tmp_file, self._get_path(key))
+        self.evict()
+
+    def _list_charts(self):
+        """This method lists cached charts as (last used, size, path)"""
+        charts = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".png"):
+                stat = entry.stat()
+                charts.append((stat.st_mtime, stat.st_size, entry.path))
+        return charts
+
+    def evict(self) -> None:
+        """This method removes least recently used charts above max_bytes"""
+        charts = sorted(self._list_charts())
+        total_bytes = sum(size for _, size, _ in charts)
+        for _, size, path in charts:
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+            total_bytes -= size
+
+    def stats(self) -> Dict:
+        """This method returns hit, miss and eviction counters with cache size"""
+        charts = self._list_charts()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "charts": len(charts),
+            "bytes": sum(size for _, size, _ in charts),
+        }
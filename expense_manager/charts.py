@@ -1,53 +1,198 @@
+import io
 import logging
 import os
-from typing import Dict, List
-from matplotlib import pyplot
+import time
+from concurrent.futures import Executor
+from typing import TYPE_CHECKING, Dict, List, Tuple, Union
+from expense_manager.cache import ChartCache
 from expense_manager.exception import ExpenseChartsError
+from expense_manager.instrumentation import instrument
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+    from expense_manager.vector_charts import VectorChart
+
+DPI = 300
+FIG_SIZE = (10, 6)
+BACKENDS = ["raster", "vector"]
+
+
+def _new_figure(fig_size=FIG_SIZE) -> "Figure":
+    """This function creates a figure on the headless Agg canvas, outside pyplot"""
+    # matplotlib is imported on first chart, not at package import
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=fig_size)
+    FigureCanvasAgg(figure)
+    return figure
+
+
+def _annotate_month(axes, month) -> None:
+    """This function plots report month"""
+    axes.annotate(
+        f"**{month}**",
+        xy=(1, 1),
+        xycoords="axes fraction",
+        ha="right",
+        fontsize=16,
+        fontweight="bold",
+    )
+
+
+def get_chart_name(title: str) -> str:
+    """This function returns PNG file name of chart title"""
+    return f'{title.replace(" ", "_").lower()}.png'
+
+
+def _write_chart(png: bytes, file_path: str, title: str) -> None:
+    """This function writes PNG of chart title to working directory"""
+    with open(os.path.join(file_path, get_chart_name(title)), "wb") as file:
+        file.write(png)
+
+
+def _save_figure(figure: "Figure", dpi: int = DPI) -> bytes:
+    """Render the figure to PNG in memory and release its artists."""
+    buffer = io.BytesIO()
+    try:
+        figure.savefig(buffer, format="png", dpi=dpi, bbox_inches="tight")
+    finally:
+        figure.clear()
+    return buffer.getvalue()
+
+
+def draw_bar_chart(
+    figure: "Figure",
+    month,
+    title: str,
+    labels: List,
+    sizes: List,
+    xlabel: str,
+    ylabel: str,
+    color: str,
+) -> None:
+    """This function draws bar chart on figure"""
+    axes = figure.add_subplot()
+    axes.bar(labels, sizes, color=color)
+    axes.set_xlabel(xlabel)
+    axes.set_ylabel(ylabel)
+    axes.set_title(title, fontsize=16, fontweight="bold")
+    axes.tick_params(axis="x", labelrotation=45)
+    figure.tight_layout()
+    _annotate_month(axes, month)
+
+
+def draw_pie_chart(
+    figure: "Figure", month, title: str, labels: List, sizes: List, colors: List = None
+) -> None:
+    """This function draws pie chart on figure"""
+    axes = figure.add_subplot()
+    axes.pie(
+        sizes,
+        labels=labels,
+        colors=colors,
+        autopct="%1.1f%%",
+        startangle=90,
+        radius=1.2,
+        textprops={"fontsize": 12},
+    )
+    axes.set_title(title, fontsize=16, fontweight="bold")
+    axes.axis("equal")
+    figure.tight_layout()
+    _annotate_month(axes, month)
+
+
+def render_chart(
+    chart: Dict, month, file_path: str = None, dpi: int = DPI, fig_size=FIG_SIZE
+) -> Tuple[float, bytes]:
+    """
+    This function renders one chart of charts config to PNG in memory,
+    it only uses its own figure so charts can render in parallel workers
+    Args:
+        chart: Chart config
+        month: Report month
+        file_path: Working directory, PNG file is not written when not set
+        dpi: Resolution of PNG
+        fig_size: Figure size in inches
+
+    Returns:
+        render time in seconds and PNG
+    """
+    start = time.perf_counter()
+    figure = _new_figure(fig_size)
+    if chart["type"] == "pie":
+        draw_pie_chart(
+            figure,
+            month,
+            chart["title"],
+            chart["labels"],
+            chart["sizes"],
+            chart["colors"],
+        )
+    elif chart["type"] == "bar":
+        draw_bar_chart(
+            figure,
+            month,
+            chart["title"],
+            chart["labels"],
+            chart["sizes"],
+            chart["xlabel"],
+            chart["ylabel"],
+            chart["colors"],
+        )
+    png = _save_figure(figure, dpi)
+    if file_path:
+        _write_chart(png, file_path, chart["title"])
+    return time.perf_counter() - start, png
 
 
 class ExpenseCharts:
-    DPI = 300
-    FIG_SIZE = (10, 6)
+    DPI = DPI
+    FIG_SIZE = FIG_SIZE
 
-    def __init__(self, month, log: logging.Logger, file_path: str):
+    def __init__(
+        self,
+        month,
+        log: logging.Logger,
+        file_path: str = None,
+        cache: ChartCache = None,
+        backend: str = "raster",
+    ):
         """
         This class generates Charts for ExpenseManager app
         Args:
             month: Report month
             log: logger object
-            file_path: Working directory
+            file_path: Working directory, charts are kept in memory only when not set
+            cache: Cache of rendered charts
+            backend: raster renders PNGs with matplotlib, vector keeps
+                charts drawn into the PDF as ReportLab graphics without rasterization
         """
+        if backend not in BACKENDS:
+            raise ExpenseChartsError(
+                f"Invalid chart backend {backend}. Allowed values are {BACKENDS}"
+            )
         self.month = month
         self.logger = log
         self.file_path = file_path
+        self.cache = cache
+        self.backend = backend
+        self.images: Dict[str, Union[bytes, "VectorChart"]] = {}
 
     def sort_data(self, data: List[Dict]) -> List[Dict]:
         """This methos sorts data"""
         try:
             data.sort(key=lambda x: x["amount"], reverse=True)
         except KeyError as e:
-            self.logger.error(f"Error sorting expenses: {e}")
+            self.logger.error("Error sorting expenses: %s", e)
 
         return data
 
-    def _save_figure(self, title: str) -> None:
-        """Save the figure to a file."""
-        pyplot.savefig(
-            os.path.join(self.file_path, f'{title.replace(" ", "_").lower()}.png'),
-            dpi=self.DPI,
-            bbox_inches="tight",
-        )
-
-    def _annotate_month(self):
-        """This method plots report month"""
-        pyplot.annotate(
-            f"**{self.month}**",
-            xy=(1, 1),
-            xycoords="axes fraction",
-            ha="right",
-            fontsize=16,
-            fontweight="bold",
-        )
+    def _keep_chart(self, title: str, png: bytes) -> None:
+        """This method keeps PNG of chart in memory and working directory"""
+        self.images[get_chart_name(title)] = png
+        if self.file_path:
+            _write_chart(png, self.file_path, title)
 
     def plot_bar_chart(
         self,
@@ -60,57 +205,107 @@ class ExpenseCharts:
     ) -> None:
         """Generate bar charts"""
         try:
-            pyplot.figure(figsize=self.FIG_SIZE)
-            pyplot.bar(labels, sizes, color=color)
-            pyplot.xlabel(xlabel)
-            pyplot.ylabel(ylabel)
-            pyplot.title(title, fontsize=16, fontweight="bold")
-            pyplot.xticks(rotation=45)
-            pyplot.tight_layout()
-            self._annotate_month()
-            self._save_figure(title)
+            figure = _new_figure(self.FIG_SIZE)
+            draw_bar_chart(
+                figure, self.month, title, labels, sizes, xlabel, ylabel, color
+            )
+            self._keep_chart(title, _save_figure(figure, self.DPI))
         except ExpenseChartsError as exc:
-            self.logger.error(f"Error plotting bar chart: {exc}")
+            self.logger.error("Error plotting bar chart: %s", exc)
 
     def plot_pie_chart(
         self, title: str, labels: List, sizes: List, colors: List = None
     ) -> None:
         """Generates pie charts"""
         try:
-            pyplot.figure(figsize=self.FIG_SIZE)
-            pyplot.pie(
-                sizes,
-                labels=labels,
-                colors=colors,
-                autopct="%1.1f%%",
-                startangle=90,
-                radius=1.2,
-                textprops={"fontsize": 12},
-            )
-            pyplot.title(title, fontsize=16, fontweight="bold")
-            pyplot.axis("equal")
-            pyplot.tight_layout()
-            self._annotate_month()
-            self._save_figure(title)
+            figure = _new_figure(self.FIG_SIZE)
+            draw_pie_chart(figure, self.month, title, labels, sizes, colors)
+            self._keep_chart(title, _save_figure(figure, self.DPI))
         except ExpenseChartsError as exc:
-            self.logger.error(f"Error plotting pie chart: {exc}")
+            self.logger.error("Error plotting pie chart: %s", exc)
+
+    def _build_vector(self, charts) -> Dict[str, float]:
+        """
+        This method prepares charts drawn as ReportLab graphics when the
+        report is built, drawing is cheap enough to need neither cache nor worker pool
+        Args:
+            charts: charts config
+
+        Returns:
+            render time in seconds by chart title
+        """
+        from expense_manager.vector_charts import VectorChart
+
+        render_times = {}
+        for chart in charts:
+            start = time.perf_counter()
+            self.images[get_chart_name(chart["title"])] = VectorChart(chart, self.month)
+            render_times[chart["title"]] = time.perf_counter() - start
+            self.logger.info(
+                "Vector chart %-27s .................. [Complete] %.3fs",
+                chart["title"],
+                render_times[chart["title"]],
+            )
+        return render_times
+
+    @instrument(rows=lambda _, self, charts, *args, **kwargs: len(charts))
+    def build(self, charts, executor: Executor = None) -> Dict[str, float]:
+        """
+        Build charts for given configuration, PNGs or vector charts of vector
+        backend are kept in images by chart file name. PNGs are written to
+        working directory when it is set
+        Args:
+            charts: charts config
+            executor: Worker pool rendering the charts concurrently,
+                charts are rendered one after another when not set
+
+        Returns:
+            render time in seconds by chart title
+        """
+        if self.backend == "vector":
+            return self._build_vector(charts)
+
+        render_times = {}
+        charts_to_render = []
+        cache_keys = {}
+        for chart in charts:
+            if self.cache is None:
+                charts_to_render.append(chart)
+                continue
+            start = time.perf_counter()
+            key = self.cache.get_key(chart, self.month, self.DPI, self.FIG_SIZE)
+            png = self.cache.get(key)
+            if png is None:
+                cache_keys[chart["title"]] = key
+                charts_to_render.append(chart)
+            else:
+                self._keep_chart(chart["title"], png)
+                render_times[chart["title"]] = time.perf_counter() - start
+                self.logger.info("Chart %s served from cache", chart["title"])
+
+        # PNG files are written by the workers, PNGs are returned in memory
+        arguments = [
+            charts_to_render,
+            [self.month] * len(charts_to_render),
+            [self.file_path] * len(charts_to_render),
+            [self.DPI] * len(charts_to_render),
+            [self.FIG_SIZE] * len(charts_to_render),
+        ]
+        if executor is None:
+            rendered = list(map(render_chart, *arguments))
+        else:
+            rendered = list(executor.map(render_chart, *arguments))
+
+        for chart, (render_time, png) in zip(charts_to_render, rendered):
+            render_times[chart["title"]] = render_time
+            self.images[get_chart_name(chart["title"])] = png
+            if chart["title"] in cache_keys:
+                self.cache.put(cache_keys[chart["title"]], png)
 
-    def build(self, charts):
-        """Build charts for given configuration"""
         for chart in charts:
-            if chart["type"] == "pie":
-                self.plot_pie_chart(
-                    chart["title"], chart["labels"], chart["sizes"], chart["colors"]
-                )
-            elif chart["type"] == "bar":
-                self.plot_bar_chart(
-                    chart["title"],
-                    chart["labels"],
-                    chart["sizes"],
-                    chart["xlabel"],
-                    chart["ylabel"],
-                    chart["colors"],
-                )
             self.logger.info(
-                f"Downloading chart {chart['title']:<27} .................. [Complete]"
+                "Downloading chart %-27s .................. [Complete] %.3fs",
+                chart["title"],
+                render_times[chart["title"]],
             )
+        return {chart["title"]: render_times[chart["title"]] for chart in charts}
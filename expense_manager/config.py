@@ -37,6 +37,11 @@ EXPENSES = {
     Expenses.ENTERTAINMENT: _ExpenseDefinition(name="entertainment", percent=2),
 }
 
+INCOME_CATEGORIES = ["salary"]
+
+# fixed dictionary of expense categories, lower case
+CATEGORIES = sorted([expense.value for expense in Expenses] + INCOME_CATEGORIES)
+
 FILES = {
     "transaction_file": "transaction_data_{date_mmyyyy}.csv",
     "pdf_file": "monthly_expense_report_{date_mmyyyy}.pdf",
@@ -49,6 +54,28 @@ URLS = {
     "latest_symbol": "/latest?base={base}&to={target}",
     "history_base": "/{YYYYMMDD}?base={base}",
     "history_symbol": "/{YYYYMMDD}?base={base}&to={target}",
+    "history_range_base": "/{start}..{end}?base={base}",
+    "history_range_symbol": "/{start}..{end}?base={base}&to={target}",
+}
+
+HTTP = {
+    "connect_timeout": 3.05,
+    "read_timeout": 10,
+    "retries": 3,
+    "backoff_factor": 0.5,
+    "status_forcelist": [429, 500, 502, 503, 504],
+    "pool_maxsize": 10,
+}
+
+# items shown of every collection of summarized log payloads
+LOGGING = {"max_items": 5}
+
+# rolling windows in months, rise over the rolling average reported as insight
+TRENDS = {"windows": [3, 6, 12], "threshold": 0.25}
+
+WATCH = {
+    "interval": 2.0,
+    "debounce": 1.0,
 }
 
 charts_config = [
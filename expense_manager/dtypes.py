@@ -0,0 +1,117 @@
+from typing import TYPE_CHECKING, List
+from expense_manager.config import CATEGORIES
+
+if TYPE_CHECKING:
+    from pandas import CategoricalDtype, DataFrame, Series
+
+
+def normalize_categories(categories: "Series") -> "Series":
+    """This function strips and lower-cases expense categories, missing stay missing"""
+    return categories.astype(str).str.strip().str.lower().where(categories.notna())
+
+
+def get_category_dtype(*extra_categories) -> "CategoricalDtype":
+    """
+    This function gets categorical dtype of expense categories, the fixed
+    categories of config.CATEGORIES extended by unknown categories in sorted
+    order, so that codes order like the category strings
+    Args:
+        *extra_categories: Categories found in transactions
+
+    Returns:
+        CategoricalDtype of expense categories
+    """
+    from pandas import CategoricalDtype
+
+    categories = set(CATEGORIES)
+    for extra in extra_categories:
+        categories.update(extra)
+    return CategoricalDtype(sorted(categories))
+
+
+def downcast_amount(amount: "Series") -> "Series":
+    """
+    This function casts whole amounts to the smallest integer dtype,
+    fractional amounts stay float64 since sums of float32 lose precision
+    Args:
+        amount: Transaction amounts
+
+    Returns:
+        Downcast amounts
+    """
+    from pandas import to_numeric
+
+    if amount.empty or amount.isna().any():
+        return amount
+    if amount.dtype.kind == "f" and not (amount % 1 == 0).all():
+        return amount.astype("float64")
+    return to_numeric(amount, downcast="integer")
+
+
+def is_compact_category(categories: "Series") -> bool:
+    """This function checks categories are a Categorical of normalized categories"""
+    from pandas import Series
+
+    if categories.dtype != "category":
+        return False
+    dictionary = Series(categories.cat.categories, dtype=object)
+    return categories.dtype == get_category_dtype(dictionary) and (
+        normalize_categories(dictionary).equals(dictionary)
+    )
+
+
+def to_compact(df_exp: "DataFrame") -> "DataFrame":
+    """
+    This function normalizes expense categories into a Categorical and
+    downcasts amount, groupby on the category codes is much cheaper than
+    on Python strings
+    Args:
+        df_exp: Transactions with columns expense_category and amount
+
+    Returns:
+        Compact transactions
+    """
+    import numpy
+    from pandas import Categorical, Series, factorize
+
+    if not is_compact_category(df_exp["expense_category"]):
+        # normalize distinct categories only, not every transaction
+        codes, uniques = factorize(df_exp["expense_category"])
+        uniques = normalize_categories(Series(uniques, dtype=object))
+        category_dtype = get_category_dtype(uniques.unique())
+        mapping = category_dtype.categories.get_indexer(uniques)
+        df_exp["expense_category"] = Categorical.from_codes(
+            numpy.where(codes < 0, -1, mapping[codes]), dtype=category_dtype
+        )
+    df_exp["amount"] = downcast_amount(df_exp["amount"])
+    return df_exp
+
+
+def concat_transactions(frames: List["DataFrame"]) -> "DataFrame":
+    """
+    This function concatenates compact transactions, categories of every
+    frame are unified so that expense_category stays a Categorical
+    Args:
+        frames: Compact transactions
+
+    Returns:
+        Concatenated transactions
+    """
+    from pandas import concat
+
+    frames = [
+        frame if frame["expense_category"].dtype == "category" else to_compact(frame)
+        for frame in frames
+    ]
+    category_dtype = get_category_dtype(
+        *[frame["expense_category"].cat.categories for frame in frames]
+    )
+    return concat(
+        [
+            frame.assign(
+                expense_category=frame["expense_category"].astype(category_dtype)
+            )
+            for frame in frames
+        ],
+        ignore_index=True,
+    )
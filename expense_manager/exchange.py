@@ -1,7 +1,86 @@
-from typing import Set
-import requests
-from expense_manager.config import URLS, get_url
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import TYPE_CHECKING, Dict, Iterable, List, Set, Tuple
+from expense_manager.cache import RatesCache
+from expense_manager.config import HTTP, URLS
 from expense_manager.exception import ExchangeAPIError, ExchangeAPIValueError
+from expense_manager.instrumentation import instrument
+from expense_manager.utils import Summary
+
+if TYPE_CHECKING:
+    import requests
+    from pandas import DataFrame
+
+_session = None
+
+
+def create_session(
+    retries: int = HTTP["retries"],
+    backoff_factor: float = HTTP["backoff_factor"],
+    pool_maxsize: int = HTTP["pool_maxsize"],
+) -> "requests.Session":
+    """
+    This function creates HTTP session with connection pool and bounded retries
+    Args:
+        retries: Number of retries of failed requests
+        backoff_factor: Backoff factor between retries in seconds
+        pool_maxsize: Number of connections kept alive per host
+
+    Returns:
+        requests.Session object
+    """
+    # requests is imported on first API call, not at package import
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=HTTP["status_forcelist"],
+        allowed_methods=["GET"],
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_maxsize=pool_maxsize)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session() -> "requests.Session":
+    """This function returns HTTP session shared in the process"""
+    global _session
+    if _session is None:
+        _session = create_session()
+    return _session
+
+
+def _request(
+    url: str, transport: "requests.Session" = None, timeout: Tuple = None
+) -> Dict:
+    """
+    This function gets JSON response of url
+    Args:
+        url: API url
+        transport: HTTP session, defaults to shared session
+        timeout: (connect, read) timeout in seconds
+
+    Returns:
+        JSON response
+    """
+    from requests import RequestException
+
+    transport = transport or get_session()
+    timeout = timeout or (HTTP["connect_timeout"], HTTP["read_timeout"])
+    try:
+        response = transport.get(url, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+    except RequestException as exc:
+        raise ExchangeAPIError(f"API request {url} failed: {exc}") from exc
 
 
 class CurrencyRatesAPI:
@@ -14,11 +93,19 @@ class CurrencyRatesAPI:
         base_currency: str = None,
         target_currency: str = None,
         date_yyyymmdd: str = None,
+        cache: RatesCache = None,
+        transport: "requests.Session" = None,
+        base_url: str = URLS["base_url"],
+        timeout: Tuple = None,
         **kwargs,
     ):
         """
 
         Args:
+            cache: Persistent exchange rates cache
+            transport: HTTP session, defaults to shared pooled session
+            base_url: API base url, e.g. of a local stub server
+            timeout: (connect, read) timeout in seconds
             **kwargs:
         """
         self.logger = None
@@ -27,7 +114,11 @@ class CurrencyRatesAPI:
         self.target_currency = target_currency
         self.date_yyyymmdd = date_yyyymmdd
         self.is_historical = is_historical
-        self.supported_currency = CurrencyRatesAPI.get_currency_list()
+        self.cache = cache
+        self.transport = transport
+        self.base_url = base_url
+        self.timeout = timeout
+        self._supported_currency = None
         for _key, _value in kwargs.items():
             setattr(self, _key, _value)
 
@@ -42,25 +133,46 @@ class CurrencyRatesAPI:
                 f"Invalid url {self.url}. Allowed values are {URLS.keys()}"
             )
 
-        if self.base_currency:
-            if self.base_currency not in self.supported_currency:
-                raise ExchangeAPIValueError(
-                    f"Invalid Currency {self.url}. Allowed values are {self.supported_currency}"
-                )
+    @property
+    def supported_currency(self) -> Set:
+        """This method gets currency list on first use, not on construction"""
+        if self._supported_currency is None:
+            self._supported_currency = CurrencyRatesAPI.get_currency_list(
+                self.cache, self.transport, self.base_url, self.timeout
+            )
+        return self._supported_currency
 
-        if self.target_currency:
-            if self.target_currency not in self.supported_currency:
+    def _validate_currencies(self) -> None:
+        """This method checks base and target currency against currency list"""
+        for currency in [self.base_currency, self.target_currency]:
+            if currency and currency not in self.supported_currency:
                 raise ExchangeAPIValueError(
-                    f"Invalid Currency {self.url}. Allowed values are {self.supported_currency}"
+                    f"Invalid Currency {currency}. Allowed values are {self.supported_currency}"
                 )
 
     @staticmethod
-    def get_currency_list() -> Set:
-        url = get_url("base_url", "currencies")
-        return set(requests.get(url).json().keys())
+    def get_currency_list(
+        cache: RatesCache = None,
+        transport: "requests.Session" = None,
+        base_url: str = URLS["base_url"],
+        timeout: Tuple = None,
+    ) -> Set:
+        if cache:
+            currencies = cache.get_currencies()
+            if currencies is not None:
+                return currencies
+            if cache.offline:
+                raise ExchangeAPIError("Currency list is not cached in offline mode")
+
+        currencies = _request(base_url + URLS["currencies"], transport, timeout)
+        if cache:
+            cache.set_currencies(currencies)
+        return set(currencies.keys())
 
-    def get_exchange_rates(self):
-        _url = get_url("base_url", self.url)
+    @instrument()
+    def get_exchange_rates(self) -> Dict:
+        self._validate_currencies()
+        _url = self.base_url + URLS[self.url]
 
         # latest request
         if not self.is_historical:
@@ -78,10 +190,218 @@ class CurrencyRatesAPI:
                 )
             else:
                 url = _url.format(base=self.base_currency, YYYYMMDD=self.date_yyyymmdd)
+        date = self.date_yyyymmdd if self.is_historical else None
+        if self.cache:
+            rates = self.cache.get(self.base_currency, self.target_currency, date)
+            if rates is not None:
+                self.logger.info("Cached URL: %s", url)
+                return rates
+            if self.cache.offline:
+                raise ExchangeAPIError(f"Rates of {url} are not cached in offline mode")
+
         try:
-            self.logger.info(f"URL: {url}")
-            response = requests.get(url)
-            self.logger.info(f"API Response: {response.json()}")
+            self.logger.info("URL: %s", url)
+            rates = _request(url, self.transport, self.timeout)
+            # payloads are summarized, the full payload only at DEBUG level
+            self.logger.info("API Response: %s", Summary(rates))
+            self.logger.debug("API Response payload: %s", rates)
         except ExchangeAPIError as exc:
-            self.logger.error(f"API error {exc}")
+            self.logger.error("API error %s", exc)
             raise
+
+        if self.cache:
+            self.cache.set(rates, self.base_currency, self.target_currency, date)
+        return rates
+
+    @instrument(rows=lambda rates, *args: len(rates))
+    def get_exchange_rates_range(self, start_date: str, end_date: str) -> "DataFrame":
+        """
+        This method gets exchange rates of a date range in a single request.
+        Weekends and holidays are filled forward from the last published rate.
+        Args:
+            start_date: First date of range (yyyy-mm-dd)
+            end_date: Last date of range (yyyy-mm-dd)
+
+        Returns:
+            Rates indexed by every date of range with a column per target currency
+        """
+        self._validate_currencies()
+        url_name = (
+            "history_range_symbol" if self.target_currency else "history_range_base"
+        )
+        url = (self.base_url + URLS[url_name]).format(
+            start=start_date,
+            end=end_date,
+            base=self.base_currency,
+            target=self.target_currency,
+        )
+
+        # ranges ending today or later can still receive new rates
+        range_key = f"{start_date}..{end_date}"
+        is_cacheable = self.cache and end_date < date.today().isoformat()
+        rates = (
+            self.cache.get(self.base_currency, self.target_currency, range_key)
+            if is_cacheable
+            else None
+        )
+        if rates is None:
+            if self.cache and self.cache.offline:
+                raise ExchangeAPIError(f"Rates of {url} are not cached in offline mode")
+            self.logger.info("URL: %s", url)
+            rates = _request(url, self.transport, self.timeout)
+            self.logger.info("API Response: %s", Summary(rates))
+            if is_cacheable:
+                self.cache.set(
+                    rates, self.base_currency, self.target_currency, range_key
+                )
+
+        return self.to_rate_table(rates, start_date, end_date)
+
+    @staticmethod
+    def to_rate_table(rates: Dict, start_date: str, end_date: str) -> "DataFrame":
+        """
+        This method converts range response to a date-indexed rate table
+        Args:
+            rates: Range response of the API
+            start_date: First date of range (yyyy-mm-dd)
+            end_date: Last date of range (yyyy-mm-dd)
+
+        Returns:
+            Rates indexed by every date of range with a column per target currency
+        """
+        from pandas import DataFrame, DatetimeIndex, date_range
+
+        rate_table = DataFrame.from_dict(rates["rates"], orient="index")
+        rate_table.index = DatetimeIndex(rate_table.index, name="date")
+        rate_table = rate_table.sort_index()
+
+        # the first published rate may precede the range (start on a holiday)
+        first_date = min(rate_table.index.min(), DatetimeIndex([start_date])[0])
+        return (
+            rate_table.reindex(date_range(first_date, end_date, name="date"))
+            .ffill()
+            .loc[start_date:end_date]
+        )
+
+
+class AsyncCurrencyRatesAPI:
+    """Asyncio client of currency exchange rates API"""
+
+    def __init__(
+        self,
+        log,
+        max_concurrency: int = HTTP["pool_maxsize"],
+        cache: RatesCache = None,
+        transport: "requests.Session" = None,
+        base_url: str = URLS["base_url"],
+        timeout: Tuple = None,
+    ):
+        """
+        This class fetches many base/target/date rates concurrently. Requests
+        run on the pooled HTTP session in a thread pool of max_concurrency
+        threads, so the limit is not capped by the default executor of the
+        event loop. Cache lookups run in worker threads too, never on the
+        event loop, and duplicate in-flight requests share one API call.
+        Args:
+            log: logger object
+            max_concurrency: Maximum number of concurrent API requests
+            cache: Persistent exchange rates cache
+            transport: HTTP session, defaults to shared pooled session
+            base_url: API base url, e.g. of a local stub server
+            timeout: (connect, read) timeout in seconds
+        """
+        self.logger = log
+        self.max_concurrency = max_concurrency
+        self.cache = cache
+        self.transport = transport
+        self.base_url = base_url
+        self.timeout = timeout
+        self._semaphore = None
+        self._semaphore_loop = None
+        self._executor = None
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    def get_url(self, base: str, target: str = None, date_yyyymmdd: str = None):
+        """This method formats url of config.URLS for base, target and date"""
+        url_name = "history" if date_yyyymmdd else "latest"
+        url_name += "_symbol" if target else "_base"
+        return (self.base_url + URLS[url_name]).format(
+            base=base, target=target, YYYYMMDD=date_yyyymmdd
+        )
+
+    async def _fetch(self, url: str) -> Dict:
+        """This method requests url in a worker thread under concurrency limit"""
+        # asyncio primitives are bound to the event loop they are used in
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency, thread_name_prefix="rates"
+            )
+        async with self._semaphore:
+            self.logger.info("URL: %s", url)
+            return await loop.run_in_executor(
+                self._executor,
+                functools.partial(_request, url, self.transport, self.timeout),
+            )
+
+    async def get_exchange_rates(
+        self, base: str, target: str = None, date_yyyymmdd: str = None
+    ) -> Dict:
+        """
+        This method gets exchange rates of base currency
+        Args:
+            base: Base currency
+            target: Target currency, None for all currencies
+            date_yyyymmdd: Date of historical rates, None for latest rates
+
+        Returns:
+            API response
+        """
+        if self.cache:
+            # SQLite calls would block every request of the event loop
+            rates = await asyncio.to_thread(self.cache.get, base, target, date_yyyymmdd)
+            if rates is not None:
+                return rates
+            if self.cache.offline:
+                raise ExchangeAPIError(
+                    f"Rates of {base}/{target} are not cached in offline mode"
+                )
+
+        # coalesce duplicate in-flight requests into one API call
+        url = self.get_url(base, target, date_yyyymmdd)
+        if url not in self._in_flight:
+            task = asyncio.ensure_future(self._fetch(url))
+            task.add_done_callback(lambda _: self._in_flight.pop(url, None))
+            self._in_flight[url] = task
+        rates = await asyncio.shield(self._in_flight[url])
+
+        if self.cache:
+            await asyncio.to_thread(self.cache.set, rates, base, target, date_yyyymmdd)
+        return rates
+
+    async def gather_exchange_rates(self, rate_requests: Iterable[Tuple]) -> List[Dict]:
+        """
+        This method gets exchange rates of many requests concurrently
+        Args:
+            rate_requests: (base, target, date_yyyymmdd) tuples, target and
+                date may be None
+
+        Returns:
+            API responses in the order of requests
+        """
+        return await asyncio.gather(
+            *[self.get_exchange_rates(*rate_request) for rate_request in rate_requests]
+        )
+
+    def fetch_all(self, rate_requests: Iterable[Tuple]) -> List[Dict]:
+        """This method runs gather_exchange_rates from synchronous code"""
+        return asyncio.run(self.gather_exchange_rates(rate_requests))
+
+    def close(self) -> None:
+        """This method shuts down the request threads"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
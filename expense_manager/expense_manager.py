@@ -1,7 +1,16 @@
+import json
 import logging
 from typing import Dict, List, Tuple
+import numpy
 import pandas
-from pandas import DataFrame, read_csv
+from pandas import DataFrame, Period, merge_asof, read_csv
+from expense_manager.cache import TransactionCache
+from expense_manager.dtypes import concat_transactions, normalize_categories, to_compact
+from expense_manager.instrumentation import instrument
+from expense_manager.store import TransactionStore
+from expense_manager.summary import MonthlySummary, MonthType
+from expense_manager.trends import ExpenseTrends
+from expense_manager.utils import save_json
 
 # pandas settings
 pandas.options.mode.copy_on_write = True
@@ -15,6 +24,13 @@ class ExpenseManager:
         log: logging.Logger,
         savings_goal: int = None,
         expenses_goal: dict = None,
+        chunk_size: int = None,
+        cache_dir: str = None,
+        rebuild_cache: bool = False,
+        currency: str = None,
+        rates: DataFrame = None,
+        store_file: str = None,
+        checkpoint_file: str = None,
     ):
         """
         This is base class of ExpenseManager App
@@ -24,18 +40,83 @@ class ExpenseManager:
             log: logger object
             savings_goal: Monthly savings goal
             expenses_goal: Monthly expense goal by category
+            chunk_size: Stream the expense file in chunks of given rows
+            cache_dir: Directory of the typed columnar cache of expense file
+            rebuild_cache: Force rebuild of the columnar cache
+            currency: Reporting currency of amounts
+            rates: Date-indexed rates (units of currency column per one
+                reporting currency) used to convert amounts during load
+            store_file: SQLite transaction store, the expense file is ingested
+                incrementally and aggregated by indexed queries
+            checkpoint_file: Restore the summary and appended batches from this
+                checkpoint instead of loading the expense file
         """
         self.logger = log
         self.month = None
+        self.summary = None
         self.monthly_summary = None
         self.monthly_income = None
         self.monthly_savings = None
         self.monthly_expenses = None
         self.sort_column = sort_column
         self.expense_file = expense_file
+        self.chunk_size = chunk_size
+        self.cache = TransactionCache(cache_dir, log) if cache_dir else None
+        self.rebuild_cache = rebuild_cache
+        self.store = TransactionStore(store_file, log) if store_file else None
+        self.currency = currency
+        self.rates = rates
         self._savings_goal = savings_goal
         self._expenses_goal = expenses_goal
-        self.df_expense = self.load_data()
+        self.report_month = None
+        self._is_sort_requested = False
+        # a summary restored without the expense file cannot be recalculated
+        self._is_ledger_loaded = checkpoint_file is None
+        if checkpoint_file is None:
+            self.df_expense = self.load_data()
+        else:
+            self.df_expense = None
+            self.load_checkpoint(checkpoint_file)
+
+    @property
+    def df_expense(self) -> DataFrame:
+        """
+        This method returns transactions including appended batches,
+        sorted by sort column once sort_data was requested
+        """
+        df_expense = self._get_transactions()
+        if self._is_sort_requested and not self._is_sorted and df_expense is not None:
+            df_expense.sort_values(by=self.sort_column, kind="stable", inplace=True)
+            self._is_sorted = True
+            self.logger.info("Expense file sorted by column %s", self.sort_column)
+        return df_expense
+
+    @df_expense.setter
+    def df_expense(self, df_expense: DataFrame):
+        """
+        This method replaces transactions, categories are normalized and
+        the summary is recalculated on next use
+        """
+        if not self._is_ledger_loaded and self.summary is not None:
+            raise ValueError("Summary restored from a checkpoint cannot be reset")
+        if df_expense is not None:
+            # the caller's frame is left as is, compacted columns replace the copy's
+            df_expense = to_compact(df_expense.copy(deep=False))
+        self._df_expense = df_expense
+        self._appended = []
+        # batches appended since the expense file was loaded, saved in checkpoints
+        self._appended_batches = []
+        self._is_sorted = False
+        self.summary = None
+
+    def _get_transactions(self) -> DataFrame:
+        """This method returns transactions including appended batches in any order"""
+        if self._appended:
+            frames = [] if self._df_expense is None else [self._df_expense]
+            self._df_expense = concat_transactions(frames + self._appended)
+            self._appended = []
+            self._is_sorted = False
+        return self._df_expense
 
     @property
     def savings_goal(self) -> int:
@@ -53,78 +134,295 @@ class ExpenseManager:
     def expenses_goal(self, new_expenses_goal):
         self._expenses_goal.update(**new_expenses_goal)
 
+    @instrument(rows=lambda df_exp, self: len(df_exp))
     def load_data(self) -> DataFrame:
         """
         This method load the monthly expense file during initialization.
+        When chunk_size is set, the file is streamed and folded into
+        per-month/per-category sums instead of being loaded in full.
+        When store_file is set, the file is ingested into the transaction store
+        and aggregated the same way in SQL.
+        When cache_dir is set, the parsed file is read from its columnar cache.
+        When rates are set, amounts are converted to the reporting currency,
+        without rates amounts in other currencies are rejected.
+        Categories are normalized into a Categorical and amount is downcast.
         Returns:
             None
         """
         try:
-            df_exp = read_csv(self.expense_file, parse_dates=["date"])
-            required_columns = {"date", "expense_category", "amount"}
-            if required_columns.issubset(df_exp.columns):
-                self.logger.info("Expense file load complete.")
-                return df_exp
-            else:
-                raise ValueError(
-                    f"Expense file must contains columns {required_columns}"
+            if self.chunk_size:
+                df_exp = self._stream_data()
+            elif self.store:
+                self.store.ingest(self.expense_file)
+                df_exp = self.store.get_monthly_aggregates(
+                    source_file=self.expense_file
                 )
+            elif self.cache:
+                df_exp = self._load_cached_data()
+            else:
+                df_exp = read_csv(self.expense_file, parse_dates=["date"])
+                self._validate_columns(df_exp)
+            # streamed chunks are converted as they are folded
+            if not (self.chunk_size or self.store):
+                if self.rates is not None:
+                    df_exp = self.convert_amounts(df_exp, self.rates, self.currency)
+                else:
+                    self._validate_currency(df_exp)
+            df_exp = to_compact(df_exp)
+            self.logger.info("Expense file load complete.")
+            return df_exp
         except Exception as exc:
             self.logger.error("Expense file load failed: %s", exc)
             raise
 
-    def sort_data(self) -> None:
-        """This method sorts dataframe for given column"""
-        if self.df_expense is not None:
-            self.df_expense.sort_values(by=self.sort_column, inplace=True)
-            self.logger.info(f"Expense file sorted by column {self.sort_column}")
-        else:
-            self.logger.warning("Expense file is empty, Skipping sort.")
+    @staticmethod
+    def _validate_columns(df_exp: DataFrame) -> None:
+        """This method checks the required columns of expense file"""
+        required_columns = {"date", "expense_category", "amount"}
+        if not required_columns.issubset(df_exp.columns):
+            raise ValueError(f"Expense file must contains columns {required_columns}")
 
-    def calculate_monthly_summary(self) -> Tuple[str, DataFrame, float, float, float]:
-        """This method calculates monthly summary"""
+    def _validate_currency(self, df_exp: DataFrame) -> None:
+        """This method checks amounts in other currencies are not summed unconverted"""
+        if "currency" not in df_exp.columns:
+            return
+        currencies = set(df_exp["currency"].dropna().astype(str)) - {self.currency}
+        if currencies:
+            raise ValueError(
+                f"Exchange rates to {self.currency} required for currency "
+                f"{sorted(currencies)}"
+            )
 
-        # Convert date (yyyy-mm-dd) to Period of Month (yyyy-mm)
-        self.df_expense["month"] = self.df_expense["date"].dt.to_period("M")
+    def _load_cached_data(self) -> DataFrame:
+        """
+        This method loads the expense file from its columnar cache,
+        the cache is (re)built when missing, stale or rebuild is forced.
+        Returns:
+            Typed expenses
+        """
+        df_exp = None if self.rebuild_cache else self.cache.load(self.expense_file)
+        if df_exp is None:
+            df_exp = read_csv(self.expense_file, parse_dates=["date"])
+            self._validate_columns(df_exp)
+            df_exp = self.cache.to_typed(df_exp)
+            self.cache.save(self.expense_file, df_exp)
+        return df_exp
 
-        # Aggregate amount by expense_category and month
-        self.monthly_summary = (
-            self.df_expense.groupby(["month", "expense_category"])["amount"]
-            .sum()
+    def _stream_data(self) -> DataFrame:
+        """
+        This method streams the expense file in chunks and folds every chunk
+        into running sums of amount by month and expense_category, so that
+        peak memory is bounded by chunk_size rather than by the file size.
+        Returns:
+            Aggregated expenses, one row per month and expense category
+            dated on the first day of the month
+        """
+        running_sums = None
+        with read_csv(
+            self.expense_file, parse_dates=["date"], chunksize=self.chunk_size
+        ) as reader:
+            for chunk_no, chunk in enumerate(reader):
+                if chunk_no == 0:
+                    self._validate_columns(chunk)
+                if chunk.empty:
+                    continue
+                if "currency" in chunk.columns:
+                    if self.rates is None:
+                        raise ValueError("Streaming currency column requires rates")
+                    chunk = self.convert_amounts(chunk, self.rates, self.currency)
+                # fold categories of any casing into one running sum
+                chunk["expense_category"] = normalize_categories(
+                    chunk["expense_category"]
+                )
+                chunk_sums = chunk.groupby(
+                    [chunk["date"].dt.to_period("M"), "expense_category"]
+                )["amount"].sum()
+                if running_sums is not None:
+                    chunk_sums = (
+                        pandas.concat([running_sums, chunk_sums])
+                        .groupby(level=[0, 1])
+                        .sum()
+                    )
+                running_sums = chunk_sums
+                self.logger.debug("Expense file chunk %s folded.", chunk_no)
+
+        if running_sums is None:
+            return DataFrame(columns=["date", "expense_category", "amount"])
+
+        running_sums.index.names = ["date", "expense_category"]
+        df_exp = running_sums.reset_index()
+        df_exp["date"] = df_exp["date"].dt.to_timestamp()
+        return df_exp
+
+    @staticmethod
+    def convert_amounts(
+        df_exp: DataFrame, rates: DataFrame, currency: str
+    ) -> DataFrame:
+        """
+        This method converts amounts of the currency column to reporting currency
+        in one vectorized operation, each transaction takes the last published
+        rate on or before its date (as-of merge). Transactions without currency
+        are in reporting currency, foreign transactions after the last date of
+        the rates are rejected.
+        Args:
+            df_exp: Transactions with optional currency column
+            rates: Date-indexed rates with a column per currency, units of
+                the currency per one reporting currency
+            currency: Reporting currency
+
+        Returns:
+            Transactions with amounts in reporting currency
+        """
+        if "currency" not in df_exp.columns:
+            return df_exp
+
+        # Rates in long format, one row per date and currency
+        long_rates = (
+            rates.rename_axis(index="date", columns="currency")
+            .stack()
+            .rename("rate")
             .reset_index()
         )
+        long_rates["date"] = long_rates["date"].astype(df_exp["date"].dtype)
 
-        # Calculate total income
-        self.monthly_income = (
-            self.monthly_summary["amount"]
-            .apply(lambda amt: amt if amt > 0 else 0)
-            .sum()
-        )
+        # As-of merge needs transactions in date order, keep original order aside
+        transactions = df_exp.assign(
+            currency=df_exp["currency"].fillna(currency).astype(str),
+            _row=numpy.arange(len(df_exp)),
+        ).sort_values("date", kind="stable")
+        transactions = merge_asof(
+            transactions,
+            long_rates.sort_values("date"),
+            on="date",
+            by="currency",
+            direction="backward",
+        ).sort_values("_row")
+
+        # Reporting currency converts at par
+        is_foreign = (transactions["currency"] != currency).to_numpy()
+        rate = transactions["rate"].to_numpy()
+        missing = is_foreign & numpy.isnan(rate)
+        if missing.any():
+            raise ValueError(
+                "Exchange rates missing for currency "
+                f"{sorted(set(transactions['currency'].to_numpy()[missing]))}"
+            )
+        # as-of merge would carry the last rate forward indefinitely
+        last_date = long_rates["date"].max()
+        is_after_rates = is_foreign & (transactions["date"] > last_date).to_numpy()
+        if is_after_rates.any():
+            raise ValueError(
+                f"Exchange rates missing after {last_date.date()} for "
+                f"{is_after_rates.sum()} transactions"
+            )
 
-        # Calculate total expenses
-        self.monthly_expenses = abs(
-            self.monthly_summary["amount"]
-            .apply(lambda amt: amt if amt < 0 else 0)
-            .sum()
+        df_exp = df_exp.assign(currency=currency)
+        df_exp["amount"] = numpy.round(
+            df_exp["amount"].to_numpy() / numpy.where(is_foreign, rate, 1), 2
         )
+        return df_exp
+
+    def convert_currency(self, rates: DataFrame, currency: str) -> None:
+        """
+        This method converts loaded transactions to reporting currency
+        Args:
+            rates: Date-indexed rates with a column per currency
+            currency: Reporting currency
+        """
+        if self.chunk_size:
+            raise ValueError("Streamed expenses are converted during load only")
+        if self.store:
+            raise ValueError("Transaction store keeps amounts of one currency only")
+        self.currency = currency
+        self.rates = rates
+        self.df_expense = self.convert_amounts(self.df_expense, rates, currency)
+        self.logger.info("Expenses converted to %s", currency)
+
+    @instrument()
+    def sort_data(self) -> None:
+        """
+        This method requests transactions sorted by sort column. Summaries
+        do not depend on row order, so the sort is deferred until
+        df_expense is read
+        """
+        if self._df_expense is not None:
+            self._is_sort_requested = True
+            self.logger.info(
+                "Expense file sort by column %s deferred", self.sort_column
+            )
+        else:
+            self.logger.warning("Expense file is empty, Skipping sort.")
 
-        # Calculate monthly savings
-        self.monthly_savings = self.monthly_income - self.monthly_expenses
+    def get_largest_expenses(self, n: int = 10, month: MonthType = None) -> DataFrame:
+        """
+        This method selects the largest expenses without sorting every transaction.
+        Streamed and stored expenses are monthly totals by category, so they
+        have no single expenses to select
+        Args:
+            n: Number of expenses
+            month: Period or string of month (yyyy-mm), defaults to every month
 
-        # Alter formats of Monthly Summary DataFrame
-        # Toggle lower case for expense category
-        self.monthly_summary["expense_category"] = self.monthly_summary[
-            "expense_category"
-        ].apply(str.lower)
+        Returns:
+            n largest expenses in descending order of absolute amount
+        """
+        if self.chunk_size:
+            raise ValueError("Streamed expenses keep monthly totals, not expenses")
+        if self.store:
+            raise ValueError("Transaction store keeps monthly totals, not expenses")
+        if not self._is_ledger_loaded:
+            raise ValueError("Checkpoint keeps monthly totals, not expenses")
+        df_expense = self._get_transactions()
+        if month is not None:
+            dates = df_expense["date"].to_numpy().astype("datetime64[M]")
+            df_expense = df_expense[dates == numpy.datetime64(str(month), "M")]
+        # expenses are negative, the largest are the smallest amounts
+        largest = df_expense[df_expense["amount"] < 0].nsmallest(n, "amount")
+        amount = largest["amount"]
+        if amount.dtype.kind == "i":
+            # minimum of a downcast integer (-128 of int8) has no positive value
+            amount = amount.astype("int64")
+        return largest.assign(amount=amount.abs())
 
-        # Remove negative signs in monthly summary
-        self.monthly_summary["amount"] = self.monthly_summary["amount"].apply(abs)
+    @instrument(rows=lambda _, self: len(self._get_transactions()))
+    def calculate_summary(self) -> MonthlySummary:
+        """
+        This method calculates income, expenses, savings, ratio and category
+        breakdown of every month in the expense file in a single pass
+        Returns:
+            MonthlySummary object indexed by month
+        """
+        if not self._is_ledger_loaded:
+            raise ValueError(
+                "Summary restored from a checkpoint cannot be recalculated"
+            )
+        self.summary = MonthlySummary.from_transactions(self._get_transactions())
+        return self.summary
 
-        # Get expense month in format MON-YYYY
-        self.month = self.monthly_summary.month[0].strftime("%b-%Y")
+    @instrument()
+    def calculate_trends(self) -> ExpenseTrends:
+        """
+        This method analyzes trends of every category over the months of the
+        summary, the aggregates are reused and transactions are not reloaded
+        Returns:
+            ExpenseTrends object
+        """
+        summary = self.summary if self.summary is not None else self.calculate_summary()
+        return ExpenseTrends.from_summary(summary)
 
-        # Drop column Month
-        self.monthly_summary.drop("month", axis=1, inplace=True)
+    @instrument()
+    def calculate_monthly_summary(
+        self, month: MonthType = None
+    ) -> Tuple[str, DataFrame, float, float, float]:
+        """
+        This method calculates monthly summary
+        Args:
+            month: Period or string of month (yyyy-mm), defaults to first month
+
+        Returns:
+            report month, category summary, income, expenses and savings
+        """
+        summary = self.summary if self.summary is not None else self.calculate_summary()
+        self._set_month(summary.months[0] if month is None else month)
 
         return (
             self.month,
@@ -134,6 +432,101 @@ class ExpenseManager:
             self.monthly_savings,
         )
 
+    def _set_month(self, month: MonthType) -> None:
+        """This method sets monthly figures of given month from the summary"""
+        self.report_month = Period(month, freq="M")
+
+        # Get expense month in format MON-YYYY
+        self.month = self.summary.get_label(month)
+        # categories in chart order, descending amount
+        self.monthly_summary = self.summary.get_categories(month, by_amount=True)
+        self.monthly_income, self.monthly_expenses, self.monthly_savings, _ = (
+            self.summary.get_totals(month)
+        )
+
+    def append(self, transactions: DataFrame) -> List[Period]:
+        """
+        This method appends late transactions, the batch is folded into the
+        running sums of the summary so income, expenses, savings, ratio and
+        insights of the report month are updated without recalculating the
+        month. Appended transactions are kept in memory, not in the expense file.
+        Args:
+            transactions: Transactions with columns date, expense_category and amount
+
+        Returns:
+            months updated by the batch
+        """
+        self._validate_columns(transactions)
+        transactions = transactions.assign(
+            date=pandas.to_datetime(transactions["date"])
+        )
+        if "currency" in transactions.columns:
+            if self.rates is None:
+                raise ValueError("Appending currency column requires rates")
+            transactions = self.convert_amounts(transactions, self.rates, self.currency)
+        transactions = to_compact(transactions)
+
+        months = []
+        if self.summary is not None:
+            months = self.summary.update(transactions)
+            if self.report_month in months:
+                self._set_month(self.report_month)
+        self._appended.append(transactions)
+        self._appended_batches.append(transactions)
+        self.logger.info("Appended %s transactions", len(transactions))
+        return months
+
+    def save_checkpoint(self, checkpoint_file: str) -> None:
+        """
+        This method saves running sums of the summary and the appended
+        batches to a checkpoint file
+        Args:
+            checkpoint_file: JSON checkpoint file
+        """
+        if self.summary is None:
+            self.calculate_summary()
+        appended = [
+            transactions.assign(
+                date=transactions["date"].dt.strftime("%Y-%m-%d"),
+                expense_category=transactions["expense_category"].astype(object),
+            ).to_dict(orient="records")
+            for transactions in self._appended_batches
+        ]
+        save_json(
+            checkpoint_file,
+            {"summary": self.summary.to_records(), "appended": appended},
+        )
+        self.logger.info("Summary checkpoint saved: %s", checkpoint_file)
+
+    def load_checkpoint(self, checkpoint_file: str) -> MonthlySummary:
+        """
+        This method restores running sums of the summary and the appended
+        batches from a checkpoint file instead of recalculating them from
+        transactions, the loaded transactions are those of the expense file
+        Args:
+            checkpoint_file: JSON checkpoint file
+
+        Returns:
+            MonthlySummary object
+        """
+        with open(checkpoint_file, encoding="utf-8") as file:
+            checkpoint = json.load(file)
+        # checkpoint of MonthlySummary.save holds running sums only
+        if isinstance(checkpoint, list):
+            checkpoint = {"summary": checkpoint, "appended": []}
+        self._appended = [
+            to_compact(
+                DataFrame.from_records(records).assign(
+                    date=lambda df_exp: pandas.to_datetime(df_exp["date"])
+                )
+            )
+            for records in checkpoint["appended"]
+        ]
+        self._appended_batches = list(self._appended)
+        self.summary = MonthlySummary.from_records(checkpoint["summary"])
+        self.logger.info("Summary checkpoint loaded: %s", checkpoint_file)
+        return self.summary
+
     def calculate_ratio(self) -> float:
         """This method calculates and returns expense-to-income ratio in four decimals"""
         if self.monthly_income == 0:
@@ -160,6 +553,7 @@ class ExpenseManager:
             else f"Monthly expense exceeds saving goal by {self.calculate_percent()}"
         )
 
+    @instrument(rows=lambda result, self: len(result[0]))
     def insights(self) -> Tuple[Dict, List]:
         """This method gets insights by comparing expense goals and actual expense"""
         # Localise Variable
@@ -171,28 +565,30 @@ class ExpenseManager:
         _expenses_summary = self.monthly_summary.query('expense_category != "salary"')
 
         # Calculate expense percentage
-        _expenses_summary["expense_percent"] = _expenses_summary["amount"].apply(
-            lambda amt: round((amt / self.monthly_expenses) * 100)
+        _expenses_summary["expense_percent"] = (
+            ((_expenses_summary["amount"] / self.monthly_expenses) * 100)
+            .round()
+            .astype("int64")
         )
 
-        # Convert expense_summary to records
-        expense_records = _expenses_summary.to_dict(orient="records")
+        # Compare expense percentage against expense goals
+        expense_goals = _expenses_summary["expense_category"].map(expenses_goal)
+        exceeded = _expenses_summary[
+            _expenses_summary["expense_percent"] > expense_goals
+        ]
 
         # Get insights
-        for expense_record in expense_records:
-            expense_category = expense_record["expense_category"]
-            expense_percent = expense_record["expense_percent"]
-            expense_goal: str = expenses_goal.get(expense_category)
-
-            # TODO: Implement model for insights
-            if expense_percent > expense_goal:
-                percent_diff = expense_percent - expense_goal
-                insights.append(
-                    insight_msg.format(
-                        goal=expense_goal,
-                        percent=percent_diff,
-                        category=expense_category,
-                    )
+        # TODO: Implement model for insights
+        for expense_category, expense_percent in zip(
+            exceeded["expense_category"], exceeded["expense_percent"]
+        ):
+            expense_goal = expenses_goal[expense_category]
+            insights.append(
+                insight_msg.format(
+                    goal=expense_goal,
+                    percent=expense_percent - expense_goal,
+                    category=expense_category,
                 )
+            )
 
         return _expenses_summary, insights
@@ -0,0 +1,242 @@
+import functools
+import json
+import logging
+import sys
+import threading
+import time
+from typing import Callable, Dict, TypedDict
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+METRIC_PREFIX = "expense_manager_stage"
+
+
+class StageStats(TypedDict):
+    calls: int
+    wall_seconds: float
+    cpu_seconds: float
+    max_wall_seconds: float
+    rows: int
+    peak_rss_bytes: int
+    rss_growth_bytes: int
+
+
+def get_peak_rss() -> int:
+    """This function returns peak resident set size of the process in bytes"""
+    if resource is None:
+        return 0
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+class _Stage:
+    """Timed stage of the pipeline"""
+
+    __slots__ = ["registry", "name", "rows", "_wall", "_cpu", "_peak_rss"]
+
+    def __init__(self, registry: "Instrumentation", name: str):
+        """
+        This class measures wall time, CPU time and peak RSS of a stage,
+        rows processed by the stage are set on the stage by the caller
+        Args:
+            registry: Registry the stage is recorded in
+            name: Stage name
+        """
+        self.registry = registry
+        self.name = name
+        self.rows = None
+
+    def __enter__(self) -> "_Stage":
+        self._peak_rss = get_peak_rss()
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        peak_rss = get_peak_rss()
+        self.registry.record(
+            self.name, wall, cpu, self.rows, peak_rss, peak_rss - self._peak_rss
+        )
+
+
+class _NullStage:
+    """Stage of a disabled registry, measures nothing"""
+
+    __slots__ = ["rows"]
+
+    def __enter__(self) -> "_NullStage":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+
+NULL_STAGE = _NullStage()
+
+
+class Instrumentation:
+    """Registry of wall time, CPU time, peak RSS and rows of pipeline stages"""
+
+    def __init__(self, enabled: bool = False):
+        """
+        This class aggregates measurements of every stage by stage name.
+        A disabled registry hands out a shared no-op stage, so instrumented
+        code costs one attribute check
+        Args:
+            enabled: Record stages
+        """
+        self.enabled = enabled
+        self._stats: Dict[str, StageStats] = {}
+        self._lock = threading.Lock()
+
+    def stage(self, name: str):
+        """
+        This method returns context manager measuring a stage
+        Args:
+            name: Stage name
+
+        Returns:
+            stage, set rows attribute to the number of rows processed
+        """
+        return _Stage(self, name) if self.enabled else NULL_STAGE
+
+    def record(
+        self,
+        name: str,
+        wall: float,
+        cpu: float,
+        rows: int = None,
+        peak_rss: int = 0,
+        rss_growth: int = 0,
+    ) -> None:
+        """
+        This method adds one measurement of a stage
+        Args:
+            name: Stage name
+            wall: Wall time in seconds
+            cpu: CPU time of the process in seconds
+            rows: Rows processed by the stage
+            peak_rss: Peak RSS of the process after the stage in bytes
+            rss_growth: Growth of peak RSS during the stage in bytes
+        """
+        with self._lock:
+            stats = self._stats.setdefault(
+                name,
+                StageStats(
+                    calls=0,
+                    wall_seconds=0.0,
+                    cpu_seconds=0.0,
+                    max_wall_seconds=0.0,
+                    rows=0,
+                    peak_rss_bytes=0,
+                    rss_growth_bytes=0,
+                ),
+            )
+            stats["calls"] += 1
+            stats["wall_seconds"] += wall
+            stats["cpu_seconds"] += cpu
+            stats["max_wall_seconds"] = max(stats["max_wall_seconds"], wall)
+            stats["rows"] += rows or 0
+            stats["peak_rss_bytes"] = max(stats["peak_rss_bytes"], peak_rss)
+            stats["rss_growth_bytes"] += rss_growth
+
+    def summary(self) -> Dict[str, StageStats]:
+        """This method returns measurements of every stage in order of first use"""
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+    def reset(self) -> None:
+        """This method discards every measurement"""
+        with self._lock:
+            self._stats.clear()
+
+    def log_summary(self, log: logging.Logger) -> None:
+        """This method logs measurements of every stage"""
+        for name, stats in self.summary().items():
+            log.info(
+                "Stage %s: calls=%s wall=%.3fs cpu=%.3fs rows=%s "
+                "peak_rss=%.1fMiB (+%.1fMiB)",
+                name,
+                stats["calls"],
+                stats["wall_seconds"],
+                stats["cpu_seconds"],
+                stats["rows"],
+                stats["peak_rss_bytes"] / 2**20,
+                stats["rss_growth_bytes"] / 2**20,
+            )
+
+    def to_json(self) -> str:
+        """This method returns measurements of every stage as JSON"""
+        return json.dumps({"stages": self.summary()}, indent=2)
+
+    def to_prometheus(self) -> str:
+        """This method returns measurements of every stage in Prometheus text format"""
+        metrics = [
+            ("seconds_total", "counter", "Wall time of stage", "wall_seconds"),
+            ("cpu_seconds_total", "counter", "CPU time of stage", "cpu_seconds"),
+            ("calls_total", "counter", "Calls of stage", "calls"),
+            ("rows_total", "counter", "Rows processed by stage", "rows"),
+            ("peak_rss_bytes", "gauge", "Peak RSS after stage", "peak_rss_bytes"),
+        ]
+        summary = self.summary()
+        lines = []
+        for metric, metric_type, help_text, field in metrics:
+            lines.append(f"# HELP {METRIC_PREFIX}_{metric} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{metric} {metric_type}")
+            for name, stats in summary.items():
+                label = name.replace("\\", "\\\\").replace('"', '\\"')
+                lines.append(
+                    f'{METRIC_PREFIX}_{metric}{{stage="{label}"}} {stats[field]}'
+                )
+        return "\n".join(lines) + "\n"
+
+    def save(self, metrics_file: str) -> None:
+        """
+        This method exports measurements of every stage
+        Args:
+            metrics_file: JSON file (.json) or Prometheus text file (any other)
+        """
+        with open(metrics_file, "w", encoding="utf-8") as file:
+            if metrics_file.endswith(".json"):
+                file.write(self.to_json())
+            else:
+                file.write(self.to_prometheus())
+
+
+# registry of the process, disabled until a script enables it
+REGISTRY = Instrumentation()
+
+
+def instrument(name: str = None, rows: Callable = None) -> Callable:
+    """
+    This function decorates a function or method as a stage of REGISTRY
+    Args:
+        name: Stage name, defaults to qualified name of the function
+        rows: Function of the result and arguments returning rows processed
+
+    Returns:
+        decorator
+    """
+
+    def decorator(func: Callable) -> Callable:
+        stage_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not REGISTRY.enabled:
+                return func(*args, **kwargs)
+            with REGISTRY.stage(stage_name) as stage:
+                result = func(*args, **kwargs)
+                if rows is not None:
+                    stage.rows = rows(result, *args, **kwargs)
+            return result
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,273 @@
+import copy
+import logging
+import os
+from concurrent.futures import Executor
+from typing import TYPE_CHECKING, Optional, Tuple
+from expense_manager.cache import ChartCache
+from expense_manager.charts import ExpenseCharts
+from expense_manager.config import (
+    EXPENSES,
+    FILES,
+    charts_config,
+    get_expenses_definition,
+    init_charts_config,
+    init_reports_config,
+    reports_config,
+)
+from expense_manager.instrumentation import instrument
+
+if TYPE_CHECKING:
+    from expense_manager.reports import ExpenseReport, ReportTemplate
+
+CUSTOMER_NAME = "John Walther"
+SAVINGS_GOAL = 150000
+DATE_CHUNK_SIZE = 100_000
+
+
+def get_date_range(
+    transaction_file: str, chunk_size: int = None
+) -> Optional[Tuple[str, str]]:
+    """
+    This function gets first and last date of a transaction file in a chunked
+    pass over its date column, memory is bounded by chunk_size
+    Args:
+        transaction_file: Transaction file
+        chunk_size: Rows of the date column read per chunk, defaults to
+            DATE_CHUNK_SIZE
+
+    Returns:
+        first and last date (yyyy-mm-dd), None when the file has no dates
+    """
+    from pandas import read_csv
+
+    first_dates, last_dates = [], []
+    with read_csv(
+        transaction_file,
+        usecols=["date"],
+        parse_dates=["date"],
+        chunksize=chunk_size or DATE_CHUNK_SIZE,
+    ) as reader:
+        for chunk in reader:
+            dates = chunk["date"].dropna()
+            if not dates.empty:
+                first_dates.append(dates.min())
+                last_dates.append(dates.max())
+    if not first_dates:
+        return None
+    return str(min(first_dates).date()), str(max(last_dates).date())
+
+
+def prepare_report(
+    transaction_file: str,
+    output_path: str,
+    date_mmyyyy: str,
+    sort_column: str,
+    log: logging.Logger,
+    customer_name: str = CUSTOMER_NAME,
+    savings_goal: int = SAVINGS_GOAL,
+    chunk_size: int = None,
+    cache_dir: str = None,
+    rebuild_cache: bool = False,
+    currency: str = reports_config["currency"],
+    rates_api=None,
+    chart_executor: Executor = None,
+    chart_cache: ChartCache = None,
+    save_charts: bool = False,
+    chart_backend: str = "raster",
+    template: "ReportTemplate" = None,
+    store_file: str = None,
+) -> "ExpenseReport":
+    """
+    This function runs load -> summary -> charts for one transaction file
+    and prepares its PDF report
+    Args:
+        transaction_file: Monthly transaction file
+        output_path: Directory of charts and PDF report
+        date_mmyyyy: Transaction month of the file
+        sort_column: Column to sort
+        log: logger object
+        customer_name: Customer name printed on the report
+        savings_goal: Monthly savings goal
+        chunk_size: Stream the transaction file in chunks of given rows
+        cache_dir: Directory of the columnar cache of transaction file
+        rebuild_cache: Force rebuild of the columnar cache
+        currency: Reporting currency
+        rates_api: CurrencyRatesAPI with base currency of reporting currency,
+            required when the transaction file has other currencies
+        chart_executor: Worker pool rendering the charts concurrently
+        chart_cache: Cache of rendered charts
+        save_charts: Write chart PNG files to output path, charts are
+            embedded into the PDF report from memory either way
+        chart_backend: raster (matplotlib PNG) or vector (ReportLab drawing) charts
+        template: Styles of the report, defaults to shared REPORT_TEMPLATE
+        store_file: SQLite transaction store the transaction file is ingested into
+
+    Returns:
+        ExpenseReport object, not built yet
+    """
+    # pandas and reportlab are imported on first run, not at package import
+    from pandas import Period, read_csv
+    from expense_manager.expense_manager import ExpenseManager
+    from expense_manager.reports import ExpenseReport
+
+    pdf_file = os.path.join(output_path, FILES["pdf_file"]).format(
+        date_mmyyyy=date_mmyyyy
+    )
+    log.info("PDF FILE: %s", pdf_file)
+    log.info("TRANSACTION FILE: %s", transaction_file)
+
+    # get expenses goal
+    expenses_goal = get_expenses_definition(EXPENSES)
+    log.info("Expenses Definition: %s", expenses_goal)
+
+    # Amounts are converted during load with rates of every date of the file,
+    # read in a chunked pass over the date column. Without rates_api a file
+    # with other currencies fails to load instead of being summed unconverted
+    is_multi_currency = rates_api is not None and (
+        "currency" in read_csv(transaction_file, nrows=0).columns
+    )
+    rates = None
+    if is_multi_currency:
+        date_range = get_date_range(transaction_file, chunk_size)
+        if date_range is not None:
+            rates = rates_api.get_exchange_rates_range(*date_range)
+
+    # Load and sort data
+    expense = ExpenseManager(
+        expense_file=transaction_file,
+        sort_column=sort_column,
+        log=log,
+        expenses_goal=expenses_goal,
+        chunk_size=chunk_size,
+        cache_dir=cache_dir,
+        rebuild_cache=rebuild_cache,
+        currency=currency,
+        rates=rates,
+        store_file=store_file,
+    )
+    expense.sort_data()
+
+    # Enter Savings Goal
+    expense.savings_goal = savings_goal
+    log.info("Monthly savings Goal: %s", expense.savings_goal)
+
+    # Calculate Monthly Summary of the job month, the report file is named
+    # after it so a file without transactions of the month fails the job
+    month = Period(f"{date_mmyyyy[2:]}-{date_mmyyyy[:2]}", freq="M")
+    months = expense.calculate_summary().months
+    if month not in months:
+        raise ValueError(
+            f"Transaction file has no transactions of {date_mmyyyy}, "
+            f"months: {[str(file_month) for file_month in months]}"
+        )
+    report_month, monthly_summary, monthly_income, monthly_expenses, monthly_savings = (
+        expense.calculate_monthly_summary(month)
+    )
+
+    # Calculate Expense-to-income ratio
+    expense_to_income_ratio = expense.calculate_ratio()
+    total_expense_percent = expense.get_total_expense_percent()
+
+    # Check Savings Goal
+    goal = expense.check_savings_goal()
+
+    # Get Insights
+    expense_summary, insights = expense.insights()
+    insights.insert(0, goal)
+
+    log.info("Report Month: %s", report_month)
+    log.info("Monthly Savings Goal: %s", goal)
+    log.info("Monthly income: %s", monthly_income)
+    log.info("Monthly expenses: %s", monthly_expenses)
+    log.info("Monthly Savings: %s", monthly_savings)
+
+    log.info(
+        "Monthly expense-to-income ratio: %s [%.2f%%]",
+        expense_to_income_ratio,
+        total_expense_percent,
+    )
+    # DataFrames are formatted only when DEBUG records are emitted
+    log.debug("Monthly Summary:\n    %s", monthly_summary)
+    log.debug("Expense Summary:\n    %s", expense_summary)
+    log.info("Insights & Recommendations:")
+    for insight in insights:
+        log.info("%s", insight)
+
+    # Generate Charts
+    log.info("Generating Charts.....")
+    os.makedirs(output_path, exist_ok=True)
+    chart_report = ExpenseCharts(
+        month=report_month,
+        log=log,
+        file_path=output_path if save_charts else None,
+        cache=chart_cache,
+        backend=chart_backend,
+    )
+    # categories are in descending order of amount already, no second sort
+    expense_records = expense_summary.to_dict(orient="records")
+
+    _charts_config = init_charts_config(
+        monthly_income=monthly_income,
+        monthly_expenses=monthly_expenses,
+        monthly_summary=monthly_summary.to_dict(orient="records"),
+        expense_summary=expense_records,
+        charts_=copy.deepcopy(charts_config),
+    )
+    for chart in _charts_config:
+        if "ylabel" in chart:
+            chart.update(ylabel=f"Amount ({currency})")
+
+    chart_report.build(_charts_config, executor=chart_executor)
+
+    # Generate PDF Report
+    pdf_report = ExpenseReport(
+        customer_name=customer_name,
+        report_month=report_month,
+        rpt_file=pdf_file,
+        log=log,
+        images=chart_report.images,
+        template=template,
+        data=init_reports_config(
+            copy.deepcopy(reports_config),
+            [
+                monthly_income,
+                monthly_expenses,
+                total_expense_percent,
+                currency,
+                {item["expense_category"]: item["amount"] for item in expense_records},
+                insights,
+            ],
+        ),
+    )
+    return pdf_report
+
+
+@instrument()
+def run_pipeline(
+    transaction_file: str,
+    output_path: str,
+    date_mmyyyy: str,
+    sort_column: str,
+    log: logging.Logger,
+    **kwargs,
+) -> str:
+    """
+    This function runs load -> summary -> charts -> PDF for one transaction file
+    Args:
+        transaction_file: Monthly transaction file
+        output_path: Directory of charts and PDF report
+        date_mmyyyy: Transaction month of the file
+        sort_column: Column to sort
+        log: logger object
+        **kwargs: Keyword arguments of prepare_report
+
+    Returns:
+        path of PDF report
+    """
+    pdf_report = prepare_report(
+        transaction_file, output_path, date_mmyyyy, sort_column, log, **kwargs
+    )
+    log.info("Generating PDF reports.....")
+    pdf_report.build()
+    log.info("PDF report download ............[complete]")
+    return pdf_report.rpt_file
@@ -1,13 +1,86 @@
+import io
 import logging
 import os
 from datetime import datetime
-from typing import Dict
+from typing import Dict, List, Tuple, Union
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer, Table
+from reportlab.platypus import (
+    Flowable,
+    Image,
+    PageBreak,
+    Paragraph,
+    SimpleDocTemplate,
+    Spacer,
+    Table,
+    TableStyle,
+)
 from expense_manager.exception import ExpenseReportError
+from expense_manager.instrumentation import instrument
+
+
+class ReportTemplate:
+    """Page layout, table and paragraph styles shared by every report"""
+
+    def __init__(self, pagesize: Tuple = A4, margin: float = 0.5 * inch):
+        """
+        This class compiles styles of the report once so that many reports
+        are built without recreating them
+        Args:
+            pagesize: Page size of the report
+            margin: Page margin of every side
+        """
+        self.pagesize = pagesize
+        self.margin = margin
+        self.heading_style = ParagraphStyle(
+            name="Heading4", fontName="Helvetica-Bold", underlineProportion=0.5
+        )
+        self.body_style = ParagraphStyle(name="BodyText")
+        self.header_style = TableStyle(
+            [
+                ("BACKGROUND", (0, 0), (-1, 3), colors.blue),
+                ("TEXTCOLOR", (0, 0), (-1, 3), colors.white),
+                ("ALIGN", (0, 0), (0, 0), "LEFT"),
+                ("ALIGN", (2, 0), (2, 0), "RIGHT"),
+                ("ALIGN", (1, 3), (1, 3), "CENTER"),
+                ("FONTNAME", (0, 0), (-1, 3), "Helvetica-Bold"),
+                ("TOPPADDING", (0, 0), (-1, 3), 0),
+                ("BOTTOMPADDING", (0, 0), (-1, 3), 0),
+                ("LEFTPADDING", (0, 0), (-1, 3), 0),
+                ("RIGHTPADDING", (0, 0), (-1, 3), 0),
+            ]
+        )
+        self.summary_style = TableStyle(
+            [
+                ("FONTNAME", (0, 0), (-1, -1), "Helvetica"),
+                ("FONTSIZE", (0, 0), (-1, -1), 10),
+                ("ALIGN", (1, 0), (1, -1), "RIGHT"),
+            ]
+        )
+        self.expense_style = TableStyle(
+            [
+                ("FONTNAME", (0, 0), (-1, -1), "Helvetica"),
+                ("FONTSIZE", (0, 0), (-1, -1), 10),
+                ("ALIGN", (1, 0), (1, -1), "RIGHT"),
+                ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+            ]
+        )
+
+    def get_document(self, rpt_file) -> SimpleDocTemplate:
+        """This method creates document of PDF file with page layout of the template"""
+        return SimpleDocTemplate(
+            rpt_file,
+            pagesize=self.pagesize,
+            leftMargin=self.margin,
+            rightMargin=self.margin,
+            topMargin=self.margin,
+            bottomMargin=self.margin,
+        )
+
+
+REPORT_TEMPLATE = ReportTemplate()
 
 
 class ExpenseReport:
@@ -20,7 +93,22 @@ class ExpenseReport:
         data: Dict,
         rpt_file: str,
         log: logging.Logger,
+        images: Dict[str, Union[bytes, Flowable]] = None,
+        template: ReportTemplate = None,
     ):
+        """
+        This class builds the PDF report, charts are embedded from images in
+        memory and read from the report directory otherwise
+        Args:
+            customer_name: Customer name printed on the report
+            report_month: Report month
+            data: reports config
+            rpt_file: PDF file
+            log: logger object
+            images: PNG or vector chart of charts by chart file name,
+                e.g. ExpenseCharts.images
+            template: Styles of the report, defaults to shared REPORT_TEMPLATE
+        """
         self.customer_name = customer_name
         self.report_month = report_month
         self.generated_on = datetime.now().strftime("%d/%m/%Y %H:%M")
@@ -29,6 +117,8 @@ class ExpenseReport:
         self.logger = log
         self.rpt_path = os.path.dirname(rpt_file)
         self.charts = [os.path.join(self.rpt_path, chart) for chart in data["charts"]]
+        self.images = images or {}
+        self.template = template or REPORT_TEMPLATE
 
     def _create_header_table(self) -> Table:
         """PDF header definition"""
@@ -39,19 +129,7 @@ class ExpenseReport:
             [f"Report Month: {self.report_month}", "", ""],
             ["", "Monthly Expense Summary", ""],
         ]
-        header_style = [
-            ("BACKGROUND", (0, 0), (-1, 3), colors.blue),
-            ("TEXTCOLOR", (0, 0), (-1, 3), colors.white),
-            ("ALIGN", (0, 0), (0, 0), "LEFT"),
-            ("ALIGN", (2, 0), (2, 0), "RIGHT"),
-            ("ALIGN", (1, 3), (1, 3), "CENTER"),
-            ("FONTNAME", (0, 0), (-1, 3), "Helvetica-Bold"),
-            ("TOPPADDING", (0, 0), (-1, 3), 0),
-            ("BOTTOMPADDING", (0, 0), (-1, 3), 0),
-            ("LEFTPADDING", (0, 0), (-1, 3), 0),
-            ("RIGHTPADDING", (0, 0), (-1, 3), 0),
-        ]
-        return Table(header_data, style=header_style, hAlign="LEFT")
+        return Table(header_data, style=self.template.header_style, hAlign="LEFT")
 
     def _create_summary_table(self) -> Table:
         """Summary definition"""
@@ -64,12 +142,7 @@ class ExpenseReport:
             ],
             ["Expense to Income Ratio", f"{self.data['expense_ratio']}%"],
         ]
-        summary_style = [
-            ("FONTNAME", (0, 0), (-1, -1), "Helvetica"),
-            ("FONTSIZE", (0, 0), (-1, -1), 10),
-            ("ALIGN", (1, 0), (1, -1), "RIGHT"),
-        ]
-        return Table(summary_data, style=summary_style, hAlign="LEFT")
+        return Table(summary_data, style=self.template.summary_style, hAlign="LEFT")
 
     def _create_expense_table(self) -> Table:
         """Expense summary definition"""
@@ -78,37 +151,34 @@ class ExpenseReport:
         expense_data.append(["Expense Category", "Amount"])
         for category, amount in self.data["expenses"].items():
             expense_data.append([category, f"{self.data['currency']} {amount}"])
-        expense_style = [
-            ("FONTNAME", (0, 0), (-1, -1), "Helvetica"),
-            ("FONTSIZE", (0, 0), (-1, -1), 10),
-            ("ALIGN", (1, 0), (1, -1), "RIGHT"),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-        ]
-        return Table(expense_data, style=expense_style, hAlign="LEFT")
+        return Table(expense_data, style=self.template.expense_style, hAlign="LEFT")
 
     def _add_charts(self, elements) -> None:
         """Chart element definition"""
         # Add charts to the report
         chart_files = self.charts
         for chart_file in chart_files:
-            if os.path.exists(chart_file):
-                elements.append(
-                    Image(chart_file, width=4 * inch, height=2.5 * inch, hAlign="LEFT")
-                )
+            image = self.images.get(os.path.basename(chart_file))
+            if isinstance(image, Flowable):
+                # vector charts are flowables of their own
+                elements.append(image)
                 elements.append(Spacer(1, 12))
+                continue
+            if image is not None:
+                chart_file = io.BytesIO(image)
+            elif not os.path.exists(chart_file):
+                continue
+            elements.append(
+                Image(chart_file, width=4 * inch, height=2.5 * inch, hAlign="LEFT")
+            )
+            elements.append(Spacer(1, 12))
 
-    def build(self) -> None:
-        """Build PDF report"""
-        # Create document template
-        doc = SimpleDocTemplate(
-            self.rpt_file,
-            pagesize=A4,
-            leftMargin=0.5 * inch,
-            rightMargin=0.5 * inch,
-            topMargin=0.5 * inch,
-            bottomMargin=0.5 * inch,
-        )
-
+    def get_elements(self) -> List[Flowable]:
+        """
+        This method creates elements of the report
+        Returns:
+            flowables of the report
+        """
         elements = []
         # Create report elements
         elements.append(self._create_header_table())
@@ -116,12 +186,7 @@ class ExpenseReport:
 
         # Add summary section
         elements.append(
-            Paragraph(
-                "Monthly Summary:",
-                style=ParagraphStyle(
-                    name="Heading4", fontName="Helvetica-Bold", underlineProportion=0.5
-                ),
-            )
+            Paragraph("Monthly Summary:", style=self.template.heading_style)
         )
         elements.append(Spacer(1, 12))
         elements.append(self._create_summary_table())
@@ -129,12 +194,7 @@ class ExpenseReport:
 
         # Add expense table
         elements.append(
-            Paragraph(
-                "Expense Summary:",
-                style=ParagraphStyle(
-                    name="Heading4", fontName="Helvetica-Bold", underlineProportion=0.5
-                ),
-            )
+            Paragraph("Expense Summary:", style=self.template.heading_style)
         )
         elements.append(Spacer(1, 12))
         elements.append(self._create_expense_table())
@@ -143,27 +203,50 @@ class ExpenseReport:
         # Add insights and recommendations
         elements.append(
             Paragraph(
-                "Insights and Recommendations:",
-                style=ParagraphStyle(
-                    name="Heading4", fontName="Helvetica-Bold", underlineProportion=0.5
-                ),
+                "Insights and Recommendations:", style=self.template.heading_style
             )
         )
         elements.append(Spacer(1, 12))
 
         # Add bullets to insights
         for insight in self.data["insights"]:
-            elements.append(
-                Paragraph(f"* {insight}", style=ParagraphStyle(name="BodyText"))
-            )
+            elements.append(Paragraph(f"* {insight}", style=self.template.body_style))
             elements.append(Spacer(1, 6))
         elements.append(Spacer(1, 12))
 
         # Add charts
         self._add_charts(elements)
+        return elements
+
+    @instrument()
+    def build(self) -> None:
+        """Build PDF report"""
+        # Create document template
+        doc = self.template.get_document(self.rpt_file)
 
         try:
             # Build document
-            doc.build(elements)
+            doc.build(self.get_elements())
         except ExpenseReportError as exc:
-            self.logger.error(f"Error building PDF reports: {exc}")
+            self.logger.error("Error building PDF reports: %s", exc)
+
+
+def build_reports(
+    reports: List[ExpenseReport],
+    rpt_file: str,
+    template: ReportTemplate = REPORT_TEMPLATE,
+) -> None:
+    """
+    This function builds many reports into one PDF file, every report starts
+    on a new page
+    Args:
+        reports: Reports in page order
+        rpt_file: Combined PDF file
+        template: Page layout of the combined PDF file
+    """
+    elements = []
+    for report_no, report in enumerate(reports):
+        if report_no:
+            elements.append(PageBreak())
+        elements.extend(report.get_elements())
+    template.get_document(rpt_file).build(elements)
@@ -0,0 +1,374 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional
+from expense_manager.cache import TransactionCache
+from expense_manager.dtypes import normalize_categories
+
+if TYPE_CHECKING:
+    from pandas import DataFrame, Series
+
+
+class TransactionStore:
+    """Embedded SQLite store of transactions indexed on date and expense category"""
+
+    # amounts are stored as integer cents, SQL sums are exact like pandas sums
+    AMOUNT_SCALE = 100
+    # stores of an older schema are rebuilt, files are ingested again
+    SCHEMA_VERSION = 1
+
+    def __init__(self, db_file: str, log: logging.Logger, chunk_size: int = 100_000):
+        """
+        This class ingests transaction files incrementally and answers summaries,
+        category totals and date range queries as indexed aggregate queries
+        Args:
+            db_file: SQLite database file, ":memory:" for a private store
+            log: logger object
+            chunk_size: Rows of transaction file inserted per chunk
+        """
+        self.db_file = db_file
+        self.logger = log
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+        if db_file != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_file)), exist_ok=True)
+        self._connection = sqlite3.connect(db_file, timeout=30, check_same_thread=False)
+        # write-ahead log lets batch workers read while another one ingests
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        (schema_version,) = self._connection.execute("PRAGMA user_version").fetchone()
+        if schema_version != self.SCHEMA_VERSION:
+            self._connection.executescript(
+                """
+                DROP TABLE IF EXISTS monthly_totals;
+                DROP TABLE IF EXISTS transactions;
+                DROP TABLE IF EXISTS sources;
+                """
+            )
+            self._connection.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS sources (
+                source_id INTEGER PRIMARY KEY,
+                path TEXT UNIQUE NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                rows INTEGER NOT NULL,
+                ingested_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS transactions (
+                source_id INTEGER NOT NULL REFERENCES sources(source_id),
+                date TEXT NOT NULL,
+                -- missing category or amount is NULL, sums skip it like pandas
+                expense_category TEXT,
+                amount_cents INTEGER
+            );
+            -- amount makes the index covering, aggregates never read the table
+            CREATE INDEX IF NOT EXISTS idx_transactions_date_category
+                ON transactions (date, expense_category, amount_cents);
+            CREATE INDEX IF NOT EXISTS idx_transactions_source
+                ON transactions (source_id);
+            -- monthly sums maintained on ingest, whole months never rescan rows
+            CREATE TABLE IF NOT EXISTS monthly_totals (
+                source_id INTEGER NOT NULL REFERENCES sources(source_id),
+                month TEXT NOT NULL,
+                expense_category TEXT NOT NULL,
+                amount_cents INTEGER NOT NULL,
+                PRIMARY KEY (source_id, month, expense_category)
+            );
+            CREATE INDEX IF NOT EXISTS idx_monthly_totals_month_category
+                ON monthly_totals (month, expense_category, amount_cents);
+            """
+        )
+
+    def _get_source(self, source_file: str) -> Optional[Dict]:
+        """This method gets ingested fingerprint of source file"""
+        row = self._connection.execute(
+            "SELECT source_id, size, mtime_ns, sha256, rows FROM sources WHERE path = ?",
+            (os.path.abspath(source_file),),
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(["source_id", "size", "mtime_ns", "sha256", "rows"], row))
+
+    def ingest(self, source_file: str) -> int:
+        """
+        This method ingests a transaction file, unchanged files are skipped
+        and changed files replace their previously ingested rows
+        Args:
+            source_file: Transaction file
+
+        Returns:
+            number of rows ingested, 0 when the file is unchanged
+        """
+        from pandas import read_csv
+
+        source = self._get_source(source_file)
+        # compare cheap size and mtime before hashing the content
+        stat = os.stat(source_file)
+        if source is not None and (source["size"], source["mtime_ns"]) == (
+            stat.st_size,
+            stat.st_mtime_ns,
+        ):
+            self.logger.info("Transaction store is up to date: %s", source_file)
+            return 0
+
+        fingerprint = TransactionCache.fingerprint(source_file)
+        with self._lock, self._connection:
+            if source is not None and source["sha256"] == fingerprint["sha256"]:
+                self._connection.execute(
+                    "UPDATE sources SET mtime_ns = ? WHERE source_id = ?",
+                    (fingerprint["mtime_ns"], source["source_id"]),
+                )
+                self.logger.info("Transaction store is up to date: %s", source_file)
+                return 0
+
+            if source is not None:
+                for table in ["transactions", "monthly_totals"]:
+                    self._connection.execute(
+                        f"DELETE FROM {table} WHERE source_id = ?",
+                        (source["source_id"],),
+                    )
+            source_id = self._connection.execute(
+                """
+                INSERT INTO sources (path, size, mtime_ns, sha256, rows, ingested_at)
+                VALUES (?, ?, ?, ?, 0, ?)
+                ON CONFLICT (path) DO UPDATE SET
+                    size = excluded.size,
+                    mtime_ns = excluded.mtime_ns,
+                    sha256 = excluded.sha256,
+                    ingested_at = excluded.ingested_at
+                RETURNING source_id
+                """,
+                (
+                    os.path.abspath(source_file),
+                    fingerprint["size"],
+                    fingerprint["mtime_ns"],
+                    fingerprint["sha256"],
+                    time.time(),
+                ),
+            ).fetchone()[0]
+
+            rows = 0
+            with read_csv(
+                source_file, parse_dates=["date"], chunksize=self.chunk_size
+            ) as reader:
+                for chunk_no, chunk in enumerate(reader):
+                    if chunk_no == 0:
+                        self._validate_columns(chunk)
+                    chunk["expense_category"] = normalize_categories(
+                        chunk["expense_category"]
+                    )
+                    # inserts in index order keep index pages local
+                    chunk = chunk.sort_values(["date", "expense_category"])
+                    self._connection.executemany(
+                        "INSERT INTO transactions VALUES (?, ?, ?, ?)",
+                        zip(
+                            [source_id] * len(chunk),
+                            chunk["date"]
+                            .to_numpy()
+                            .astype("datetime64[D]")
+                            .astype(str)
+                            .tolist(),
+                            chunk["expense_category"].tolist(),
+                            self.to_cents(chunk["amount"]).tolist(),
+                        ),
+                    )
+                    rows += len(chunk)
+            self._connection.execute(
+                """
+                INSERT INTO monthly_totals
+                SELECT source_id, substr(date, 1, 7), expense_category,
+                    COALESCE(SUM(amount_cents), 0)
+                FROM transactions
+                WHERE source_id = ? AND expense_category IS NOT NULL
+                GROUP BY 2, 3
+                """,
+                (source_id,),
+            )
+            self._connection.execute(
+                "UPDATE sources SET rows = ? WHERE source_id = ?", (rows, source_id)
+            )
+
+        self.logger.info("Transaction store ingested %s rows: %s", rows, source_file)
+        return rows
+
+    def ingest_many(self, source_files: List[str]) -> int:
+        """
+        This method ingests many transaction files
+        Args:
+            source_files: Transaction files
+
+        Returns:
+            number of rows ingested
+        """
+        return sum(self.ingest(source_file) for source_file in source_files)
+
+    @classmethod
+    def to_cents(cls, amount: "Series") -> "Series":
+        """This method converts amounts to integer cents, missing amounts to None"""
+        cents = (amount.astype("float64") * cls.AMOUNT_SCALE).round()
+        return cents.astype("Int64").astype(object).where(cents.notna(), None)
+
+    @classmethod
+    def from_cents(cls, amount_cents: "Series") -> "Series":
+        """This method converts integer cents to amounts, whole amounts stay integer"""
+        if (amount_cents % cls.AMOUNT_SCALE == 0).all():
+            return amount_cents // cls.AMOUNT_SCALE
+        return amount_cents / cls.AMOUNT_SCALE
+
+    @staticmethod
+    def _validate_columns(chunk: "DataFrame") -> None:
+        """This method checks the columns the store keeps"""
+        required_columns = {"date", "expense_category", "amount"}
+        if not required_columns.issubset(chunk.columns):
+            raise ValueError(f"Expense file must contains columns {required_columns}")
+        if "currency" in chunk.columns:
+            raise ValueError("Transaction store keeps amounts of one currency only")
+
+    @staticmethod
+    def _get_filters(
+        start_date: str = None,
+        end_date: str = None,
+        source_id: int = None,
+        date_column: str = "date",
+    ):
+        """This method returns WHERE clause and parameters of optional filters"""
+        filters, parameters = [], []
+        if source_id is not None:
+            filters.append("source_id = ?")
+            parameters.append(source_id)
+        if start_date:
+            filters.append(f"{date_column} >= ?")
+            parameters.append(start_date)
+        if end_date:
+            filters.append(f"{date_column} <= ?")
+            parameters.append(end_date)
+        where = f"WHERE {' AND '.join(filters)}" if filters else ""
+        return where, parameters
+
+    def _get_source_id(self, source_file: str = None) -> Optional[int]:
+        """This method gets source id of an ingested transaction file"""
+        if source_file is None:
+            return None
+        source = self._get_source(source_file)
+        if source is None:
+            raise ValueError(f"Transaction file is not ingested: {source_file}")
+        return source["source_id"]
+
+    def get_monthly_aggregates(
+        self, start_date: str = None, end_date: str = None, source_file: str = None
+    ) -> "DataFrame":
+        """
+        This method sums amount by month and expense category in SQL
+        Args:
+            start_date: First date (yyyy-mm-dd), defaults to all dates
+            end_date: Last date (yyyy-mm-dd), defaults to all dates
+            source_file: Only transactions of this ingested file
+
+        Returns:
+            Aggregated expenses, one row per month and expense category
+            dated on the first day of the month
+        """
+        from pandas import Timestamp, read_sql_query, to_datetime
+
+        source_id = self._get_source_id(source_file)
+        is_whole_months = all(
+            [
+                start_date is None or Timestamp(start_date).is_month_start,
+                end_date is None or Timestamp(end_date).is_month_end,
+            ]
+        )
+        if is_whole_months:
+            # sum monthly totals of ingested files instead of transactions
+            where, parameters = self._get_filters(
+                start_date and start_date[:7],
+                end_date and end_date[:7],
+                source_id,
+                date_column="month",
+            )
+            query = f"""
+                SELECT month || '-01' AS date, expense_category,
+                    SUM(amount_cents) AS amount
+                FROM monthly_totals {where}
+                GROUP BY 1, 2
+                ORDER BY 1, 2
+                """
+        else:
+            where, parameters = self._get_filters(start_date, end_date, source_id)
+            query = f"""
+                SELECT substr(date, 1, 7) || '-01' AS date, expense_category,
+                    COALESCE(SUM(amount_cents), 0) AS amount
+                FROM transactions {where}
+                GROUP BY 1, 2
+                ORDER BY 1, 2
+                """
+        # transactions without category are not summed, like pandas groupby
+        df_exp = read_sql_query(query, self._connection, params=parameters).dropna(
+            subset=["expense_category"], ignore_index=True
+        )
+        df_exp["date"] = to_datetime(df_exp["date"])
+        df_exp["amount"] = self.from_cents(df_exp["amount"])
+        return df_exp
+
+    def get_category_totals(
+        self, start_date: str = None, end_date: str = None, source_file: str = None
+    ) -> "Series":
+        """
+        This method gets amount totals by month and expense category
+        Args:
+            start_date: First date (yyyy-mm-dd), defaults to all dates
+            end_date: Last date (yyyy-mm-dd), defaults to all dates
+            source_file: Only transactions of this ingested file
+
+        Returns:
+            Signed amount indexed by (month, expense_category), input of MonthlySummary
+        """
+        df_exp = self.get_monthly_aggregates(start_date, end_date, source_file)
+        df_exp["month"] = df_exp["date"].dt.to_period("M")
+        return df_exp.set_index(["month", "expense_category"])["amount"]
+
+    def get_transactions(
+        self, start_date: str = None, end_date: str = None, source_file: str = None
+    ) -> "DataFrame":
+        """
+        This method gets transactions of a date range in date order
+        Args:
+            start_date: First date (yyyy-mm-dd), defaults to all dates
+            end_date: Last date (yyyy-mm-dd), defaults to all dates
+            source_file: Only transactions of this ingested file
+
+        Returns:
+            Transactions with columns date, expense_category and amount
+        """
+        from pandas import read_sql_query
+
+        where, parameters = self._get_filters(
+            start_date, end_date, self._get_source_id(source_file)
+        )
+        df_exp = read_sql_query(
+            f"""
+            SELECT date, expense_category, amount_cents AS amount
+            FROM transactions {where}
+            ORDER BY date
+            """,
+            self._connection,
+            params=parameters,
+            parse_dates=["date"],
+        )
+        df_exp["amount"] = self.from_cents(df_exp["amount"])
+        return df_exp
+
+    def stats(self) -> Dict[str, int]:
+        """This method returns number of ingested files and transactions"""
+        files, rows = self._connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(rows), 0) FROM sources"
+        ).fetchone()
+        return {"files": files, "rows": rows}
+
+    def close(self) -> None:
+        """This method closes the database connection"""
+        self._connection.close()
@@ -0,0 +1,213 @@
+import json
+from typing import Dict, List, Tuple, Union
+from pandas import DataFrame, MultiIndex, Period, PeriodIndex, Series, concat
+from expense_manager.utils import save_json
+
+MonthType = Union[str, Period]
+
+
+class MonthlySummary:
+    """Month-indexed income, expenses, savings, ratio and category breakdown"""
+
+    def __init__(self, category_totals: Series):
+        """
+        This class derives every monthly figure from amount totals
+        by month and expense category
+        Args:
+            category_totals: Signed amount indexed by (month, expense_category)
+        """
+        self.category_totals = category_totals
+        self.totals = self._calculate_totals(category_totals)
+
+    @staticmethod
+    def _calculate_totals(category_totals: Series) -> DataFrame:
+        """This method calculates income, expenses, savings and ratio of every month"""
+        # Aggregate income and expenses of every month at once
+        totals = DataFrame(
+            {
+                "income": category_totals.clip(lower=0).groupby(level="month").sum(),
+                "expenses": category_totals.clip(upper=0)
+                .groupby(level="month")
+                .sum()
+                .abs(),
+            }
+        )
+        totals["savings"] = totals["income"] - totals["expenses"]
+
+        # expense-to-income ratio in four decimals, 0 when there is no income
+        income = totals["income"].where(totals["income"] != 0)
+        totals["ratio"] = (totals["expenses"] / income).round(4).fillna(0)
+        return totals
+
+    @classmethod
+    def from_transactions(cls, df_expense: DataFrame) -> "MonthlySummary":
+        """
+        This method aggregates transactions of every month in a single groupby pass
+        Args:
+            df_expense: Transactions with columns date, expense_category and amount
+
+        Returns:
+            MonthlySummary object
+        """
+        return cls(cls.get_category_totals(df_expense))
+
+    @staticmethod
+    def get_category_totals(df_expense: DataFrame) -> Series:
+        """
+        This method sums amount of transactions by month and expense category
+        Args:
+            df_expense: Transactions with columns date, expense_category and amount
+
+        Returns:
+            Signed amount indexed by (month, expense_category)
+        """
+        # Truncate date (yyyy-mm-dd) to months since epoch in numpy
+        month = df_expense["date"].to_numpy().astype("datetime64[M]").view("int64")
+        category_totals = df_expense.groupby(
+            [Series(month, index=df_expense.index, name="month"), "expense_category"],
+            observed=True,
+        )["amount"].sum()
+        # sums of downcast amounts are narrowed back when they fit, widen them
+        category_totals = category_totals.astype(
+            "float64" if category_totals.dtype.kind == "f" else "int64"
+        )
+
+        # Convert months since epoch to Period of Month (yyyy-mm) and
+        # category codes back to strings, running sums outlive the dictionary
+        months = category_totals.index.levels[0].to_numpy().astype("datetime64[M]")
+        category_totals.index = category_totals.index.set_levels(
+            [
+                PeriodIndex(months, freq="M"),
+                category_totals.index.levels[1].astype(str),
+            ],
+        )
+        return category_totals
+
+    def update(self, df_expense: DataFrame) -> List[Period]:
+        """
+        This method adds a batch of transactions to the running sums, only
+        the batch is aggregated and only months of the batch are recalculated
+        Args:
+            df_expense: Transactions with columns date, expense_category and amount
+
+        Returns:
+            months updated by the batch
+        """
+        batch_totals = self.get_category_totals(df_expense)
+        if batch_totals.empty:
+            return []
+        months = list(batch_totals.index.unique(level="month"))
+
+        # categories of the batch months, running sums plus the batch
+        is_updated = self.category_totals.index.isin(months, level="month")
+        month_totals = self.category_totals[is_updated].add(batch_totals, fill_value=0)
+        # new categories of the batch turn integer sums into floats on alignment
+        if self.category_totals.dtype.kind == batch_totals.dtype.kind == "i":
+            month_totals = month_totals.astype("int64")
+
+        self.category_totals = concat(
+            [self.category_totals[~is_updated], month_totals.rename("amount")]
+        ).sort_index()
+        self.totals = concat(
+            [
+                self.totals.drop(months, errors="ignore"),
+                self._calculate_totals(month_totals),
+            ]
+        ).sort_index()
+        return months
+
+    def to_records(self) -> List[Dict]:
+        """This method returns running sums of every month as JSON records"""
+        return [
+            {"month": str(month), "expense_category": category, "amount": amount}
+            for (month, category), amount in self.category_totals.items()
+        ]
+
+    @classmethod
+    def from_records(cls, records: List[Dict]) -> "MonthlySummary":
+        """
+        This method creates summary from running sums of to_records
+        Args:
+            records: JSON records of running sums
+
+        Returns:
+            MonthlySummary object
+        """
+        index = MultiIndex.from_arrays(
+            [
+                PeriodIndex([record["month"] for record in records], freq="M"),
+                [record["expense_category"] for record in records],
+            ],
+            names=["month", "expense_category"],
+        )
+        return cls(
+            Series([record["amount"] for record in records], index=index, name="amount")
+        )
+
+    def save(self, checkpoint_file: str) -> None:
+        """
+        This method saves running sums of every month to a checkpoint file
+        Args:
+            checkpoint_file: JSON checkpoint file
+        """
+        save_json(checkpoint_file, self.to_records())
+
+    @classmethod
+    def load(cls, checkpoint_file: str) -> "MonthlySummary":
+        """
+        This method loads running sums of every month from a checkpoint file
+        Args:
+            checkpoint_file: JSON checkpoint file
+
+        Returns:
+            MonthlySummary object
+        """
+        with open(checkpoint_file, encoding="utf-8") as file:
+            return cls.from_records(json.load(file))
+
+    @property
+    def months(self) -> List[Period]:
+        """This method returns months of the summary in ascending order"""
+        return list(self.totals.index)
+
+    @staticmethod
+    def get_label(month: MonthType) -> str:
+        """This method returns month in format MON-YYYY"""
+        return Period(month, freq="M").strftime("%b-%Y")
+
+    def get_totals(self, month: MonthType) -> Tuple:
+        """
+        This method gets totals of given month
+        Args:
+            month: Period or string of month (yyyy-mm)
+
+        Returns:
+            income, expenses, savings and expense-to-income ratio
+        """
+        month = Period(month, freq="M")
+        return tuple(
+            self.totals.at[month, column]
+            for column in ["income", "expenses", "savings", "ratio"]
+        )
+
+    def get_categories(self, month: MonthType, by_amount: bool = False) -> DataFrame:
+        """
+        This method gets category breakdown of given month
+        Args:
+            month: Period or string of month (yyyy-mm)
+            by_amount: Order categories by descending amount instead of name,
+                categories of equal amount stay in alphabetical order
+
+        Returns:
+            expense_category and absolute amount
+        """
+        categories = self.category_totals.xs(
+            Period(month, freq="M"), level="month"
+        ).reset_index()
+        categories["amount"] = categories["amount"].abs()
+        if by_amount:
+            # a stable sort of the few aggregated categories, never of raw rows
+            categories = categories.sort_values(
+                "amount", ascending=False, kind="stable", ignore_index=True
+            )
+        return categories
@@ -0,0 +1,132 @@
+from typing import Dict, List
+from pandas import DataFrame, Period, Series, period_range
+from expense_manager.config import INCOME_CATEGORIES, TRENDS
+from expense_manager.summary import MonthlySummary, MonthType
+
+
+class ExpenseTrends:
+    """Rolling averages, month-over-month deltas and year-to-date totals by category"""
+
+    def __init__(self, matrix: DataFrame):
+        """
+        This class analyzes a month-by-category matrix of absolute amounts,
+        months without transactions are filled with 0 so that windows span
+        calendar months
+        Args:
+            matrix: Amounts indexed by month (PeriodIndex) with a column per
+                expense category
+        """
+        if not matrix.empty:
+            months = period_range(matrix.index.min(), matrix.index.max(), freq="M")
+            matrix = matrix.reindex(months, fill_value=0)
+        self.matrix = matrix.astype("float64").rename_axis(
+            index="month", columns="expense_category"
+        )
+
+    @classmethod
+    def from_category_totals(cls, category_totals: Series) -> "ExpenseTrends":
+        """
+        This method pivots amount totals into the month-by-category matrix
+        Args:
+            category_totals: Signed amount indexed by (month, expense_category)
+
+        Returns:
+            ExpenseTrends object
+        """
+        return cls(category_totals.abs().unstack("expense_category", fill_value=0))
+
+    @classmethod
+    def from_summary(cls, summary: MonthlySummary) -> "ExpenseTrends":
+        """
+        This method analyzes the aggregates of a monthly summary
+        Args:
+            summary: MonthlySummary object
+
+        Returns:
+            ExpenseTrends object
+        """
+        return cls.from_category_totals(summary.category_totals)
+
+    @property
+    def months(self) -> List[Period]:
+        """This method returns months of the matrix in ascending order"""
+        return list(self.matrix.index)
+
+    def rolling_average(self, window: int) -> DataFrame:
+        """
+        This method averages every category over the last months
+        Args:
+            window: Number of months, the first window - 1 months have no average
+
+        Returns:
+            Rolling averages indexed by month
+        """
+        return self.matrix.rolling(window, min_periods=window).mean()
+
+    def month_over_month(self) -> DataFrame:
+        """This method returns change of every category from the previous month"""
+        return self.matrix.diff()
+
+    def month_over_month_percent(self) -> DataFrame:
+        """This method returns change of every category relative to the previous month"""
+        previous = self.matrix.shift()
+        return self.month_over_month() / previous.where(previous != 0)
+
+    def year_to_date(self) -> DataFrame:
+        """This method returns running totals of every category within each year"""
+        return self.matrix.groupby(self.matrix.index.year).cumsum()
+
+    def get_trends(self, month: MonthType, windows: List[int] = None) -> DataFrame:
+        """
+        This method gets trends of every category in given month
+        Args:
+            month: Period or string of month (yyyy-mm)
+            windows: Rolling windows in months, defaults to config.TRENDS
+
+        Returns:
+            amount, rolling averages (avg_3m, ...), mom_delta, mom_percent
+            and ytd of every category
+        """
+        month = Period(month, freq="M")
+        columns: Dict[str, Series] = {"amount": self.matrix.loc[month]}
+        for window in windows or TRENDS["windows"]:
+            columns[f"avg_{window}m"] = self.rolling_average(window).loc[month]
+        columns["mom_delta"] = self.month_over_month().loc[month]
+        columns["mom_percent"] = self.month_over_month_percent().loc[month]
+        columns["ytd"] = self.year_to_date().loc[month]
+        return DataFrame(columns).reset_index()
+
+    def insights(
+        self,
+        month: MonthType,
+        window: int = TRENDS["windows"][0],
+        threshold: float = TRENDS["threshold"],
+    ) -> List[str]:
+        """
+        This method gets insights of expense categories rising above their trend
+        Args:
+            month: Period or string of month (yyyy-mm)
+            window: Rolling window in months the month is compared against
+            threshold: Relative rise over the rolling average reported
+
+        Returns:
+            insights in descending order of rise
+        """
+        month = Period(month, freq="M")
+        # average of the months before, the month itself is compared against it
+        previous = self.rolling_average(window).shift().loc[month]
+        amount = self.matrix.loc[month]
+        rise = (amount - previous) / previous.where(previous != 0)
+        rise = rise[(rise > threshold) & ~rise.index.isin(INCOME_CATEGORIES)]
+
+        insight_msg = "{category} expenses {amount:,.0f} are {rise:.0%} above the {window}-month average {average:,.0f}."
+        return [
+            insight_msg.format(
+                category=category,
+                amount=amount[category],
+                rise=category_rise,
+                window=window,
+                average=previous[category],
+            )
+            for category, category_rise in rise.sort_values(ascending=False).items()
+        ]
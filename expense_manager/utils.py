@@ -1,5 +1,14 @@
 import argparse
+import atexit
+import itertools
+import json
 import logging
+import logging.handlers
+import multiprocessing
+import os
+import tempfile
+from typing import Optional
+from expense_manager.config import LOGGING, WATCH
 
 
 def parse_arguments() -> argparse.Namespace:
@@ -16,6 +25,73 @@ def parse_arguments() -> argparse.Namespace:
         action="store_true",
         help="Run the program in debug mode.",
     )
+    parser.add_argument(
+        "-c",
+        "--chunk-size",
+        dest="CHUNK_SIZE",
+        type=int,
+        default=None,
+        help="Stream the transaction file in chunks of given rows.",
+    )
+    parser.add_argument(
+        "-r",
+        "--rebuild-cache",
+        dest="REBUILD_CACHE",
+        action="store_true",
+        help="Rebuild the columnar cache of the transaction file.",
+    )
+    parser.add_argument(
+        "-s",
+        "--store",
+        dest="STORE",
+        action="store_true",
+        help="Ingest the transaction file into the SQLite transaction store.",
+    )
+    parser.add_argument(
+        "-v",
+        "--vector-charts",
+        dest="VECTOR_CHARTS",
+        action="store_true",
+        help="Embed charts as vector drawings instead of PNG images.",
+    )
+    parser.add_argument(
+        "-p",
+        "--save-charts",
+        dest="SAVE_CHARTS",
+        action="store_true",
+        help="Also write chart PNG files next to the PDF report (raster charts).",
+    )
+    parser.add_argument(
+        "-w",
+        "--watch",
+        dest="WATCH",
+        action="store_true",
+        help="Keep running and reprocess new or modified transaction files "
+        "of DATE_MMYYYY, a glob pattern in watch mode, e.g. '*' for every month.",
+    )
+    parser.add_argument(
+        "-i",
+        "--interval",
+        dest="INTERVAL",
+        type=float,
+        default=WATCH["interval"],
+        help="Seconds between polls of watch mode.",
+    )
+    parser.add_argument(
+        "-m",
+        "--metrics",
+        dest="METRICS",
+        action="store_true",
+        help="Log wall time, CPU time, peak RSS and rows of every pipeline stage.",
+    )
+    parser.add_argument(
+        "-f",
+        "--metrics-file",
+        dest="METRICS_FILE",
+        type=str,
+        default=None,
+        help="Export stage metrics as JSON (.json) or Prometheus text format.",
+    )
     parser.add_argument(dest="DATA_PATH", type=str, help="Monthly Expense data path")
     parser.add_argument(
         dest="DATE_MMYYYY", type=str, help="Transaction month to process"
@@ -28,7 +104,11 @@ def parse_arguments() -> argparse.Namespace:
 
 
 def setup_logging(
-    log_name: str, is_file_handler: bool, log_file: str, log_level: int
+    log_name: str,
+    is_file_handler: bool,
+    log_file: str,
+    log_level: int,
+    is_queue_handler: bool = False,
 ) -> logging.Logger:
     """
     This Function sets up logger object either stream or file or both.
@@ -37,23 +117,218 @@ def setup_logging(
         is_file_handler: flag if logger file is required
         log_file: path of log file
         log_level: log level either logging.INFO or logging.DEBUG
+        is_queue_handler: flag if records are handed to a queue and written by
+            a listener thread, so callers never block on the log file
 
     Returns:
         logger: logging.Logger object
     """
     log_format = "%(asctime)s:%(name)s:%(module)s:%(levelname)s:%(message)s"
     logger = logging.getLogger(log_name)
+    handlers = []
     # stream handler
     stream_handler = logging.StreamHandler()
     stream_handler.setFormatter(logging.Formatter(log_format))
-    logger.addHandler(stream_handler)
+    handlers.append(stream_handler)
     logger.setLevel(logging.DEBUG)
 
     # file handler
     if is_file_handler:
         file_handler = logging.FileHandler(log_file, encoding="utf-8")
         file_handler.setFormatter(logging.Formatter(log_format))
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
         logger.setLevel(log_level)
 
+    if is_queue_handler:
+        # unbounded process safe queue, worker processes log into it too
+        log_queue = multiprocessing.Queue()
+        listener = logging.handlers.QueueListener(
+            log_queue, *handlers, respect_handler_level=True
+        )
+        listener.start()
+        atexit.register(listener.stop)
+        handlers = [logging.handlers.QueueHandler(log_queue)]
+
+    for handler in handlers:
+        logger.addHandler(handler)
     return logger
+
+
+def get_log_queue(logger: logging.Logger) -> Optional[multiprocessing.Queue]:
+    """This function returns queue of the queue handler of logger, if any"""
+    for handler in logger.handlers:
+        if isinstance(handler, logging.handlers.QueueHandler):
+            return handler.queue
+    return None
+
+
+def setup_worker_logging(
+    log_name: str, log_queue: multiprocessing.Queue, log_level: int
+) -> None:
+    """
+    This function routes logger of a worker process to the queue of the
+    parent process, records are written by the listener of the parent
+    Args:
+        log_name: Logger name
+        log_queue: Queue of the parent process logger
+        log_level: log level either logging.INFO or logging.DEBUG
+    """
+    logger = logging.getLogger(log_name)
+    # handlers inherited by forked workers would write to the files directly
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(log_level)
+
+
+class Summary:
+    """Large log payload, summarized only when the record is emitted"""
+
+    __slots__ = ["payload", "max_items"]
+
+    def __init__(self, payload, max_items: int = LOGGING["max_items"]):
+        """
+        This class defers summarizing an API payload or collection until a
+        handler formats the log record
+        Args:
+            payload: dict, list, set or tuple
+            max_items: Items shown of every collection
+        """
+        self.payload = payload
+        self.max_items = max_items
+
+    def __str__(self) -> str:
+        return summarize(self.payload, self.max_items)
+
+
+def summarize(payload, max_items: int = LOGGING["max_items"], depth: int = 2) -> str:
+    """
+    This function summarizes a payload to its first items of every collection
+    Args:
+        payload: dict, list, set or tuple
+        max_items: Items shown of every collection
+        depth: Nesting levels shown, deeper collections show their size only
+
+    Returns:
+        summary of payload
+    """
+    if isinstance(payload, dict):
+        if depth <= 0:
+            return f"{{{len(payload)} items}}"
+        items = [
+            f"{key!r}: {summarize(value, max_items, depth - 1)}"
+            for key, value in itertools.islice(payload.items(), max_items)
+        ]
+        opening, closing = "{", "}"
+    elif isinstance(payload, (list, set, tuple)):
+        if depth <= 0:
+            return f"[{len(payload)} items]"
+        items = [
+            summarize(value, max_items, depth - 1)
+            for value in itertools.islice(payload, max_items)
+        ]
+        opening, closing = "[", "]"
+    else:
+        return repr(payload)
+
+    if len(payload) > max_items:
+        items.append(f"... +{len(payload) - max_items} more")
+    return opening + ", ".join(items) + closing
+
+
+def save_json(json_file: str, payload) -> None:
+    """
+    This function writes a payload to a JSON file, numpy scalars are written
+    as Python numbers. The payload goes to a temporary file first so a crash
+    never leaves half a file
+    Args:
+        json_file: JSON file
+        payload: JSON serializable payload
+    """
+    json_path = os.path.dirname(os.path.abspath(json_file))
+    os.makedirs(json_path, exist_ok=True)
+    file_no, tmp_file = tempfile.mkstemp(dir=json_path, suffix=".tmp")
+    with os.fdopen(file_no, "w", encoding="utf-8") as file:
+        json.dump(payload, file, default=lambda value: value.item())
+    os.replace(tmp_file, json_file)
+
+
+def parse_batch_arguments() -> argparse.Namespace:
+    """
+    This function parses command-line argument of batch runner.
+    Shows help and Usage of program
+    Returns: arguments object
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-d",
+        "--debug",
+        dest="DEBUG",
+        action="store_true",
+        help="Run the program in debug mode.",
+    )
+    parser.add_argument(
+        dest="DATA_PATH",
+        type=str,
+        help="Directory or glob pattern of transaction files",
+    )
+    parser.add_argument(
+        dest="SORT_COLUMN", type=str, help="Column used to sort the expense file"
+    )
+    parser.add_argument(
+        "-m",
+        "--months",
+        dest="MONTHS",
+        nargs=2,
+        metavar=("FROM_MMYYYY", "TO_MMYYYY"),
+        default=None,
+        help="Range of transaction months to process in DATA_PATH.",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        dest="WORKERS",
+        type=int,
+        default=None,
+        help="Number of worker processes, defaults to number of CPUs.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output-path",
+        dest="OUTPUT_PATH",
+        type=str,
+        default=None,
+        help="Root directory of reports, defaults to reports next to each file.",
+    )
+    parser.add_argument(
+        "-c",
+        "--customer-name",
+        dest="CUSTOMER_NAME",
+        type=str,
+        default=None,
+        help="Customer name printed on the reports.",
+    )
+    parser.add_argument(
+        "-b",
+        "--combined-file",
+        dest="COMBINED_FILE",
+        type=str,
+        default=None,
+        help="Build every report into this one PDF file.",
+    )
+    parser.add_argument(
+        "-p",
+        "--save-charts",
+        dest="SAVE_CHARTS",
+        action="store_true",
+        help="Also write chart PNG files next to each PDF report (raster charts).",
+    )
+    parser.add_argument(
+        "-q",
+        "--queue-logging",
+        dest="QUEUE_LOGGING",
+        action="store_true",
+        help="Write log records in a listener thread, workers never block on logging.",
+    )
+
+    return parser.parse_args()
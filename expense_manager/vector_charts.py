@@ -0,0 +1,220 @@
+from typing import Dict, List
+from reportlab.graphics import renderPDF
+from reportlab.graphics.charts.barcharts import VerticalBarChart
+from reportlab.graphics.charts.piecharts import Pie
+from reportlab.graphics.shapes import Drawing, Group, String
+from reportlab.lib import colors
+from reportlab.lib.units import inch
+from reportlab.platypus import Flowable
+
+WIDTH = 4 * inch
+HEIGHT = 2.5 * inch
+FONT_SIZE = 7
+TITLE_FONT_SIZE = 10
+
+# default color cycle of matplotlib, used when chart config has no colors
+DEFAULT_COLORS = [
+    "#1f77b4",
+    "#ff7f0e",
+    "#2ca02c",
+    "#d62728",
+    "#9467bd",
+    "#8c564b",
+    "#e377c2",
+    "#7f7f7f",
+    "#bcbd22",
+    "#17becf",
+]
+
+
+def _new_drawing(month, title: str, width: float, height: float) -> Drawing:
+    """This function creates a drawing with chart title and report month"""
+    drawing = Drawing(width, height, hAlign="LEFT")
+    drawing.add(
+        String(
+            width / 2,
+            height - TITLE_FONT_SIZE,
+            title,
+            fontName="Helvetica-Bold",
+            fontSize=TITLE_FONT_SIZE,
+            textAnchor="middle",
+        )
+    )
+    drawing.add(
+        String(
+            width,
+            height - TITLE_FONT_SIZE,
+            f"**{month}**",
+            fontName="Helvetica-Bold",
+            fontSize=FONT_SIZE,
+            textAnchor="end",
+        )
+    )
+    return drawing
+
+
+def draw_pie_chart(
+    month,
+    title: str,
+    labels: List,
+    sizes: List,
+    colors_: List = None,
+    width: float = WIDTH,
+    height: float = HEIGHT,
+) -> Drawing:
+    """This function draws pie chart as ReportLab drawing"""
+    drawing = _new_drawing(month, title, width, height)
+    total = sum(sizes)
+    diameter = height - 3 * TITLE_FONT_SIZE
+
+    pie = Pie()
+    pie.x = (width - diameter) / 2
+    pie.y = TITLE_FONT_SIZE / 2
+    pie.width = pie.height = diameter
+    pie.data = list(sizes)
+    pie.labels = [
+        f"{label} {size / total * 100 if total else 0:.1f}%"
+        for label, size in zip(labels, sizes)
+    ]
+    pie.startAngle = 90
+    pie.direction = "anticlockwise"
+    pie.slices.strokeColor = colors.white
+    pie.slices.fontSize = FONT_SIZE
+    pie.slices.fontName = "Helvetica"
+    colors_ = colors_ or DEFAULT_COLORS
+    for slice_no in range(len(sizes)):
+        pie.slices[slice_no].fillColor = colors.HexColor(
+            colors_[slice_no % len(colors_)]
+        )
+    drawing.add(pie)
+    return drawing
+
+
+def draw_bar_chart(
+    month,
+    title: str,
+    labels: List,
+    sizes: List,
+    xlabel: str,
+    ylabel: str,
+    color: str,
+    width: float = WIDTH,
+    height: float = HEIGHT,
+) -> Drawing:
+    """This function draws bar chart as ReportLab drawing"""
+    drawing = _new_drawing(month, title, width, height)
+
+    bar = VerticalBarChart()
+    bar.x = 5 * FONT_SIZE
+    bar.y = 6 * FONT_SIZE
+    bar.width = width - bar.x - FONT_SIZE
+    bar.height = height - bar.y - 3 * TITLE_FONT_SIZE
+    bar.data = [list(sizes)]
+    bar.bars[0].fillColor = colors.HexColor(color)
+    bar.bars[0].strokeColor = None
+    bar.valueAxis.valueMin = 0
+    bar.valueAxis.labels.fontSize = FONT_SIZE
+    bar.categoryAxis.categoryNames = [str(label) for label in labels]
+    bar.categoryAxis.labels.fontSize = FONT_SIZE
+    bar.categoryAxis.labels.angle = 45
+    bar.categoryAxis.labels.boxAnchor = "ne"
+    drawing.add(bar)
+
+    drawing.add(
+        String(
+            bar.x + bar.width / 2,
+            0,
+            xlabel,
+            fontName="Helvetica",
+            fontSize=FONT_SIZE,
+            textAnchor="middle",
+        )
+    )
+    ylabel_group = Group(
+        String(
+            0,
+            0,
+            ylabel,
+            fontName="Helvetica",
+            fontSize=FONT_SIZE,
+            textAnchor="middle",
+        )
+    )
+    ylabel_group.translate(FONT_SIZE, bar.y + bar.height / 2)
+    ylabel_group.rotate(90)
+    drawing.add(ylabel_group)
+    return drawing
+
+
+def render_chart(
+    chart: Dict, month, width: float = WIDTH, height: float = HEIGHT
+) -> Drawing:
+    """
+    This function renders one chart of charts config as a vector drawing
+    that is embedded into the PDF report without rasterization
+    Args:
+        chart: Chart config
+        month: Report month
+        width: Width of drawing in points
+        height: Height of drawing in points
+
+    Returns:
+        ReportLab drawing
+    """
+    if chart["type"] == "pie":
+        return draw_pie_chart(
+            month,
+            chart["title"],
+            chart["labels"],
+            chart["sizes"],
+            chart["colors"],
+            width,
+            height,
+        )
+    return draw_bar_chart(
+        month,
+        chart["title"],
+        chart["labels"],
+        chart["sizes"],
+        chart["xlabel"],
+        chart["ylabel"],
+        chart["colors"],
+        width,
+        height,
+    )
+
+
+class VectorChart(Flowable):
+    """Chart of charts config drawn into the PDF report as vector graphics"""
+
+    def __init__(
+        self, chart: Dict, month, width: float = WIDTH, height: float = HEIGHT
+    ):
+        """
+        This class draws the chart when the report is built, it only holds
+        the chart config so reports can be passed between worker processes
+        Args:
+            chart: Chart config
+            month: Report month
+            width: Width of drawing in points
+            height: Height of drawing in points
+        """
+        super().__init__()
+        self.chart = chart
+        self.month = month
+        self.width = width
+        self.height = height
+        self.hAlign = "LEFT"
+
+    def wrap(self, avail_width: float, avail_height: float):
+        """This method returns size of the chart"""
+        return self.width, self.height
+
+    def draw(self) -> None:
+        """This method draws the chart on canvas of the report"""
+        renderPDF.draw(
+            render_chart(self.chart, self.month, self.width, self.height),
+            self.canv,
+            0,
+            0,
+        )
@@ -0,0 +1,167 @@
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+from expense_manager.batch import BatchJob, find_jobs
+from expense_manager.config import WATCH
+
+
+class TransactionWatcher:
+    """Polling watcher of transaction files"""
+
+    def __init__(
+        self,
+        pattern: str,
+        callback: Callable[[BatchJob], object],
+        log: logging.Logger,
+        interval: float = WATCH["interval"],
+        debounce: float = WATCH["debounce"],
+        process_existing: bool = False,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        This class polls transaction files of a directory or glob pattern and
+        calls back with the job of every new or modified file, once the file
+        has not changed for the debounce period
+        Args:
+            pattern: Directory or glob pattern of transaction files
+            callback: Called with the batch job of every changed file
+            log: logger object
+            interval: Seconds between polls
+            debounce: Seconds a changed file must stay unchanged before processing
+            process_existing: Process files existing on start, otherwise
+                only files created or modified after start
+            clock: Monotonic clock in seconds
+        """
+        self.pattern = pattern
+        self.callback = callback
+        self.logger = log
+        self.interval = interval
+        self.debounce = debounce
+        self.clock = clock
+        self._pending: Dict[str, Tuple[Tuple, float]] = {}
+        self._processed: Dict[str, Tuple] = {}
+        self._stop = threading.Event()
+        self.metrics = {
+            "polls": 0,
+            "changes": 0,
+            "runs": 0,
+            "failures": 0,
+            "last_run_seconds": 0.0,
+            "total_run_seconds": 0.0,
+        }
+        if not process_existing:
+            self._processed = {
+                path: signature for path, (_, signature) in self.scan().items()
+            }
+
+    def scan(self) -> Dict[str, Tuple[BatchJob, Tuple]]:
+        """
+        This method gets job and size/mtime signature of every transaction file
+        Returns:
+            job and signature by transaction file
+        """
+        snapshot = {}
+        for job in find_jobs(self.pattern):
+            try:
+                stat = os.stat(job["transaction_file"])
+            except FileNotFoundError:
+                continue
+            snapshot[job["transaction_file"]] = (job, (stat.st_size, stat.st_mtime_ns))
+        return snapshot
+
+    def poll(self) -> List[BatchJob]:
+        """
+        This method compares transaction files with the last poll
+        Returns:
+            jobs of files changed and settled for the debounce period
+        """
+        now = self.clock()
+        snapshot = self.scan()
+        self.metrics["polls"] += 1
+
+        # forget deleted files
+        for path in set(self._pending) - set(snapshot):
+            del self._pending[path]
+        for path in set(self._processed) - set(snapshot):
+            del self._processed[path]
+
+        for path, (_, signature) in snapshot.items():
+            if self._processed.get(path) == signature:
+                self._pending.pop(path, None)
+            elif path not in self._pending or self._pending[path][0] != signature:
+                # every change of a burst restarts the debounce period
+                if path not in self._pending:
+                    self.metrics["changes"] += 1
+                self._pending[path] = (signature, now)
+
+        ready = [
+            path
+            for path, (_, changed_at) in self._pending.items()
+            if now - changed_at >= self.debounce
+        ]
+        for path in ready:
+            self._processed[path] = self._pending.pop(path)[0]
+        return [snapshot[path][0] for path in sorted(ready)]
+
+    def run_once(self) -> int:
+        """
+        This method polls once and processes the settled changes, a failing
+        file is logged and retried on its next change
+        Returns:
+            number of files processed
+        """
+        jobs = self.poll()
+        for job in jobs:
+            start = time.perf_counter()
+            try:
+                self.callback(job)
+            except Exception:
+                self.metrics["failures"] += 1
+                self.logger.exception("Watch run failed: %s", job["transaction_file"])
+            seconds = time.perf_counter() - start
+            self.metrics["runs"] += 1
+            self.metrics["last_run_seconds"] = round(seconds, 3)
+            self.metrics["total_run_seconds"] = round(
+                self.metrics["total_run_seconds"] + seconds, 3
+            )
+            self.logger.info(
+                "Processed %s in %.3fs, metrics: %s",
+                job["transaction_file"],
+                seconds,
+                self.stats(),
+            )
+        return len(jobs)
+
+    def run(self, max_polls: int = None) -> None:
+        """
+        This method polls until stopped or interrupted
+        Args:
+            max_polls: Stop after given number of polls, runs forever when not set
+        """
+        self.logger.info(
+            "Watching %s every %ss (debounce %ss)",
+            self.pattern,
+            self.interval,
+            self.debounce,
+        )
+        polls = 0
+        try:
+            while not self._stop.is_set():
+                self.run_once()
+                polls += 1
+                if max_polls is not None and polls >= max_polls:
+                    break
+                self._stop.wait(self.interval)
+        except KeyboardInterrupt:
+            self.logger.info("Watch interrupted")
+        self.logger.info("Watch stopped, metrics: %s", self.stats())
+
+    def stop(self) -> None:
+        """This method stops run from another thread"""
+        self._stop.set()
+
+    def stats(self) -> Dict:
+        """This method returns processing metrics"""
+        return {**self.metrics, "pending": len(self._pending)}
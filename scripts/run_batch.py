@@ -0,0 +1,81 @@
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+from expense_manager.batch import find_jobs, get_month_jobs, run_batch
+from expense_manager.cache import ChartCache
+from expense_manager.pipeline import CUSTOMER_NAME
+from expense_manager.utils import parse_batch_arguments, setup_logging
+
+# parse arguments
+args = parse_batch_arguments()
+
+now_ts = datetime.now().strftime("%Y%m%d.%H%M")
+log_path = args.DATA_PATH if os.path.isdir(args.DATA_PATH) else os.getcwd()
+# setup logging
+logger = setup_logging(
+    log_name="ExpenseManager",
+    log_level=logging.DEBUG if args.DEBUG else logging.INFO,
+    is_file_handler=True,
+    log_file=os.path.join(log_path, "logs", f"run_batch_{now_ts}.log"),
+    is_queue_handler=args.QUEUE_LOGGING,
+)
+
+logger.info("Start of expense manager batch scripts.")
+
+
+def main(args) -> int:
+    """Driving code to run ExpenseManager App for many transaction files"""
+    customer_name = args.CUSTOMER_NAME or CUSTOMER_NAME
+    if args.MONTHS:
+        jobs = get_month_jobs(
+            args.DATA_PATH, *args.MONTHS, args.OUTPUT_PATH, customer_name
+        )
+    else:
+        jobs = find_jobs(args.DATA_PATH, args.OUTPUT_PATH, customer_name)
+    logger.info("Batch jobs: %s", len(jobs))
+
+    # Chart cache shared by worker processes
+    chart_cache = ChartCache(os.path.join(log_path, "cache", "charts"))
+
+    start = time.perf_counter()
+    results = run_batch(
+        jobs,
+        sort_column=args.SORT_COLUMN,
+        log=logger,
+        workers=args.WORKERS,
+        combined_file=args.COMBINED_FILE,
+        rates_cache_file=os.path.join(log_path, "cache", "rates.sqlite3"),
+        chart_cache=chart_cache,
+        save_charts=args.SAVE_CHARTS,
+    )
+    elapsed = time.perf_counter() - start
+
+    failures = [result for result in results if result["status"] != "success"]
+    for result in results:
+        logger.info(
+            "%8s %8.3fs %s",
+            result["status"],
+            result["seconds"],
+            result["job"]["transaction_file"],
+        )
+    for result in failures:
+        logger.error("%s: %s", result["job"]["transaction_file"], result["error"])
+    logger.info("Chart cache size: %s bytes", chart_cache.stats()["bytes"])
+    logger.info(
+        "Batch complete: %s succeeded, %s failed in %.3fs (%.2f reports/sec)",
+        len(results) - len(failures),
+        len(failures),
+        elapsed,
+        (len(results) - len(failures)) / elapsed,
+    )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main(args))
+    except Exception as exc:
+        logger.exception(exc)
+        raise
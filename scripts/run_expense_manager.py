@@ -1,20 +1,14 @@
 import logging
 import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from expense_manager import ExpenseManager
-from expense_manager.charts import ExpenseCharts
-from expense_manager.config import (
-    EXPENSES,
-    FILES,
-    charts_config,
-    get_expenses_definition,
-    init_charts_config,
-    init_reports_config,
-    reports_config,
-)
+from expense_manager.cache import ChartCache, RatesCache
+from expense_manager.config import FILES, charts_config, reports_config
 from expense_manager.exchange import CurrencyRatesAPI
-from expense_manager.reports import ExpenseReport
-from expense_manager.utils import parse_arguments, setup_logging
+from expense_manager.instrumentation import REGISTRY
+from expense_manager.pipeline import run_pipeline
+from expense_manager.utils import Summary, parse_arguments, setup_logging
+from expense_manager.watch import TransactionWatcher
 
 # parse arguments
 args = parse_arguments()
@@ -30,6 +24,9 @@ logger = setup_logging(
 
 logger.info("Start of expense manager scripts.")
 
+# measure pipeline stages only when asked, disabled stages cost nothing
+REGISTRY.enabled = bool(args.METRICS or args.METRICS_FILE)
+
 
 def main(args):
     """Driving code to test ExpenseManager App"""
@@ -40,117 +37,79 @@ def main(args):
     transaction_file = os.path.join(data_path, FILES["transaction_file"]).format(
         date_mmyyyy=date_mmyyyy
     )
-    pdf_file = os.path.join(data_path, FILES["pdf_file"]).format(
-        date_mmyyyy=date_mmyyyy
-    )
 
-    logger.info(f"DATA PATH: {data_path}")
-    logger.info(f"PDF FILE: {pdf_file}")
-    logger.info(f"TRANSACTION FILE: {transaction_file}")
+    logger.info("DATA PATH: %s", data_path)
 
     # Test ExchangeAPI
+    rates_cache = RatesCache(os.path.join(data_path, "cache", "rates.sqlite3"))
     rates = CurrencyRatesAPI(
         is_historical=False,
         url="latest_symbol",
         base_currency="USD",
         target_currency="INR",
+        cache=rates_cache,
         logger=logger,
     )
-    logger.info(f"Available Currency: {CurrencyRatesAPI.get_currency_list()}")
-    rates.get_exchange_rates()
-
-    # get expenses goal
-    expenses_goal = get_expenses_definition(EXPENSES)
-    logger.info(f"Expenses Definition: {expenses_goal}")
-
-    # Load and sort data
-    expense = ExpenseManager(
-        expense_file=transaction_file,
-        sort_column=args.SORT_COLUMN,
-        log=logger,
-        expenses_goal=expenses_goal,
-    )
-    expense.sort_data()
-
-    # Enter Savings Goal
-    expense.savings_goal = 150000
-    logger.info(f"Monthly savings Goal: {expense.savings_goal}")
-
-    # Calculate Monthly Summary
-    report_month, monthly_summary, monthly_income, monthly_expenses, monthly_savings = (
-        expense.calculate_monthly_summary()
-    )
-
-    # Calculate Expense-to-income ratio
-    expense_to_income_ratio = expense.calculate_ratio()
-    total_expense_percent = expense.get_total_expense_percent()
-
-    # Check Savings Goal
-    goal = expense.check_savings_goal()
-
-    # Get Insights
-    expense_summary, insights = expense.insights()
-    insights.insert(0, goal)
-
-    logger.info(f"Report Month: {report_month}")
-    logger.info(f"Monthly Savings Goal: {goal}")
-    logger.info(f"Monthly income: {monthly_income}")
-    logger.info(f"Monthly expenses: {monthly_expenses}")
-    logger.info(f"Monthly Savings: {monthly_savings}")
-
     logger.info(
-        f"Monthly expense-to-income ratio: {expense_to_income_ratio} [{total_expense_percent:.2f}%]"
-    )
-    logger.debug(
-        f"""Monthly Summary:
-    {monthly_summary}"""
-    )
-
-    logger.debug(
-        f"""Expense Summary:
-    {expense_summary}"""
+        "Available Currency: %s",
+        Summary(CurrencyRatesAPI.get_currency_list(rates_cache)),
     )
-    logger.info("Insights & Recommendations:")
-    for insight in insights:
-        logger.info(insight)
-
-    # Generate Charts
-    logger.info("Generating Charts.....")
-    chart_report = ExpenseCharts(month=report_month, log=logger, file_path=data_path)
-    summary_records = monthly_summary.to_dict(orient="records")
-    expense_records = expense_summary.to_dict(orient="records")
+    rates.get_exchange_rates()
 
-    _charts_config = init_charts_config(
-        monthly_income=monthly_income,
-        monthly_expenses=monthly_expenses,
-        monthly_summary=chart_report.sort_data(summary_records),
-        expense_summary=chart_report.sort_data(expense_records),
-        charts_=charts_config,
+    # Rates of reporting currency for transactions in other currencies
+    rates_api = CurrencyRatesAPI(
+        base_currency=reports_config["currency"],
+        cache=rates_cache,
+        logger=logger,
     )
 
-    chart_report.build(_charts_config)
-
-    # Generate PDF Report
-    logger.info("Generating PDF reports.....")
-    pdf_report = ExpenseReport(
-        customer_name="John Walther",
-        report_month=report_month,
-        rpt_file=pdf_file,
-        log=logger,
-        data=init_reports_config(
-            reports_config,
-            [
-                monthly_income,
-                monthly_expenses,
-                total_expense_percent,
-                "USD",
-                {item["expense_category"]: item["amount"] for item in expense_records},
-                insights,
-            ],
-        ),
-    )
-    pdf_report.build()
-    logger.info("PDF report download ............[complete]")
+    # Render charts concurrently in worker processes, unchanged charts are cached
+    chart_cache = ChartCache(os.path.join(data_path, "cache", "charts"))
+    with ProcessPoolExecutor(max_workers=len(charts_config)) as chart_executor:
+        pipeline_args = dict(
+            output_path=data_path,
+            sort_column=args.SORT_COLUMN,
+            log=logger,
+            chunk_size=args.CHUNK_SIZE,
+            cache_dir=os.path.join(data_path, "cache"),
+            rebuild_cache=args.REBUILD_CACHE,
+            store_file=(
+                os.path.join(data_path, "cache", "transactions.sqlite3")
+                if args.STORE
+                else None
+            ),
+            rates_api=rates_api,
+            chart_executor=chart_executor,
+            chart_cache=chart_cache,
+            chart_backend="vector" if args.VECTOR_CHARTS else "raster",
+            save_charts=args.SAVE_CHARTS,
+        )
+        if args.WATCH:
+            # libraries, caches and chart workers stay warm between runs
+            watcher = TransactionWatcher(
+                pattern=transaction_file,
+                callback=lambda job: run_pipeline(
+                    transaction_file=job["transaction_file"],
+                    date_mmyyyy=job["date_mmyyyy"],
+                    **pipeline_args,
+                ),
+                log=logger,
+                interval=args.INTERVAL,
+            )
+            watcher.run()
+        else:
+            run_pipeline(
+                transaction_file=transaction_file,
+                date_mmyyyy=date_mmyyyy,
+                **pipeline_args,
+            )
+    logger.info("Chart cache: %s", chart_cache.stats())
+    logger.info("Exchange rates cache: %s", rates_cache.stats())
+    if REGISTRY.enabled:
+        REGISTRY.log_summary(logger)
+    if args.METRICS_FILE:
+        REGISTRY.save(args.METRICS_FILE)
+        logger.info("Stage metrics: %s", args.METRICS_FILE)
 
 
 if __name__ == "__main__":
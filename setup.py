@@ -20,4 +20,5 @@ setup(
         "requests==2.32.3",
         "matplotlib==3.9.2",
     ],
+    extras_require={"cache": ["pyarrow==18.0.0"]},
 )
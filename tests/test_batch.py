@@ -0,0 +1,222 @@
+import logging
+import os
+import re
+import pytest
+from expense_manager.batch import find_jobs, get_month_jobs, run_batch, run_job
+from expense_manager.cache import RatesCache
+
+DATA_FILE = os.path.join(
+    os.path.dirname(__file__), "..", "data", "transaction_data_102024.csv"
+)
+CURRENCY_TRANSACTIONS = """date,expense_category,amount,currency
+2024-01-01,salary,5000,USD
+2024-01-06,rent,-84000,INR
+"""
+
+
+@pytest.fixture
+def currency_file(tmp_path):
+    """Creates a transaction file in two currencies"""
+    (tmp_path / "transaction_data_012024.csv").write_text(CURRENCY_TRANSACTIONS)
+    return str(tmp_path)
+
+
+@pytest.fixture
+def rates_cache_file(tmp_path):
+    """Creates a rates cache holding the rates of the currency file"""
+    cache_file = str(tmp_path / "cache" / "rates.sqlite3")
+    cache = RatesCache(cache_file)
+    cache.set_currencies({"USD": "United States Dollar", "INR": "Indian Rupee"})
+    cache.set(
+        {
+            "amount": 1.0,
+            "base": "USD",
+            "rates": {"2024-01-02": {"INR": 80.0}, "2024-01-05": {"INR": 84.0}},
+        },
+        "USD",
+        date="2024-01-01..2024-01-06",
+    )
+    cache.close()
+    return cache_file
+
+
+def test_find_jobs_in_directory(tmp_path):
+    """Test transaction files of a directory are found with their month"""
+    for name in [
+        "transaction_data_122024.csv",
+        "transaction_data_112024.csv",
+        "notes.csv",
+    ]:
+        (tmp_path / name).write_text("date,expense_category,amount")
+
+    jobs = find_jobs(str(tmp_path))
+
+    assert [job["date_mmyyyy"] for job in jobs] == ["112024", "122024"]
+    assert jobs[0]["output_path"] == os.path.join(str(tmp_path), "reports", "112024")
+
+
+def test_find_jobs_with_glob_and_output_path(tmp_path):
+    """Test glob pattern and output path of jobs"""
+    (tmp_path / "transaction_data_012025.csv").write_text("")
+    (tmp_path / "transaction_data_022025.csv").write_text("")
+
+    jobs = find_jobs(str(tmp_path / "transaction_data_01*.csv"), "out")
+
+    assert len(jobs) == 1
+    assert jobs[0]["output_path"] == os.path.join("out", tmp_path.name, "012025")
+
+
+def test_jobs_of_customers_with_output_path(tmp_path):
+    """Test same month of different customers is written to different directories"""
+    for customer in ["alice", "bob"]:
+        (tmp_path / customer).mkdir()
+        (tmp_path / customer / "transaction_data_012025.csv").write_text("")
+
+    jobs = [
+        find_jobs(str(tmp_path / customer), "out", customer_name=customer)[0]
+        for customer in ["alice", "bob"]
+    ]
+
+    assert [job["output_path"] for job in jobs] == [
+        os.path.join("out", "alice", "012025"),
+        os.path.join("out", "bob", "012025"),
+    ]
+    assert [job["customer_name"] for job in jobs] == ["alice", "bob"]
+
+
+def test_get_month_jobs_range():
+    """Test range of months across a year end"""
+    jobs = get_month_jobs("data", "112024", "022025")
+    assert [job["date_mmyyyy"] for job in jobs] == [
+        "112024",
+        "122024",
+        "012025",
+        "022025",
+    ]
+    assert jobs[0]["transaction_file"] == os.path.join(
+        "data", "transaction_data_112024.csv"
+    )
+
+
+def test_run_job_with_customer_name(tmp_path):
+    """Test customer name of the job is printed on its report"""
+    (tmp_path / "transaction_data_102024.csv").write_bytes(open(DATA_FILE, "rb").read())
+    job = get_month_jobs(str(tmp_path), "102024", "102024", customer_name="Jane Doe")[0]
+
+    result = run_job(job, "date", "test_logger", is_combined=True)
+
+    assert result["status"] == "success"
+    assert result["report"].customer_name == "Jane Doe"
+
+
+def test_run_job_reports_failure(tmp_path):
+    """Test a failing job is reported instead of raised"""
+    job = get_month_jobs(str(tmp_path), "012025", "012025")[0]
+
+    result = run_job(job, "date", "test_logger")
+
+    assert result["status"] == "failed"
+    assert "FileNotFoundError" in result["error"]
+    assert result["pdf_file"] is None
+
+
+@pytest.mark.parametrize("chart_backend", ["raster", "vector"])
+def test_run_job_embeds_charts_from_memory(tmp_path, chart_backend):
+    """Test PDF report is built without chart PNG files on disk"""
+    (tmp_path / "transaction_data_102024.csv").write_bytes(open(DATA_FILE, "rb").read())
+    job = get_month_jobs(str(tmp_path), "102024", "102024")[0]
+
+    result = run_job(job, "date", "test_logger", chart_backend=chart_backend)
+
+    assert result["status"] == "success"
+    assert os.listdir(job["output_path"]) == [os.path.basename(result["pdf_file"])]
+
+
+def test_run_job_saves_charts(tmp_path):
+    """Test chart PNG files are written next to the PDF report when asked"""
+    (tmp_path / "transaction_data_102024.csv").write_bytes(open(DATA_FILE, "rb").read())
+    job = get_month_jobs(str(tmp_path), "102024", "102024")[0]
+
+    result = run_job(job, "date", "test_logger", save_charts=True)
+
+    assert result["status"] == "success"
+    png_files = [
+        name for name in os.listdir(job["output_path"]) if name.endswith(".png")
+    ]
+    assert len(png_files) == 3
+
+
+def test_run_batch_into_combined_file(tmp_path):
+    """Test reports of every job are built into one PDF file"""
+    transactions = open(DATA_FILE, "rb").read()
+    (tmp_path / "transaction_data_102024.csv").write_bytes(transactions)
+    (tmp_path / "transaction_data_102025.csv").write_bytes(
+        transactions.replace(b"2024-10-", b"2025-10-")
+    )
+    combined_file = str(tmp_path / "reports.pdf")
+
+    results = run_batch(
+        find_jobs(str(tmp_path)),
+        "date",
+        logging.getLogger("test_logger"),
+        workers=2,
+        combined_file=combined_file,
+        chart_backend="vector",
+    )
+
+    assert [result["status"] for result in results] == ["success", "success"]
+    assert all(result["pdf_file"] == combined_file for result in results)
+    # every report of the sample month takes two pages
+    pages = re.findall(rb"/Type /Page\b", open(combined_file, "rb").read())
+    assert len(pages) == 4
+
+
+def test_run_batch_throughput_of_successful_jobs(tmp_path, caplog):
+    """Test failed jobs are not counted as reports in throughput"""
+    jobs = get_month_jobs(str(tmp_path), "012025", "022025")
+
+    with caplog.at_level(logging.INFO, logger="test_logger"):
+        results = run_batch(jobs, "date", logging.getLogger("test_logger"), workers=1)
+
+    assert [result["status"] for result in results] == ["failed", "failed"]
+    assert "Throughput: 0.00 reports/sec" in caplog.text
+
+
+def test_run_job_converts_currency(currency_file, rates_cache_file):
+    """Test amounts in other currencies are converted with rates of the rates cache"""
+    job = get_month_jobs(currency_file, "012024", "012024")[0]
+
+    result = run_job(
+        job, "date", "test_logger", is_combined=True, rates_cache_file=rates_cache_file
+    )
+
+    assert result["status"] == "success"
+    assert result["report"].data["total_expenses"] == 1000
+
+
+def test_run_batch_fails_currency_without_rates(currency_file):
+    """Test a file in other currencies fails without rates instead of summing them"""
+    results = run_batch(
+        find_jobs(currency_file), "date", logging.getLogger("test_logger"), workers=1
+    )
+
+    assert results[0]["status"] == "failed"
+    assert "required for currency ['INR']" in results[0]["error"]
+
+
+def test_run_batch_fails_job_without_its_month(tmp_path):
+    """Test a file without transactions of its month fails instead of reporting another"""
+    transactions = open(DATA_FILE, "rb").read()
+    for date_mmyyyy in ["102024", "112024"]:
+        (tmp_path / f"transaction_data_{date_mmyyyy}.csv").write_bytes(transactions)
+
+    results = run_batch(
+        find_jobs(str(tmp_path)),
+        "date",
+        logging.getLogger("test_logger"),
+        workers=1,
+        chart_backend="vector",
+    )
+
+    assert [result["status"] for result in results] == ["success", "failed"]
+    assert "no transactions of 112024" in results[1]["error"]
@@ -0,0 +1,134 @@
+import copy
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+import pytest
+from matplotlib import pyplot
+from expense_manager.cache import ChartCache
+from expense_manager.charts import ExpenseCharts
+from expense_manager.config import charts_config, init_charts_config
+from expense_manager.exception import ExpenseChartsError
+from expense_manager.vector_charts import VectorChart
+
+PNG_FILES = {
+    "monthly_summary.png",
+    "expense_by_category.png",
+    "monthly_summary_by_category.png",
+}
+
+
+@pytest.fixture
+def charts():
+    """Charts config of a small monthly summary"""
+    summary = [
+        {"expense_category": "rent", "amount": 1000},
+        {"expense_category": "dining", "amount": 200},
+    ]
+    return init_charts_config(
+        monthly_summary=summary,
+        monthly_income=5000,
+        monthly_expenses=1200,
+        expense_summary=summary,
+        charts_=copy.deepcopy(charts_config),
+    )
+
+
+@pytest.fixture
+def expense_charts(tmp_path):
+    expense_charts = ExpenseCharts(
+        "Jan-2024", logging.getLogger("test_logger"), tmp_path
+    )
+    expense_charts.DPI = 50
+    return expense_charts
+
+
+def test_build_renders_headless(charts, expense_charts, tmp_path):
+    """Test charts are rendered without pyplot figures left open"""
+    render_times = expense_charts.build(charts)
+
+    assert set(render_times) == {chart["title"] for chart in charts}
+    assert {path.name for path in tmp_path.iterdir()} == PNG_FILES
+    assert pyplot.get_fignums() == []
+
+
+def test_build_keeps_charts_in_memory(charts, tmp_path):
+    """Test charts are kept as PNG in memory without writing files"""
+    expense_charts = ExpenseCharts("Jan-2024", logging.getLogger("test_logger"))
+    expense_charts.DPI = 50
+    expense_charts.build(charts)
+
+    assert set(expense_charts.images) == PNG_FILES
+    assert all(png.startswith(b"\x89PNG") for png in expense_charts.images.values())
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_build_vector_charts(charts, tmp_path):
+    """Test vector backend keeps ReportLab vector charts without rasterization"""
+    expense_charts = ExpenseCharts(
+        "Jan-2024", logging.getLogger("test_logger"), tmp_path, backend="vector"
+    )
+    render_times = expense_charts.build(charts)
+
+    assert set(render_times) == {chart["title"] for chart in charts}
+    assert set(expense_charts.images) == PNG_FILES
+    assert all(
+        isinstance(image, VectorChart) for image in expense_charts.images.values()
+    )
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_invalid_backend():
+    """Test unknown chart backend is rejected"""
+    with pytest.raises(ExpenseChartsError):
+        ExpenseCharts("Jan-2024", logging.getLogger("test_logger"), backend="svg")
+
+
+def test_build_in_worker_pool(charts, expense_charts, tmp_path):
+    """Test charts are rendered concurrently in worker processes"""
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        render_times = expense_charts.build(charts, executor=executor)
+
+    assert all(render_time > 0 for render_time in render_times.values())
+    assert {path.name for path in tmp_path.iterdir()} == PNG_FILES
+
+
+def test_build_reuses_cached_charts(charts, tmp_path):
+    """Test unchanged charts are copied from cache instead of re-rendered"""
+    cache = ChartCache(str(tmp_path / "cache"))
+    for run in ["first", "second"]:
+        (tmp_path / run).mkdir()
+        expense_charts = ExpenseCharts(
+            "Jan-2024", logging.getLogger("test_logger"), tmp_path / run, cache
+        )
+        expense_charts.DPI = 50
+        expense_charts.build(charts)
+
+    assert cache.stats()["hits"] == 3
+    assert cache.stats()["misses"] == 3
+    for png_file in PNG_FILES:
+        first = (tmp_path / "first" / png_file).read_bytes()
+        assert first == (tmp_path / "second" / png_file).read_bytes()
+
+
+def test_chart_cache_key_changes_with_spec(charts):
+    """Test chart spec, month and DPI are part of the cache key"""
+    key = ChartCache.get_key(charts[0], "Jan-2024", 300, (10, 6))
+
+    assert key == ChartCache.get_key(copy.deepcopy(charts[0]), "Jan-2024", 300, (10, 6))
+    assert key != ChartCache.get_key(charts[0], "Feb-2024", 300, (10, 6))
+    assert key != ChartCache.get_key(charts[0], "Jan-2024", 150, (10, 6))
+    assert key != ChartCache.get_key(charts[1], "Jan-2024", 300, (10, 6))
+
+
+def test_chart_cache_evicts_least_recently_used(tmp_path):
+    """Test cache size stays within max_bytes by evicting oldest charts"""
+    cache = ChartCache(str(tmp_path / "cache"), max_bytes=250)
+
+    for key in ["a", "b", "c"]:
+        cache.put(key, b"0" * 100)
+        os.utime(os.path.join(cache.cache_dir, f"{key}.png"), (ord(key), ord(key)))
+
+    assert cache.stats()["charts"] == 2
+    assert cache.stats()["evictions"] == 1
+    assert cache.get("a") is None
+    assert cache.get("c") == b"0" * 100
@@ -0,0 +1,160 @@
+import logging
+import pytest
+from pandas import DataFrame, Series, Timestamp
+from expense_manager import ExpenseManager
+from expense_manager.config import CATEGORIES
+from expense_manager.dtypes import (
+    concat_transactions,
+    downcast_amount,
+    normalize_categories,
+    to_compact,
+)
+from expense_manager.summary import MonthlySummary
+
+
+@pytest.fixture
+def logger():
+    return logging.getLogger("test_logger")
+
+
+@pytest.fixture
+def mixed_case_file(tmp_path):
+    """Creates a temporary CSV file with categories in mixed casing"""
+    file_path = tmp_path / "transaction_data_012024.csv"
+    data = """date,expense_category,amount
+2024-01-01,Salary,5000
+2024-01-05,rent,-1000
+2024-01-10, Dining ,-200
+2024-01-15,DINING,-300
+2024-01-20,Gifts,-50"""
+    file_path.write_text(data)
+    return str(file_path)
+
+
+def test_to_compact_normalizes_categories():
+    """Test categories of any casing share one entry of the category dictionary"""
+    df_exp = to_compact(
+        DataFrame(
+            {
+                "expense_category": ["Rent", " rent", "RENT", "gifts"],
+                "amount": [-1000, -1000, -1000, -50],
+            }
+        )
+    )
+
+    assert df_exp["expense_category"].dtype == "category"
+    assert list(df_exp["expense_category"]) == ["rent", "rent", "rent", "gifts"]
+    categories = list(df_exp["expense_category"].cat.categories)
+    assert set(CATEGORIES).issubset(categories)
+    assert categories == sorted(categories)
+
+
+@pytest.mark.parametrize(
+    "amount, dtype",
+    [
+        ([-100, 200], "int16"),
+        ([-100.0, 70000.0], "int32"),
+        ([-10.5, 20.25], "float64"),
+        ([-10.1, 20.2], "float64"),
+        ([-10.0, None], "float64"),
+    ],
+)
+def test_downcast_amount_is_exact(amount, dtype):
+    """Test whole amounts are downcast to integers and fractions stay float64"""
+    result = downcast_amount(Series(amount))
+
+    assert result.dtype == dtype
+    assert result.astype("float64").equals(Series(amount, dtype="float64"))
+
+
+def test_concat_transactions_unions_categories():
+    """Test concatenated transactions keep a categorical expense_category"""
+    first = to_compact(DataFrame({"expense_category": ["rent"], "amount": [-1]}))
+    second = to_compact(DataFrame({"expense_category": ["Pets"], "amount": [-2]}))
+
+    df_exp = concat_transactions([first, second])
+
+    assert df_exp["expense_category"].dtype == "category"
+    assert list(df_exp["expense_category"]) == ["rent", "pets"]
+
+
+def test_expense_manager_merges_category_casing(mixed_case_file, logger):
+    """Test summary sums categories of different casing together"""
+    expense = ExpenseManager(mixed_case_file, "date", logger, expenses_goal={})
+    expense.calculate_monthly_summary()
+
+    assert expense.df_expense["expense_category"].dtype == "category"
+    assert expense.df_expense["amount"].dtype == "int16"
+    categories = expense.monthly_summary.set_index("expense_category")["amount"]
+    assert categories.to_dict() == {
+        "dining": 500,
+        "gifts": 50,
+        "rent": 1000,
+        "salary": 5000,
+    }
+    assert expense.monthly_expenses == 1550
+
+
+def test_fractional_amount_sums_are_exact():
+    """Test sums of fractional amounts keep float64 precision"""
+    df_exp = to_compact(
+        DataFrame(
+            {
+                "date": Timestamp("2024-01-01"),
+                "expense_category": ["rent"] * 2_000_000,
+                "amount": [-2001.5] * 2_000_000,
+            }
+        )
+    )
+
+    category_totals = MonthlySummary.get_category_totals(df_exp)
+    assert category_totals.iloc[0] == -4_003_000_000.0
+
+
+def test_setter_normalizes_categories(mixed_case_file, logger):
+    """Test transactions assigned to df_expense are normalized too"""
+    expense = ExpenseManager(
+        mixed_case_file, "date", logger, expenses_goal={"rent": 10, "dining": 5}
+    )
+    transactions = DataFrame(
+        {
+            "date": [Timestamp("2024-01-01"), Timestamp("2024-01-05")],
+            "expense_category": ["Salary", "Rent"],
+            "amount": [5000, -1000],
+        }
+    )
+    expense.df_expense = transactions
+    expense.calculate_monthly_summary()
+    _, insights = expense.insights()
+
+    assert list(transactions["expense_category"]) == ["Salary", "Rent"]
+    assert (expense.monthly_income, expense.monthly_expenses) == (5000, 1000)
+    assert insights == [
+        "It is recommended to reduce rent [10%] expenses by 90% to meet savings goal."
+    ]
+
+
+def test_normalize_categories_keeps_missing():
+    """Test missing categories are not turned into the string nan"""
+    categories = normalize_categories(Series([" Dining", None, "RENT"]))
+
+    assert categories.isna().tolist() == [False, True, False]
+    assert categories.dropna().tolist() == ["dining", "rent"]
+
+
+@pytest.mark.parametrize("load_args", [{}, {"chunk_size": 2}, {"store_file": "store"}])
+def test_blank_category_and_amount_in_every_load_mode(tmp_path, logger, load_args):
+    """Test blank category and amount are skipped in sums of every load mode"""
+    file_path = tmp_path / "blank_expenses.csv"
+    file_path.write_text(
+        """date,expense_category,amount
+2024-01-01,salary,5000
+2024-01-02,,-1000
+2024-01-03,dining,-200
+2024-01-04,rent,"""
+    )
+    if "store_file" in load_args:
+        load_args = {"store_file": str(tmp_path / "transactions.sqlite3")}
+    expense = ExpenseManager(str(file_path), "date", logger, **load_args)
+
+    assert expense.calculate_monthly_summary()[2:] == (5000, 200, 4800)
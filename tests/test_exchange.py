@@ -0,0 +1,280 @@
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from expense_manager.cache import RatesCache
+from expense_manager.exception import ExchangeAPIError, ExchangeAPIValueError
+from expense_manager.exchange import (
+    AsyncCurrencyRatesAPI,
+    CurrencyRatesAPI,
+    create_session,
+)
+
+CURRENCIES = {"USD": "United States Dollar", "INR": "Indian Rupee"}
+LATEST_RATES = {"amount": 1.0, "base": "USD", "rates": {"INR": 84.0}}
+RANGE_RATES = {
+    "amount": 1.0,
+    "base": "USD",
+    "start_date": "2024-09-30",
+    "end_date": "2024-10-07",
+    "rates": {
+        "2024-09-30": {"INR": 83.8},
+        "2024-10-01": {"INR": 84.0},
+        "2024-10-04": {"INR": 84.1},
+        "2024-10-07": {"INR": 84.2},
+    },
+}
+
+
+@pytest.fixture
+def rates_cache(tmp_path):
+    cache = RatesCache(str(tmp_path / "cache" / "rates.sqlite3"))
+    yield cache
+    cache.close()
+
+
+class StubAPIHandler(BaseHTTPRequestHandler):
+    """Serves API responses of a local stub server"""
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(self.path)
+        with server.lock:
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        try:
+            self._respond(server)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def _respond(self, server):
+        if server.failures:
+            server.failures -= 1
+            self.send_response(503)
+            self.end_headers()
+            return
+        time.sleep(server.delay)
+        if self.path == "/currencies":
+            payload = CURRENCIES
+        elif ".." in self.path:
+            payload = RANGE_RATES
+        else:
+            payload = LATEST_RATES
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubAPIServer(ThreadingHTTPServer):
+    """Local stub server ignoring clients that gave up waiting"""
+
+    def handle_error(self, request, client_address):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    """Starts a local stub server of the exchange rates API"""
+    server = StubAPIServer(("127.0.0.1", 0), StubAPIHandler)
+    server.requests, server.failures, server.delay = [], 0, 0
+    server.lock, server.active, server.max_active = threading.Lock(), 0, 0
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    server.base_url = f"http://127.0.0.1:{server.server_port}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def api_args(stub_server):
+    return dict(
+        base_currency="USD",
+        target_currency="INR",
+        transport=create_session(retries=2, backoff_factor=0),
+        base_url=stub_server.base_url,
+        logger=logging.getLogger("test_logger"),
+    )
+
+
+def test_rates_cache_latest_expires(rates_cache):
+    """Test latest rates expire after ttl"""
+    rates_cache.set(LATEST_RATES, "USD", "INR")
+    assert rates_cache.get("USD", "INR") == LATEST_RATES
+
+    rates_cache.ttl = -1
+    assert rates_cache.get("USD", "INR") is None
+    assert rates_cache.stats() == {"hits": 1, "misses": 1}
+
+
+def test_rates_cache_historical_never_expires(rates_cache):
+    """Test historical rates are served regardless of ttl"""
+    rates_cache.ttl = -1
+    rates_cache.set(LATEST_RATES, "USD", "INR", "2024-10-01")
+    assert rates_cache.get("USD", "INR", "2024-10-01") == LATEST_RATES
+    assert rates_cache.get("USD", "INR", "2024-10-02") is None
+
+
+def test_rates_cache_offline_serves_expired(rates_cache):
+    """Test offline cache serves expired latest rates"""
+    rates_cache.set_currencies(CURRENCIES)
+    rates_cache.ttl, rates_cache.offline = -1, True
+    assert rates_cache.get_currencies() == {"USD", "INR"}
+
+
+def test_exchange_rates_warm_cache_has_no_network_calls(
+    rates_cache, stub_server, api_args
+):
+    """Test a warm cache serves currency list and rates without API calls"""
+    assert CurrencyRatesAPI(cache=rates_cache, **api_args).get_exchange_rates() == (
+        LATEST_RATES
+    )
+    assert len(stub_server.requests) == 2
+
+    assert CurrencyRatesAPI(cache=rates_cache, **api_args).get_exchange_rates() == (
+        LATEST_RATES
+    )
+    assert len(stub_server.requests) == 2
+    assert rates_cache.stats() == {"hits": 2, "misses": 2}
+
+
+def test_exchange_rates_offline_cache_miss(rates_cache, stub_server, api_args):
+    """Test offline mode raises on cache miss instead of calling the API"""
+    rates_cache.offline = True
+    with pytest.raises(ExchangeAPIError):
+        CurrencyRatesAPI(cache=rates_cache, **api_args).get_exchange_rates()
+    assert stub_server.requests == []
+
+
+def test_exchange_rates_from_stub_server(stub_server, api_args):
+    """Test rates are requested from injected base url"""
+    assert CurrencyRatesAPI(**api_args).get_exchange_rates() == LATEST_RATES
+    assert stub_server.requests == ["/currencies", "/latest?base=USD&to=INR"]
+
+
+def test_exchange_rates_retry_on_server_error(stub_server, api_args):
+    """Test server errors are retried"""
+    stub_server.failures = 2
+    assert CurrencyRatesAPI(**api_args).get_exchange_rates() == LATEST_RATES
+    assert len(stub_server.requests) == 4
+
+
+def test_exchange_rates_read_timeout(stub_server, api_args):
+    """Test a slow API raises ExchangeAPIError instead of hanging"""
+    api_args.update(transport=create_session(retries=0), timeout=(1, 0.1))
+    stub_server.delay = 0.5
+    with pytest.raises(ExchangeAPIError, match="failed"):
+        CurrencyRatesAPI(**api_args).get_exchange_rates()
+
+
+def test_constructor_does_no_network_io(stub_server, api_args):
+    """Test currencies are validated on first request, not on construction"""
+    api_args.update(target_currency="XYZ")
+    rates_api = CurrencyRatesAPI(**api_args)
+    assert stub_server.requests == []
+
+    with pytest.raises(ExchangeAPIValueError, match="XYZ"):
+        rates_api.get_exchange_rates()
+    assert stub_server.requests == ["/currencies"]
+
+
+def test_exchange_rates_range_single_request(stub_server, api_args):
+    """Test a date range is fetched in one request and filled forward"""
+    rates = CurrencyRatesAPI(**api_args).get_exchange_rates_range(
+        "2024-10-01", "2024-10-07"
+    )
+
+    assert stub_server.requests[-1] == "/2024-10-01..2024-10-07?base=USD&to=INR"
+    assert len(rates) == 7
+    assert rates["INR"].tolist() == [84.0, 84.0, 84.0, 84.1, 84.1, 84.1, 84.2]
+
+
+def test_exchange_rates_range_starts_on_holiday(stub_server, api_args):
+    """Test a range starting on a weekend uses the last published rate"""
+    rates = CurrencyRatesAPI(**api_args).get_exchange_rates_range(
+        "2024-10-05", "2024-10-07"
+    )
+    assert rates["INR"].tolist() == [84.1, 84.1, 84.2]
+    assert str(rates.index[0].date()) == "2024-10-05"
+
+
+def test_exchange_rates_range_cached(rates_cache, stub_server, api_args):
+    """Test a past date range is served from cache"""
+    api = CurrencyRatesAPI(cache=rates_cache, **api_args)
+    first = api.get_exchange_rates_range("2024-10-01", "2024-10-07")
+    second = api.get_exchange_rates_range("2024-10-01", "2024-10-07")
+
+    assert first.equals(second)
+    assert len(stub_server.requests) == 2
+
+
+@pytest.fixture
+def async_api(stub_server):
+    api = AsyncCurrencyRatesAPI(
+        log=logging.getLogger("test_logger"),
+        max_concurrency=2,
+        transport=create_session(retries=0, pool_maxsize=4),
+        base_url=stub_server.base_url,
+    )
+    yield api
+    api.close()
+
+
+def test_async_exchange_rates_concurrency_limit(stub_server, async_api):
+    """Test rates are fetched concurrently under the concurrency limit"""
+    stub_server.delay = 0.1
+    rate_requests = [("USD", target, "2024-10-01") for target in ["INR", "EUR", "GBP"]]
+    rate_requests += [("EUR", None, None)]
+
+    start = time.perf_counter()
+    rates = async_api.fetch_all(rate_requests)
+
+    assert rates == [LATEST_RATES] * 4
+    assert time.perf_counter() - start < 0.35
+    assert stub_server.max_active == 2
+    assert "/2024-10-01?base=USD&to=EUR" in stub_server.requests
+    assert "/latest?base=EUR" in stub_server.requests
+
+
+def test_async_exchange_rates_beyond_default_executor(stub_server):
+    """Test concurrency limit above the threads of the default executor"""
+    max_concurrency = min(32, (os.cpu_count() or 1) + 4) + 4
+    api = AsyncCurrencyRatesAPI(
+        log=logging.getLogger("test_logger"),
+        max_concurrency=max_concurrency,
+        transport=create_session(retries=0, pool_maxsize=max_concurrency),
+        base_url=stub_server.base_url,
+    )
+    stub_server.delay = 0.3
+
+    api.fetch_all(
+        [("USD", "INR", f"2024-10-{day:02d}") for day in range(1, max_concurrency + 1)]
+    )
+    api.close()
+
+    assert stub_server.max_active == max_concurrency
+
+
+def test_async_exchange_rates_coalesce_duplicates(stub_server, async_api):
+    """Test duplicate in-flight requests share one API call"""
+    stub_server.delay = 0.1
+    rates = async_api.fetch_all([("USD", "INR", None)] * 3)
+
+    assert rates == [LATEST_RATES] * 3
+    assert stub_server.requests == ["/latest?base=USD&to=INR"]
+
+    # new event loop, requests are no longer in flight
+    async_api.fetch_all([("USD", "INR", None)])
+    assert len(stub_server.requests) == 2
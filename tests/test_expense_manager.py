@@ -1,5 +1,6 @@
 import pytest
 import logging
+import os
 from pandas import DataFrame, Timestamp
 from expense_manager import (
     ExpenseManager,
@@ -53,6 +54,67 @@ def test_sort_data(expense_manager):
     assert dates == sorted(dates)
 
 
+def test_sort_data_is_deferred(multi_month_file, late_transactions, logger, caplog):
+    """Test summaries never sort and transactions are sorted when read"""
+    expense = ExpenseManager(multi_month_file, "amount", logger, expenses_goal={})
+    with caplog.at_level(logging.INFO, logger="test_logger"):
+        expense.sort_data()
+        expense.calculate_monthly_summary()
+        expense.append(late_transactions)
+    assert "sorted by column" not in caplog.text
+
+    amounts = expense.df_expense["amount"].tolist()
+    assert amounts == sorted(amounts)
+    assert len(amounts) == 8
+
+
+def test_get_largest_expenses(multi_month_file, logger):
+    """Test top-N expenses match a full sort of expenses"""
+    expense = ExpenseManager(multi_month_file, "date", logger)
+
+    largest = expense.get_largest_expenses(2)
+    assert largest["amount"].tolist() == [1000, 1000]
+    assert expense.get_largest_expenses(5, month="2024-02")[
+        "expense_category"
+    ].tolist() == ["rent", "dining"]
+
+
+def test_get_largest_expenses_of_downcast_amounts(tmp_path, logger):
+    """Test absolute amount of the smallest int8 amount does not overflow"""
+    file_path = tmp_path / "transaction_data_012024.csv"
+    file_path.write_text(
+        "date,expense_category,amount\n"
+        "2024-01-01,salary,100\n"
+        "2024-01-02,dining,-128\n"
+    )
+    expense = ExpenseManager(str(file_path), "date", logger)
+
+    assert expense.df_expense["amount"].dtype == "int8"
+    assert expense.get_largest_expenses(1)["amount"].tolist() == [128]
+
+
+def test_get_largest_expenses_of_aggregates(sample_expense_file, logger):
+    """Test largest expenses of streamed monthly totals are rejected"""
+    expense = ExpenseManager(sample_expense_file, "date", logger, chunk_size=2)
+
+    with pytest.raises(ValueError, match="monthly totals"):
+        expense.get_largest_expenses()
+
+
+def test_monthly_summary_in_chart_order(sample_expense_file, logger):
+    """Test categories of the report month are ordered by descending amount"""
+    expense = ExpenseManager(sample_expense_file, "date", logger, expenses_goal={})
+    _, monthly_summary, *_ = expense.calculate_monthly_summary()
+
+    assert monthly_summary["expense_category"].tolist() == [
+        "salary",
+        "rent",
+        "groceries",
+        "entertainment",
+        "utilities",
+    ]
+
+
 def test_calculate_monthly_summary(expense_manager):
     """Test calculation of monthly summary"""
     month, summary, income, expenses, savings = (
@@ -141,3 +203,307 @@ def test_expenses_goal_update(expense_manager):
     """Test updating expense goals"""
     expense_manager.expenses_goal = {"new_category": 15}
     assert expense_manager._expenses_goal["new_category"] == 15
+
+
+def test_load_data_chunked_matches_in_memory(sample_expense_file, logger):
+    """Test streaming load gives the same summary as the in-memory load"""
+    in_memory = ExpenseManager(sample_expense_file, "date", logger)
+    streamed = ExpenseManager(sample_expense_file, "date", logger, chunk_size=2)
+
+    expected = in_memory.calculate_monthly_summary()
+    result = streamed.calculate_monthly_summary()
+
+    assert result[0] == expected[0]
+    assert result[1].equals(expected[1])
+    assert result[2:] == expected[2:]
+
+
+def test_load_data_chunked_missing_columns(tmp_path, logger):
+    """Test streaming load validates required columns on the first chunk"""
+    file_path = tmp_path / "missing_columns.csv"
+    file_path.write_text("date,category,amount\n2024-01-01,salary,5000")
+
+    with pytest.raises(ValueError, match="must contains columns"):
+        ExpenseManager(str(file_path), "date", logger, chunk_size=10)
+
+
+def test_load_data_builds_and_reads_cache(sample_expense_file, tmp_path, logger):
+    """Test the columnar cache is written on first load and read afterwards"""
+    cache_dir = str(tmp_path / "cache")
+    first = ExpenseManager(sample_expense_file, "date", logger, cache_dir=cache_dir)
+    assert (tmp_path / "cache" / "sample_expenses.parquet").exists()
+
+    second = ExpenseManager(sample_expense_file, "date", logger, cache_dir=cache_dir)
+    assert str(second.df_expense["expense_category"].dtype) == "category"
+    assert second.df_expense["date"].dtype.kind == "M"
+    assert second.df_expense["amount"].dtype.kind == "i"
+    assert first.df_expense.equals(second.df_expense)
+    assert second.calculate_monthly_summary()[2:] == (5000, 1650, 3350)
+
+
+def test_load_data_cache_invalidated_on_change(sample_expense_file, tmp_path, logger):
+    """Test a modified expense file is re-parsed instead of read from cache"""
+    cache_dir = str(tmp_path / "cache")
+    ExpenseManager(sample_expense_file, "date", logger, cache_dir=cache_dir)
+    with open(sample_expense_file, "a") as file:
+        file.write("\n2024-01-25,salary,1000")
+
+    expense = ExpenseManager(sample_expense_file, "date", logger, cache_dir=cache_dir)
+    assert len(expense.df_expense) == 6
+
+
+def test_load_data_rebuild_cache(sample_expense_file, tmp_path, logger, caplog):
+    """Test the cache is rebuilt when forced"""
+    cache_dir = str(tmp_path / "cache")
+    ExpenseManager(sample_expense_file, "date", logger, cache_dir=cache_dir)
+    with caplog.at_level(logging.INFO, logger="test_logger"):
+        ExpenseManager(
+            sample_expense_file, "date", logger, cache_dir=cache_dir, rebuild_cache=True
+        )
+    assert "Transaction cache hit" not in caplog.text
+    assert "Transaction cache saved" in caplog.text
+
+
+@pytest.fixture
+def multi_month_file(tmp_path):
+    """Creates a temporary CSV file with two months of expense data"""
+    file_path = tmp_path / "multi_month_expenses.csv"
+    data = """date,expense_category,amount
+2024-01-01,salary,5000
+2024-01-10,rent,-1000
+2024-02-01,salary,6000
+2024-02-10,rent,-1000
+2024-02-15,dining,-500"""
+    file_path.write_text(data)
+    return str(file_path)
+
+
+def test_calculate_summary_multi_month(multi_month_file, logger):
+    """Test summary of every month is calculated in a single pass"""
+    expense = ExpenseManager(multi_month_file, "date", logger)
+    summary = expense.calculate_summary()
+
+    assert [summary.get_label(month) for month in summary.months] == [
+        "Jan-2024",
+        "Feb-2024",
+    ]
+    assert summary.get_totals("2024-01") == (5000, 1000, 4000, 0.2)
+    assert summary.get_totals("2024-02") == (6000, 1500, 4500, 0.25)
+    assert summary.get_categories("2024-02").to_dict(orient="records") == [
+        {"expense_category": "dining", "amount": 500},
+        {"expense_category": "rent", "amount": 1000},
+        {"expense_category": "salary", "amount": 6000},
+    ]
+
+
+def test_calculate_monthly_summary_for_month(multi_month_file, logger):
+    """Test monthly summary of a multi-month file only includes given month"""
+    expense = ExpenseManager(multi_month_file, "date", logger)
+    month, summary, income, expenses, savings = expense.calculate_monthly_summary(
+        "2024-02"
+    )
+
+    assert month == "Feb-2024"
+    assert (income, expenses, savings) == (6000, 1500, 4500)
+    assert len(summary) == 3
+
+
+@pytest.fixture
+def multi_currency_file(tmp_path):
+    """Creates a temporary CSV file with amounts in several currencies"""
+    file_path = tmp_path / "multi_currency_expenses.csv"
+    data = """date,expense_category,amount,currency
+2024-01-01,salary,5000,USD
+2024-01-06,rent,-84000,INR
+2024-01-02,dining,-92,EUR
+2024-01-08,dining,-46,EUR"""
+    file_path.write_text(data)
+    return str(file_path)
+
+
+@pytest.fixture
+def usd_rates():
+    """Date-indexed rates of one USD, published on business days only"""
+    return DataFrame(
+        {"INR": [80.0, 84.0, 84.0], "EUR": [0.92, 0.9, 0.9]},
+        index=[
+            Timestamp("2024-01-02"),
+            Timestamp("2024-01-05"),
+            Timestamp("2024-01-08"),
+        ],
+    )
+
+
+def test_convert_currency(multi_currency_file, usd_rates, logger):
+    """Test amounts take the last published rate on or before their date"""
+    expense = ExpenseManager(
+        multi_currency_file, "date", logger, currency="USD", rates=usd_rates
+    )
+
+    assert expense.df_expense["amount"].tolist() == [5000, -1000, -100, -51.11]
+    assert set(expense.df_expense["currency"]) == {"USD"}
+
+
+def test_convert_currency_missing_rate(multi_currency_file, usd_rates, logger):
+    """Test transactions without a published rate are rejected"""
+    with pytest.raises(ValueError, match="Exchange rates missing"):
+        ExpenseManager(
+            multi_currency_file,
+            "date",
+            logger,
+            currency="USD",
+            rates=usd_rates.drop(columns="EUR"),
+        )
+
+
+def test_convert_currency_after_last_rate(multi_currency_file, usd_rates, logger):
+    """Test transactions after the last rate date are rejected"""
+    with pytest.raises(ValueError, match="missing after 2024-01-05 for 2"):
+        ExpenseManager(
+            multi_currency_file,
+            "date",
+            logger,
+            currency="USD",
+            rates=usd_rates.iloc[:2],
+        )
+
+
+def test_load_other_currency_without_rates(multi_currency_file, logger):
+    """Test amounts in other currencies are not summed unconverted"""
+    with pytest.raises(ValueError, match=r"required for currency \['EUR', 'INR'\]"):
+        ExpenseManager(multi_currency_file, "date", logger, currency="USD")
+
+
+def test_convert_currency_blank_currency(tmp_path, usd_rates, logger):
+    """Test transactions without currency are in reporting currency"""
+    file_path = tmp_path / "blank_currency_expenses.csv"
+    file_path.write_text(
+        """date,expense_category,amount,currency
+2024-01-01,salary,5000,
+2024-01-06,rent,-84000,INR"""
+    )
+    expense = ExpenseManager(
+        str(file_path), "date", logger, currency="USD", rates=usd_rates
+    )
+
+    assert expense.df_expense["amount"].tolist() == [5000, -1000]
+
+
+def test_convert_currency_streaming(multi_currency_file, usd_rates, logger):
+    """Test streamed amounts are converted during load like in-memory ones"""
+    in_memory = ExpenseManager(
+        multi_currency_file, "date", logger, currency="USD", rates=usd_rates
+    )
+    streamed = ExpenseManager(
+        multi_currency_file,
+        "date",
+        logger,
+        chunk_size=2,
+        currency="USD",
+        rates=usd_rates,
+    )
+    assert streamed.calculate_monthly_summary()[2:] == (
+        in_memory.calculate_monthly_summary()[2:]
+    )
+
+
+@pytest.fixture
+def late_transactions():
+    return DataFrame(
+        {
+            "date": ["2024-02-20", "2024-02-21", "2024-03-01"],
+            "expense_category": ["dining", "travel", "salary"],
+            "amount": [-100, -250, 7000],
+        }
+    )
+
+
+def test_append_matches_recalculation(multi_month_file, late_transactions, logger):
+    """Test appended transactions update the running sums like a full recalculation"""
+    expense = ExpenseManager(multi_month_file, "date", logger, expenses_goal={})
+    expense.calculate_monthly_summary("2024-02")
+
+    months = expense.append(late_transactions)
+
+    expected = ExpenseManager(multi_month_file, "date", logger, expenses_goal={})
+    expected.df_expense = DataFrame(expense.df_expense)
+    assert [str(month) for month in months] == ["2024-02", "2024-03"]
+    assert expense.summary.totals.equals(expected.calculate_summary().totals)
+    assert expense.summary.category_totals.equals(expected.summary.category_totals)
+    assert (expense.monthly_income, expense.monthly_expenses) == (6000, 1850)
+    assert expense.monthly_summary.equals(
+        expected.calculate_monthly_summary("2024-02")[1]
+    )
+    assert expense.calculate_ratio() == expected.calculate_ratio()
+
+
+def test_append_before_summary(multi_month_file, late_transactions, logger):
+    """Test transactions appended before the summary are part of it"""
+    expense = ExpenseManager(multi_month_file, "date", logger)
+    assert expense.append(late_transactions) == []
+    assert len(expense.df_expense) == 8
+    assert expense.calculate_summary().get_totals("2024-03") == (7000, 0, 7000, 0)
+
+
+def test_df_expense_invalidates_summary(multi_month_file, logger):
+    """Test replacing transactions resets the materialized summary"""
+    expense = ExpenseManager(multi_month_file, "date", logger)
+    expense.calculate_summary()
+    expense.df_expense = expense.df_expense.head(2)
+    assert expense.summary is None
+    assert expense.calculate_monthly_summary()[2:] == (5000, 1000, 4000)
+
+
+def test_checkpoint_roundtrip(multi_month_file, late_transactions, tmp_path, logger):
+    """Test running sums survive a checkpoint saved to disk and reloaded"""
+    checkpoint_file = str(tmp_path / "checkpoint" / "summary.json")
+    expense = ExpenseManager(multi_month_file, "date", logger)
+    expense.calculate_summary()
+    expense.append(late_transactions)
+    expense.save_checkpoint(checkpoint_file)
+
+    restored = ExpenseManager(multi_month_file, "date", logger)
+    restored.load_checkpoint(checkpoint_file)
+
+    assert restored.summary.totals.equals(expense.summary.totals)
+    assert restored.calculate_monthly_summary("2024-03")[2:] == (7000, 0, 7000)
+    # appended batches are restored with the summary
+    assert len(restored.df_expense) == 8
+    assert restored.get_largest_expenses(1)["expense_category"].tolist() == ["rent"]
+    assert restored.get_largest_expenses(1, month="2024-02")["amount"].tolist() == [
+        1000
+    ]
+
+
+def test_checkpoint_without_expense_file(
+    multi_month_file, late_transactions, tmp_path, logger
+):
+    """Test summary is restored from a checkpoint without loading the expense file"""
+    checkpoint_file = str(tmp_path / "checkpoint" / "summary.json")
+    expense = ExpenseManager(multi_month_file, "date", logger)
+    expense.calculate_summary()
+    expense.append(late_transactions.iloc[:2])
+    expense.save_checkpoint(checkpoint_file)
+    os.remove(multi_month_file)
+
+    restored = ExpenseManager(
+        multi_month_file, "date", logger, checkpoint_file=checkpoint_file
+    )
+    restored.append(late_transactions.iloc[2:])
+
+    assert restored.summary.get_totals("2024-02")[:3] == (6000, 1850, 4150)
+    assert restored.calculate_monthly_summary("2024-03")[2:] == (7000, 0, 7000)
+    with pytest.raises(ValueError, match="cannot be reset"):
+        restored.df_expense = late_transactions
+    with pytest.raises(ValueError, match="cannot be recalculated"):
+        restored.calculate_summary()
+    with pytest.raises(ValueError, match="monthly totals"):
+        restored.get_largest_expenses()
+
+    # batches of both sessions are saved in the next checkpoint
+    restored.save_checkpoint(checkpoint_file)
+    resumed = ExpenseManager(
+        multi_month_file, "date", logger, checkpoint_file=checkpoint_file
+    )
+    assert len(resumed.df_expense) == 3
+    assert resumed.summary.totals.equals(restored.summary.totals)
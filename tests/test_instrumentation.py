@@ -0,0 +1,106 @@
+import json
+import logging
+import os
+import pytest
+from expense_manager import ExpenseManager
+from expense_manager.instrumentation import REGISTRY, Instrumentation, instrument
+
+DATA_FILE = os.path.join(
+    os.path.dirname(__file__), "..", "data", "transaction_data_102024.csv"
+)
+
+
+@pytest.fixture
+def logger():
+    return logging.getLogger("test_logger")
+
+
+@pytest.fixture
+def registry():
+    """Enables the registry of the process for one test"""
+    REGISTRY.reset()
+    REGISTRY.enabled = True
+    yield REGISTRY
+    REGISTRY.enabled = False
+    REGISTRY.reset()
+
+
+def test_disabled_registry_records_nothing(logger):
+    """Test stages are not measured unless the registry is enabled"""
+    REGISTRY.reset()
+    expense = ExpenseManager(DATA_FILE, "date", logger)
+    expense.calculate_monthly_summary()
+
+    assert REGISTRY.summary() == {}
+
+
+def test_registry_records_pipeline_stages(registry, logger):
+    """Test wall time, CPU time, peak RSS and rows of ExpenseManager stages"""
+    expense = ExpenseManager(DATA_FILE, "date", logger, expenses_goal={})
+    expense.sort_data()
+    expense.calculate_monthly_summary()
+    expense.insights()
+
+    summary = registry.summary()
+    assert list(summary) == [
+        "ExpenseManager.load_data",
+        "ExpenseManager.sort_data",
+        "ExpenseManager.calculate_summary",
+        "ExpenseManager.calculate_monthly_summary",
+        "ExpenseManager.insights",
+    ]
+    load_data = summary["ExpenseManager.load_data"]
+    assert load_data["calls"] == 1
+    assert load_data["rows"] == len(expense.df_expense)
+    assert load_data["wall_seconds"] > 0
+    assert load_data["cpu_seconds"] >= 0
+    assert load_data["peak_rss_bytes"] > 0
+
+
+def test_stage_records_failures_and_rows():
+    """Test stages are recorded when they raise and rows add up"""
+    registry = Instrumentation(enabled=True)
+    with registry.stage("parse") as stage:
+        stage.rows = 10
+    with pytest.raises(ValueError):
+        with registry.stage("parse") as stage:
+            stage.rows = 5
+            raise ValueError("bad row")
+
+    stats = registry.summary()["parse"]
+    assert stats["calls"] == 2
+    assert stats["rows"] == 15
+
+
+def test_instrument_decorator(registry):
+    """Test decorated functions keep their result and record rows of it"""
+
+    @instrument("double", rows=lambda result, values: len(result))
+    def double(values):
+        return [value * 2 for value in values]
+
+    assert double([1, 2, 3]) == [2, 4, 6]
+    assert registry.summary()["double"]["rows"] == 3
+
+
+def test_export_json_and_prometheus(tmp_path):
+    """Test metrics are exported as JSON and Prometheus text format"""
+    registry = Instrumentation(enabled=True)
+    registry.record('charts "raster"', wall=0.5, cpu=0.25, rows=3, peak_rss=1024)
+
+    json_file = str(tmp_path / "metrics.json")
+    registry.save(json_file)
+    with open(json_file) as file:
+        stats = json.load(file)["stages"]['charts "raster"']
+    assert stats["wall_seconds"] == 0.5
+    assert stats["rows"] == 3
+
+    prometheus_file = str(tmp_path / "metrics.prom")
+    registry.save(prometheus_file)
+    with open(prometheus_file) as file:
+        lines = file.read().splitlines()
+    assert "# TYPE expense_manager_stage_seconds_total counter" in lines
+    assert (
+        'expense_manager_stage_seconds_total{stage="charts \\"raster\\""} 0.5' in lines
+    )
+    assert 'expense_manager_stage_rows_total{stage="charts \\"raster\\""} 3' in lines
@@ -0,0 +1,57 @@
+import logging
+import pytest
+from expense_manager.pipeline import get_date_range, prepare_report
+
+TRANSACTIONS = """date,expense_category,amount
+2024-01-01,Salary,5000
+2024-01-10,Rent,-1500
+2024-02-01,Salary,6000
+2024-02-10,Rent,-1700
+"""
+
+
+def test_prepare_report_of_job_month(tmp_path):
+    """Test report of a multi-month file is prepared for the job month"""
+    transaction_file = tmp_path / "transaction_data_022024.csv"
+    transaction_file.write_text(TRANSACTIONS)
+
+    report = prepare_report(
+        str(transaction_file),
+        str(tmp_path),
+        "022024",
+        "date",
+        logging.getLogger("test_logger"),
+        chart_backend="vector",
+    )
+
+    assert report.report_month == "Feb-2024"
+    assert report.data["total_income"] == 6000
+
+
+def test_prepare_report_without_job_month(tmp_path):
+    """Test report of a file without transactions of the job month is rejected"""
+    transaction_file = tmp_path / "transaction_data_032024.csv"
+    transaction_file.write_text(TRANSACTIONS)
+
+    with pytest.raises(ValueError, match=r"no transactions of 032024.*2024-02"):
+        prepare_report(
+            str(transaction_file),
+            str(tmp_path),
+            "032024",
+            "date",
+            logging.getLogger("test_logger"),
+            chart_backend="vector",
+        )
+
+
+def test_get_date_range_in_chunks(tmp_path):
+    """Test first and last date are found across chunks of the date column"""
+    transaction_file = tmp_path / "transaction_data_022024.csv"
+    transaction_file.write_text(TRANSACTIONS + "2023-12-31,dining,-10\n")
+
+    assert get_date_range(str(transaction_file), chunk_size=2) == (
+        "2023-12-31",
+        "2024-02-10",
+    )
+    transaction_file.write_text("date,expense_category,amount\n")
+    assert get_date_range(str(transaction_file), chunk_size=2) is None
@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+import pytest
+
+ROOT_PATH = os.path.join(os.path.dirname(__file__), "..")
+HEAVY_MODULES = ["matplotlib", "reportlab", "requests", "pandas"]
+
+
+def get_imported_modules(*args) -> set:
+    """This function runs python with import time report and returns top level modules"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+        cwd=ROOT_PATH,
+        env={**os.environ, "PYTHONPATH": os.path.abspath(ROOT_PATH)},
+    )
+    assert result.returncode == 0, result.stderr
+    return {
+        line.rsplit("|", 1)[-1].strip().split(".")[0]
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:")
+    }
+
+
+def test_package_import_is_lazy():
+    """Test importing the package and its modules defers heavy dependencies"""
+    modules = get_imported_modules(
+        "-c",
+        "import expense_manager;"
+        "from expense_manager import batch, cache, charts, exchange, pipeline, utils",
+    )
+    assert modules.isdisjoint(HEAVY_MODULES)
+
+
+@pytest.mark.parametrize("script", ["run_expense_manager.py", "run_batch.py"])
+def test_script_help_is_lazy(script):
+    """Test --help of scripts imports no heavy dependency"""
+    modules = get_imported_modules(os.path.join("scripts", script), "--help")
+    assert modules.isdisjoint(HEAVY_MODULES)
+
+
+def test_expense_manager_loads_on_access():
+    """Test ExpenseManager is still importable from the package"""
+    from expense_manager import ExpenseManager
+    from expense_manager.expense_manager import ExpenseManager as _ExpenseManager
+
+    assert ExpenseManager is _ExpenseManager
@@ -0,0 +1,148 @@
+import logging
+import os
+import pytest
+from pandas import Timestamp
+from expense_manager import ExpenseManager
+from expense_manager.summary import MonthlySummary
+from expense_manager.store import TransactionStore
+
+DATA_FILE = os.path.join(
+    os.path.dirname(__file__), "..", "data", "transaction_data_102024.csv"
+)
+
+
+@pytest.fixture
+def logger():
+    return logging.getLogger("test_logger")
+
+
+@pytest.fixture
+def multi_month_file(tmp_path):
+    """Creates a temporary CSV file with two months of expense data"""
+    file_path = tmp_path / "multi_month_expenses.csv"
+    data = """date,expense_category,amount
+2024-01-01,salary,5000
+2024-01-10,rent,-1000
+2024-02-01,salary,6000
+2024-02-10,rent,-1000
+2024-02-15,dining,-500"""
+    file_path.write_text(data)
+    return str(file_path)
+
+
+@pytest.fixture
+def store(tmp_path, logger):
+    store = TransactionStore(str(tmp_path / "store" / "transactions.sqlite3"), logger)
+    yield store
+    store.close()
+
+
+def test_ingest_is_incremental(store, multi_month_file):
+    """Test unchanged files are skipped and changed files replace their rows"""
+    assert store.ingest(multi_month_file) == 5
+    assert store.ingest(multi_month_file) == 0
+
+    with open(multi_month_file, "a") as file:
+        file.write("\n2024-02-20,dining,-100")
+    assert store.ingest(multi_month_file) == 6
+    assert store.stats() == {"files": 1, "rows": 6}
+
+
+def test_category_totals_match_pandas(store, multi_month_file, logger):
+    """Test summary of indexed aggregates matches the pandas summary"""
+    store.ingest(multi_month_file)
+    expected = ExpenseManager(multi_month_file, "date", logger).calculate_summary()
+
+    summary = MonthlySummary(store.get_category_totals())
+
+    assert summary.totals.equals(expected.totals)
+    assert summary.category_totals.equals(expected.category_totals)
+
+
+def test_date_range_queries(store, multi_month_file):
+    """Test date range filters of transactions and aggregates"""
+    store.ingest(multi_month_file)
+
+    transactions = store.get_transactions("2024-01-05", "2024-02-10")
+    assert transactions["date"].tolist() == [
+        Timestamp("2024-01-10"),
+        Timestamp("2024-02-01"),
+        Timestamp("2024-02-10"),
+    ]
+    aggregates = store.get_monthly_aggregates(start_date="2024-02-01")
+    assert aggregates.to_dict(orient="records") == [
+        {"date": Timestamp("2024-02-01"), "expense_category": "dining", "amount": -500},
+        {"date": Timestamp("2024-02-01"), "expense_category": "rent", "amount": -1000},
+        {"date": Timestamp("2024-02-01"), "expense_category": "salary", "amount": 6000},
+    ]
+
+
+def test_aggregates_use_index(store):
+    """Test date range aggregates are answered from the covering index"""
+    plan = store._connection.execute(
+        "EXPLAIN QUERY PLAN SELECT expense_category, SUM(amount_cents) FROM transactions "
+        "WHERE date >= '2024-01-01' GROUP BY expense_category"
+    ).fetchall()
+    assert "COVERING INDEX idx_transactions_date_category" in str(plan)
+
+
+def test_expense_manager_with_store_matches_pandas(tmp_path, logger):
+    """Test monthly summary from the store matches the in-memory load"""
+    store_file = str(tmp_path / "transactions.sqlite3")
+    in_memory = ExpenseManager(DATA_FILE, "date", logger)
+    stored = ExpenseManager(DATA_FILE, "date", logger, store_file=store_file)
+
+    expected = in_memory.calculate_monthly_summary()
+    result = stored.calculate_monthly_summary()
+
+    assert result[0] == expected[0]
+    assert result[1].equals(expected[1])
+    assert result[2:] == expected[2:]
+    assert stored.store.stats()["rows"] == len(in_memory.df_expense)
+
+
+def test_ingest_rejects_currency_column(store, tmp_path):
+    """Test files with a currency column are not ingested"""
+    file_path = tmp_path / "multi_currency.csv"
+    file_path.write_text(
+        "date,expense_category,amount,currency\n2024-01-01,rent,-1,EUR"
+    )
+    with pytest.raises(ValueError, match="one currency"):
+        store.ingest(str(file_path))
+    assert store.stats() == {"files": 0, "rows": 0}
+
+
+def test_expense_manager_with_store_matches_pandas_fractional(tmp_path, logger):
+    """Test fractional amounts sum to the same totals in the store, stream and pandas"""
+    file_path = tmp_path / "fractional_expenses.csv"
+    dining = "2024-01-02,dining,-0.1\n" * 1000
+    file_path.write_text(
+        f"date,expense_category,amount\n2024-01-01,salary,5000.25\n{dining}"
+    )
+    store_file = str(tmp_path / "transactions.sqlite3")
+    in_memory = ExpenseManager(str(file_path), "date", logger)
+    streamed = ExpenseManager(str(file_path), "date", logger, chunk_size=100)
+    stored = ExpenseManager(str(file_path), "date", logger, store_file=store_file)
+
+    expected = in_memory.calculate_monthly_summary()
+    assert expected[2:4] == (5000.25, 100.0)
+    assert streamed.calculate_monthly_summary()[2:] == expected[2:]
+    assert stored.calculate_monthly_summary()[2:] == expected[2:]
+    assert stored.store.get_transactions()["amount"].iloc[:2].tolist() == [
+        5000.25,
+        -0.1,
+    ]
+
+
+def test_store_of_older_schema_is_rebuilt(tmp_path, logger, multi_month_file):
+    """Test a store of an older schema is rebuilt and files are ingested again"""
+    store_file = str(tmp_path / "transactions.sqlite3")
+    store = TransactionStore(store_file, logger)
+    store.ingest(multi_month_file)
+    store._connection.execute("PRAGMA user_version = 0")
+    store.close()
+
+    store = TransactionStore(store_file, logger)
+    assert store.stats() == {"files": 0, "rows": 0}
+    assert store.ingest(multi_month_file) == 5
+    store.close()
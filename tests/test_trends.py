@@ -0,0 +1,119 @@
+import logging
+import math
+import pytest
+from pandas import MultiIndex, Period, PeriodIndex, Series
+from expense_manager import ExpenseManager
+from expense_manager.summary import MonthlySummary
+from expense_manager.trends import ExpenseTrends
+
+
+@pytest.fixture
+def logger():
+    return logging.getLogger("test_logger")
+
+
+@pytest.fixture
+def category_totals():
+    """Rent of 1000 every month and dining rising from 100, no data in 2024-03"""
+    records = [
+        ("2023-12", "dining", -100),
+        ("2023-12", "rent", -1000),
+        ("2024-01", "dining", -200),
+        ("2024-01", "rent", -1000),
+        ("2024-01", "salary", 5000),
+        ("2024-02", "dining", -300),
+        ("2024-02", "rent", -1000),
+        ("2024-04", "dining", -600),
+        ("2024-04", "rent", -1000),
+    ]
+    index = MultiIndex.from_arrays(
+        [
+            PeriodIndex([record[0] for record in records], freq="M"),
+            [record[1] for record in records],
+        ],
+        names=["month", "expense_category"],
+    )
+    return Series([record[2] for record in records], index=index, name="amount")
+
+
+@pytest.fixture
+def trends(category_totals):
+    return ExpenseTrends.from_category_totals(category_totals)
+
+
+def test_matrix_spans_calendar_months(trends):
+    """Test months without transactions are filled with 0"""
+    assert [str(month) for month in trends.months] == [
+        "2023-12",
+        "2024-01",
+        "2024-02",
+        "2024-03",
+        "2024-04",
+    ]
+    assert list(trends.matrix.columns) == ["dining", "rent", "salary"]
+    assert trends.matrix.loc[Period("2024-03", "M")].sum() == 0
+
+
+def test_rolling_average(trends):
+    """Test rolling averages need a full window of months"""
+    average = trends.rolling_average(3)["dining"]
+
+    assert math.isnan(average.iloc[1])
+    assert average.tolist()[2:] == [200, 500 / 3, 300]
+
+
+def test_month_over_month(trends):
+    """Test month-over-month deltas and percent changes"""
+    assert trends.month_over_month()["dining"].tolist()[1:] == [100, 100, -300, 600]
+    percent = trends.month_over_month_percent()["dining"]
+    assert percent.iloc[1] == 1.0
+    assert math.isnan(percent.iloc[4])
+
+
+def test_year_to_date(trends):
+    """Test year-to-date totals restart every year"""
+    assert trends.year_to_date()["rent"].tolist() == [1000, 1000, 2000, 2000, 3000]
+
+
+def test_get_trends(trends):
+    """Test trends of every category in one month"""
+    month_trends = trends.get_trends("2024-02", windows=[3]).set_index(
+        "expense_category"
+    )
+
+    assert list(month_trends.columns) == [
+        "amount",
+        "avg_3m",
+        "mom_delta",
+        "mom_percent",
+        "ytd",
+    ]
+    assert month_trends.loc["dining"].tolist() == [300, 200, 100, 0.5, 500]
+
+
+def test_insights(trends):
+    """Test categories rising above their rolling average are reported"""
+    assert trends.insights("2024-02", window=2) == [
+        "dining expenses 300 are 100% above the 2-month average 150."
+    ]
+    assert trends.insights("2024-02", window=2, threshold=1.5) == []
+
+
+def test_expense_manager_trends(tmp_path, logger):
+    """Test trends reuse the monthly aggregates of the expense file"""
+    file_path = tmp_path / "multi_month_expenses.csv"
+    file_path.write_text(
+        """date,expense_category,amount
+2024-01-01,salary,5000
+2024-01-10,rent,-1000
+2024-02-01,salary,6000
+2024-02-10,rent,-1000
+2024-02-15,dining,-500"""
+    )
+    expense = ExpenseManager(str(file_path), "date", logger)
+    summary = expense.calculate_summary()
+
+    trends = expense.calculate_trends()
+    expected = ExpenseTrends.from_summary(MonthlySummary(summary.category_totals))
+    assert trends.matrix.equals(expected.matrix)
+    assert trends.year_to_date().loc[Period("2024-02", "M"), "salary"] == 11000
@@ -1,8 +1,17 @@
 import pytest
 import argparse
 import logging
+import logging.handlers
+import time
 from unittest.mock import patch
-from expense_manager.utils import parse_arguments, setup_logging
+from expense_manager.utils import (
+    Summary,
+    get_log_queue,
+    parse_arguments,
+    parse_batch_arguments,
+    setup_logging,
+    summarize,
+)
 
 
 # Test cases for parse_arguments
@@ -25,6 +34,15 @@ def test_parse_arguments_with_debug_flag():
         assert args.DEBUG is True
 
 
+def test_parse_arguments_with_save_charts_flag():
+    """Test parsing command-line arguments with the save charts flag."""
+    test_args = ["program_name", "data/path.csv", "01-2024", "date", "-p"]
+    with patch("sys.argv", test_args):
+        assert parse_arguments().SAVE_CHARTS is True
+    with patch("sys.argv", test_args[:-1]):
+        assert parse_arguments().SAVE_CHARTS is False
+
+
 def test_parse_arguments_missing_required_arg():
     """Test parsing command-line arguments with missing required arguments."""
     test_args = ["program_name", "data/path.csv", "01-2024"]
@@ -78,3 +96,69 @@ def test_setup_logging_invalid_log_file(tmp_path):
     """Test handling of invalid log file path."""
     with pytest.raises(OSError):
         setup_logging("test_logger", True, "/invalid/path/test.log", logging.INFO)
+
+
+def test_parse_batch_arguments():
+    """Test parsing command-line arguments of batch runner."""
+    test_args = ["program_name", "data", "date", "-m", "112024", "022025", "-w", "4"]
+    with patch("sys.argv", test_args):
+        args = parse_batch_arguments()
+        assert args.DATA_PATH == "data"
+        assert args.SORT_COLUMN == "date"
+        assert args.MONTHS == ["112024", "022025"]
+        assert args.WORKERS == 4
+        assert args.OUTPUT_PATH is None
+        assert args.SAVE_CHARTS is False
+
+
+def test_setup_logging_with_queue_handler(tmp_path):
+    """Test records are handed to a queue and written to file by the listener."""
+    log_file = tmp_path / "queue.log"
+    logger = setup_logging(
+        "test_queue_logger", True, str(log_file), logging.INFO, is_queue_handler=True
+    )
+    assert [type(handler) for handler in logger.handlers] == [
+        logging.handlers.QueueHandler
+    ]
+    assert get_log_queue(logger) is not None
+
+    logger.info("Queued %s", "record")
+    # the listener thread writes the record
+    for _ in range(200):
+        if "Queued record" in log_file.read_text():
+            break
+        time.sleep(0.01)
+    assert "INFO:Queued record" in log_file.read_text()
+    logger.handlers.clear()
+
+
+def test_summarize_payload():
+    """Test large payloads are summarized to their first items."""
+    payload = {
+        "base": "USD",
+        "rates": {f"2024-01-{day:02d}": {"INR": 83.1} for day in range(1, 32)},
+    }
+
+    assert summarize(payload, max_items=2) == (
+        "{'base': 'USD', 'rates': {'2024-01-01': {1 items}, "
+        "'2024-01-02': {1 items}, ... +29 more}}"
+    )
+    assert summarize(list(range(10)), max_items=3) == "[0, 1, 2, ... +7 more]"
+
+
+def test_summary_is_lazy():
+    """Test payload is summarized only when the record is emitted."""
+
+    class Payload(dict):
+        formatted = 0
+
+        def items(self):
+            Payload.formatted += 1
+            return super().items()
+
+    logger = logging.getLogger("test_lazy_logger")
+    logger.setLevel(logging.INFO)
+    logger.debug("API Response: %s", Summary(Payload(rate=1)))
+    assert Payload.formatted == 0
+    assert str(Summary(Payload(rate=1))) == "{'rate': 1}"
+    assert Payload.formatted == 1
@@ -0,0 +1,107 @@
+import logging
+import os
+import pytest
+from expense_manager.watch import TransactionWatcher
+
+
+class FakeClock:
+    """Clock advanced by the test"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def processed():
+    return []
+
+
+def write_file(path, text: str, mtime_ns: int) -> None:
+    """Writes transaction file with an explicit modification time"""
+    path.write_text(text)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def watcher(tmp_path, clock, processed):
+    write_file(tmp_path / "transaction_data_012024.csv", "date", 1_000)
+    return TransactionWatcher(
+        str(tmp_path),
+        callback=lambda job: processed.append(job["date_mmyyyy"]),
+        log=logging.getLogger("test_logger"),
+        debounce=5,
+        clock=clock,
+    )
+
+
+def test_existing_files_are_not_reprocessed(watcher, processed):
+    """Test files existing on start are skipped by default"""
+    assert watcher.run_once() == 0
+    assert processed == []
+
+
+def test_changed_file_is_debounced(watcher, tmp_path, clock, processed):
+    """Test a burst of changes is processed once after it settles"""
+    new_file = tmp_path / "transaction_data_022024.csv"
+    write_file(new_file, "date", 1_000)
+    watcher.run_once()
+
+    clock.now = 4
+    write_file(new_file, "date,amount", 2_000)
+    watcher.run_once()
+
+    clock.now = 8
+    assert watcher.run_once() == 0
+    clock.now = 9
+    assert watcher.run_once() == 1
+    assert watcher.run_once() == 0
+    assert processed == ["022024"]
+    assert watcher.stats()["changes"] == 1
+
+
+def test_only_modified_month_is_processed(watcher, tmp_path, clock, processed):
+    """Test modifying one month reprocesses only that month"""
+    write_file(tmp_path / "transaction_data_022024.csv", "date", 1_000)
+    write_file(tmp_path / "transaction_data_012024.csv", "date,amount", 3_000)
+    watcher.run_once()
+    clock.now = 5
+    watcher.run_once()
+
+    assert processed == ["012024", "022024"]
+    write_file(tmp_path / "transaction_data_022024.csv", "date,amount", 4_000)
+    clock.now = 10
+    watcher.run_once()
+    clock.now = 15
+    watcher.run_once()
+    assert processed == ["012024", "022024", "022024"]
+
+
+def test_failure_is_counted(tmp_path, clock):
+    """Test a failing run is logged and counted instead of stopping the watch"""
+
+    def fail(job):
+        raise ValueError("broken file")
+
+    watcher = TransactionWatcher(
+        str(tmp_path),
+        callback=fail,
+        log=logging.getLogger("test_logger"),
+        interval=0.01,
+        debounce=0,
+        process_existing=True,
+        clock=clock,
+    )
+    write_file(tmp_path / "transaction_data_032024.csv", "date", 1_000)
+    watcher.run(max_polls=2)
+
+    assert watcher.stats()["runs"] == 1
+    assert watcher.stats()["failures"] == 1
+    assert watcher.stats()["polls"] == 2